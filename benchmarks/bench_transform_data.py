@@ -0,0 +1,133 @@
+"""
+Micro-benchmark of BaseClass.transform_data.
+
+Compares the time and peak memory of aligning a single chunk to its target
+table using the previous implementation, which mutated the chunk, built a
+Python list per missing column and copied the frame on concat and reorder,
+against the current column plan based implementation.
+
+Usage:
+    python benchmarks/bench_transform_data.py --rows 1000000 --repeat 3
+"""
+
+import argparse
+import os
+import sys
+import tracemalloc
+from datetime import datetime
+from time import perf_counter
+from unittest.mock import MagicMock
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from ingest_classes.base_class import BaseClass  # noqa: E402
+
+
+class BenchClass(BaseClass):
+
+    def read_data(self, *args, **kwargs):  # pragma: no cover
+        yield from ()
+
+
+def make_chunk(
+    rows: int,
+) -> pd.DataFrame:
+    data: dict = {f"int_{i}": np.arange(rows) for i in range(5)}
+    data.update({f"float_{i}": np.random.rand(rows) for i in range(5)})
+    data["name"] = ["abc"] * rows
+    data["extra"] = np.arange(rows)
+    return pd.DataFrame(data)
+
+
+def make_definition() -> dict:
+    columns = [(f"int_{i}", "int") for i in reversed(range(5))]
+    columns += [(f"float_{i}", "float") for i in range(5)]
+    columns += [
+        ("name", "nvarchar"),
+        ("missing_int", "bigint"),
+        ("missing_date", "datetime"),
+        ("ingest_datetime", "datetime"),
+        ("current_record", "bit"),
+    ]
+    return {
+        column: {"data_type": data_type, "max_length": None}
+        for column, data_type in columns
+    }
+
+
+def legacy_transform(
+    df: pd.DataFrame,
+    fields: list,
+    start_time: datetime,
+) -> pd.DataFrame:
+    df["ingest_datetime"] = start_time
+    df["current_record"] = True
+
+    missing_fields = set(fields) - set(df.columns)
+    if missing_fields:
+        new_cols = pd.DataFrame(
+            {col: [None] * len(df) for col in missing_fields},
+        )
+
+        df = pd.concat([df, new_cols], axis=1)
+
+    return df[fields]
+
+
+def measure(
+    transform,
+    rows: int,
+    repeat: int,
+) -> tuple:
+    seconds = []
+    peaks = []
+    for _ in range(repeat):
+        chunk = make_chunk(rows)
+
+        tracemalloc.start()
+        start = perf_counter()
+        transform(chunk)
+        seconds.append(perf_counter() - start)
+        peaks.append(tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+
+    return min(seconds), max(peaks)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    instance = BenchClass(
+        {"source": MagicMock(), "target": MagicMock()},
+        "bench",
+    )
+    instance.schema_cache[("bench", "table")] = make_definition()
+    fields = list(instance.target_columns("table"))
+    start_time = datetime.now()
+
+    results = {
+        "legacy": measure(
+            lambda df: legacy_transform(df, fields, start_time),
+            args.rows,
+            args.repeat,
+        ),
+        "column plan": measure(
+            lambda df: instance.transform_data(df, "table", start_time),
+            args.rows,
+            args.repeat,
+        ),
+    }
+
+    print(f"transform_data, {args.rows:,} rows per chunk")
+    for name, (seconds, peak) in results.items():
+        print(f"{name:>12}: {seconds:.3f}s, peak {peak / 2**20:.1f} MiB")
+
+
+if __name__ == "__main__":
+    main()
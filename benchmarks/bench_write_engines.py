@@ -0,0 +1,121 @@
+"""
+Benchmark of the write engines used by BaseClass.write_staging.
+
+Creates a scratch table and its staging table in the target schema of an
+instance, then times writing the same chunk to the staging table with each
+engine. Requires a target SQL Server configured in config.yaml; the bulk
+engine also requires bcp on the PATH.
+
+Usage:
+    python benchmarks/bench_write_engines.py -i adventureworks \
+        --rows 100000 --engines default executemany values bulk
+"""
+
+import argparse
+import os
+import sys
+from time import perf_counter
+
+import numpy as np
+import pandas as pd
+import yaml
+from sqlalchemy import text
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from helpers.cnxns_helper import get_cnxns  # noqa: E402
+from helpers.writer_helper import WRITE_ENGINES  # noqa: E402
+from ingest_classes.base_class import BaseClass  # noqa: E402
+
+
+TABLE = "bench_write_engines"
+
+
+class BenchClass(BaseClass):
+
+    def read_data(self, *args, **kwargs):  # pragma: no cover
+        yield from ()
+
+
+def make_chunk(
+    rows: int,
+) -> pd.DataFrame:
+    return pd.DataFrame({
+        "id": np.arange(rows),
+        "code": np.random.choice(["GBP", "USD", "EUR"], rows),
+        "name": [f"name {i}" for i in range(rows)],
+        "amount": np.random.rand(rows) * 1000,
+        "modified": pd.Timestamp("2025-01-01") + pd.to_timedelta(
+            np.arange(rows), unit="s",
+        ),
+        "ingest_datetime": pd.Timestamp.now().floor("ms"),
+        "current_record": True,
+    })
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-i", "--instance", type=str, required=True)
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument(
+        "--engines",
+        type=str,
+        nargs="*",
+        default=list(WRITE_ENGINES),
+    )
+    args = parser.parse_args()
+
+    with open("config.yaml", "r") as f:
+        config = yaml.safe_load(f)
+
+    cnxns = get_cnxns(config, args.instance)
+    schema = config["ods"][args.instance]
+    instance = BenchClass(
+        {"source": cnxns["ods"], "target": cnxns["ods"]},
+        schema,
+        config.get("options", {}).get(args.instance),
+    )
+
+    with instance.target.connect() as cnxn:
+        cnxn.execute(text(f"""
+            DROP TABLE IF EXISTS {schema}.{TABLE};
+
+            CREATE TABLE {schema}.{TABLE}(
+                [id] BIGINT NOT NULL,
+                [code] NCHAR(3) NOT NULL,
+                [name] NVARCHAR(50) NOT NULL,
+                [amount] FLOAT NOT NULL,
+                [modified] DATETIME NOT NULL,
+                [ingest_datetime] DATETIME NOT NULL,
+                [current_record] BIT NOT NULL
+            );
+        """))
+        cnxn.close()
+
+    staging = instance.staging_name(TABLE, 0)
+    instance.create_staging(TABLE, staging)
+
+    chunk = make_chunk(args.rows)
+
+    print(f"write_staging, {args.rows:,} rows")
+    try:
+        for engine in args.engines:
+            start = perf_counter()
+            instance.write_staging(chunk, staging, engine)
+            seconds = perf_counter() - start
+
+            print(
+                f"{engine:>12}: {seconds:.2f}s, "
+                f"{args.rows / seconds:,.0f} rows/s",
+            )
+
+    finally:
+        instance.drop_staging(staging)
+
+        with instance.target.connect() as cnxn:
+            cnxn.execute(text(f"DROP TABLE IF EXISTS {schema}.{TABLE};"))
+            cnxn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -26,9 +26,127 @@ def get_ddl() -> dict:
                ,[end_time] [datetime] NOT NULL
                ,[time_taken] [int] NOT NULL
                ,[rows_processed] [int] NOT NULL
-               ,[modifieddate] [datetime] NULL
+               ,[modifieddate] [datetime2](7) NULL
+               ,[chunksize] [int] NULL
+               ,[chunks] [int] NULL
+               ,[insert_only_chunks] [int] NULL
     );"""
 
+    # add columns introduced since the history table was first deployed
+    definitions[f"{schema}_history_chunksize"] = f"""
+        IF COL_LENGTH('{schema}.history', 'chunksize') IS NULL
+        ALTER TABLE [{schema}].[history] ADD [chunksize] [int] NULL
+    ;"""
+
+    definitions[f"{schema}_history_chunks"] = f"""
+        IF COL_LENGTH('{schema}.history', 'chunks') IS NULL
+        ALTER TABLE [{schema}].[history] ADD [chunks] [int] NULL
+    ;"""
+
+    definitions[f"{schema}_history_insert_only_chunks"] = f"""
+        IF COL_LENGTH('{schema}.history', 'insert_only_chunks') IS NULL
+        ALTER TABLE [{schema}].[history]
+          ADD [insert_only_chunks] [int] NULL
+    ;"""
+
+    # the watermark is recorded at full precision, as datetime rounds it
+    definitions[f"{schema}_history_modifieddate"] = f"""
+        IF EXISTS (
+            SELECT 1
+              FROM sys.columns
+             WHERE object_id = OBJECT_ID('{schema}.history')
+               AND name = 'modifieddate'
+               AND system_type_id = TYPE_ID('datetime')
+        )
+        ALTER TABLE [{schema}].[history]
+          ALTER COLUMN [modifieddate] [datetime2](7) NULL
+    ;"""
+
+    definitions[f"{schema}_checkpoint"] = f"""
+        CREATE TABLE [{schema}].[checkpoint](
+               [table_name] [nvarchar](100) NOT NULL PRIMARY KEY
+               ,[run_id] [bigint] NOT NULL
+               ,[load_method] [nvarchar](75) NOT NULL
+               ,[ingest_datetime] [datetime] NOT NULL
+               ,[chunk_count] [int] NOT NULL
+               ,[last_modified] [datetime2] NULL
+               ,[last_key] [nvarchar](max) NULL
+               ,[updated] [datetime] NOT NULL
+    );"""
+
+    definitions[f"{schema}_watermark"] = f"""
+        CREATE TABLE [{schema}].[watermark](
+               [table_name] [nvarchar](100) NOT NULL PRIMARY KEY
+               ,[last_modified] [datetime2](7) NULL
+               ,[run_id] [bigint] NOT NULL
+               ,[updated] [datetime] NOT NULL
+               ,[row_count] [bigint] NULL
+               ,[checksum] [int] NULL
+               ,[deletes_checked] [datetime] NULL
+               ,[chunksize] [int] NULL
+    );"""
+
+    # deployments whose watermark table was created with a datetime column
+    definitions[f"{schema}_watermark_last_modified"] = f"""
+        IF EXISTS (
+            SELECT 1
+              FROM sys.columns
+             WHERE object_id = OBJECT_ID('{schema}.watermark')
+               AND name = 'last_modified'
+               AND system_type_id = TYPE_ID('datetime')
+        )
+        ALTER TABLE [{schema}].[watermark]
+          ALTER COLUMN [last_modified] [datetime2](7) NULL
+    ;"""
+
+    # the hash of the latest version of each key written by diff loads
+    definitions[f"{schema}_row_hash"] = f"""
+        CREATE TABLE [{schema}].[row_hash](
+               [table_name] [nvarchar](100) NOT NULL
+               ,[key_hash] [bigint] NOT NULL
+               ,[row_hash] [bigint] NOT NULL
+               ,PRIMARY KEY ([table_name], [key_hash])
+    );"""
+
+    # seed the watermark of tables loaded before the watermark table existed
+    # from their latest history
+    definitions[f"{schema}_watermark_seed"] = f"""
+        INSERT INTO [{schema}].[watermark] (
+               table_name
+               ,last_modified
+               ,chunksize
+               ,run_id
+               ,updated
+        )
+        SELECT h.table_name
+               ,h.modifieddate
+               ,(
+                   SELECT TOP(1) c.chunksize
+                     FROM [{schema}].[history] AS c
+                    WHERE c.table_name = h.table_name
+                      AND c.chunksize IS NOT NULL
+                    ORDER BY c.run_id DESC
+               )
+               ,h.run_id
+               ,GETDATE()
+          FROM (
+              SELECT table_name
+                     ,modifieddate
+                     ,run_id
+                     ,ROW_NUMBER() OVER (
+                         PARTITION BY table_name
+                         ORDER BY run_id DESC
+                     ) AS run_rank
+                FROM [{schema}].[history]
+            ) AS h
+         WHERE h.run_rank = 1
+           AND NOT EXISTS (
+              SELECT 1
+                FROM [{schema}].[watermark] AS w
+               WHERE w.table_name = h.table_name
+            )
+    ;"""
+
     # drop and create entity params to ensure latest data
     definitions[f"{schema}_drop_entity_parameters"] = f"""
         IF OBJECT_ID('{schema}.entity_params', 'U') IS NOT NULL
@@ -39,11 +157,16 @@ def get_ddl() -> dict:
         CREATE TABLE [{schema}].[entity_params](
                [table_name] [NVARCHAR](75) NOT NULL PRIMARY KEY
                ,[entity_name] [NVARCHAR](75) NOT NULL
-               ,[business_key] [NVARCHAR](75) NOT NULL
+               ,[business_key] [NVARCHAR](255) NOT NULL
                ,[modified_field] [NVARCHAR](75) NULL
                ,[load_method] [NVARCHAR](75) NOT NULL
                ,[chunksize] [INT] NULL
                ,[active] [BIT] NOT NULL
+               ,[extract_method] [NVARCHAR](75) NULL
+               ,[partitions] [INT] NULL
+               ,[write_engine] [NVARCHAR](75) NULL
+               ,[upsert_method] [NVARCHAR](75) NULL
+               ,[detect_deletes] [INT] NULL
         );"""
 
     return definitions
@@ -10,6 +10,8 @@ from sqlalchemy.exc import IntegrityError
 from sqlalchemy.exc import ProgrammingError
 
 from helpers.cnxns_helper import get_cnxns
+from helpers.index_helper import index_ddl
+from helpers.index_helper import index_definitions
 
 
 def _deploy_tables(
@@ -124,6 +126,84 @@ def _populate_entity_params(
         c.close()
 
 
+def _deploy_indexes(
+    cnxn: Engine,
+    config: dict,
+    *instances: str
+) -> list:
+    """
+    Create the indexes supporting each active entity's loads.
+
+    Given a config object and a SQL ALCHEMY engine object, read the
+    entity_params of each instance and create the indexes derived from them
+    (see helpers.index_helper) that don't already exist, printing whether
+    each index was created or already existed.
+
+    Args:
+        cnxn (Engine): SQL ALCHEMY engine object for database.
+        config (Dictionary): Config parameters.
+        *instances (String): instances to create indexes for.
+
+    Returns:
+        List: a tuple of schema, table, index name and status per index.
+    """
+
+    report = []
+
+    with cnxn.connect() as c:
+        for instance in instances:
+            schema = config["ods"].get(instance)
+            if schema is None:
+                continue
+
+            params = c.execute(sa.text(f"""
+                SELECT table_name
+                       ,business_key
+                       ,modified_field
+                       ,load_method
+                  FROM {schema}.entity_params
+                 WHERE active = 1
+                   AND OBJECT_ID('{schema}.' + table_name, 'U') IS NOT NULL;
+            """)).fetchall()
+
+            existing = {
+                (row.table_name, row.index_name)
+                for row in c.execute(sa.text(f"""
+                    SELECT t.name AS table_name
+                           ,i.name AS index_name
+                      FROM sys.indexes AS i
+                     INNER JOIN sys.tables AS t
+                        ON t.object_id = i.object_id
+                     WHERE SCHEMA_NAME(t.schema_id) = '{schema}'
+                       AND i.name IS NOT NULL;
+                """)).fetchall()
+            }
+
+            for row in params:
+                for index in index_definitions(
+                    row.table_name,
+                    row.business_key,
+                    row.modified_field,
+                    row.load_method,
+                ):
+                    status = "exists"
+                    if (row.table_name, index["name"]) not in existing:
+                        c.execute(
+                            sa.text(index_ddl(schema, row.table_name, index)),
+                        )
+                        status = "created"
+
+                    report.append(
+                        (schema, row.table_name, index["name"], status),
+                    )
+                    print(f"{schema}.{row.table_name}: {index['name']} "
+                          f"{status}")
+
+        c.close()
+
+    return report
+
+
 def run(
     config: dict,
     *instances: str,
@@ -136,6 +216,7 @@ def run(
 
     _deploy_tables(cnxn, *instances)
     _populate_entity_params(cnxn, *instances)
+    _deploy_indexes(cnxn, config, *instances)
 
 
 if __name__ == "__main__":
@@ -46,7 +46,7 @@ def populate_entity_list() -> dict:
             ,(
                 'EmployeeDepartmentHistory'
                 ,'HumanResources.EmployeeDepartmentHistory'
-                ,'BusinessEntityID'
+                ,'BusinessEntityID,StartDate,DepartmentID,ShiftID'
                 ,'ModifiedDate'
                 ,'incremental'
                 ,NULL
@@ -55,7 +55,7 @@ def populate_entity_list() -> dict:
             ,(
                 'EmployeePayHistory'
                 ,'HumanResources.EmployeePayHistory'
-                ,'BusinessEntityID'
+                ,'BusinessEntityID,RateChangeDate'
                 ,'ModifiedDate'
                 ,'incremental'
                 ,NULL
@@ -110,7 +110,7 @@ def populate_entity_list() -> dict:
             ,(
                 'BusinessEntityAddress'
                 ,'Person.BusinessEntityAddress'
-                ,'BusinessEntityID'
+                ,'BusinessEntityID,AddressID,AddressTypeID'
                 ,'ModifiedDate'
                 ,'incremental'
                 ,NULL
@@ -119,7 +119,7 @@ def populate_entity_list() -> dict:
             ,(
                 'BusinessEntityContact'
                 ,'Person.BusinessEntityContact'
-                ,'BusinessEntityID'
+                ,'BusinessEntityID,PersonID,ContactTypeID'
                 ,'ModifiedDate'
                 ,'incremental'
                 ,NULL
@@ -146,7 +146,7 @@ def populate_entity_list() -> dict:
             ,(
                 'EmailAddress'
                 ,'Person.EmailAddress'
-                ,'BusinessEntityID'
+                ,'BusinessEntityID,EmailAddressID'
                 ,'ModifiedDate'
                 ,'incremental'
                 ,NULL
@@ -173,7 +173,7 @@ def populate_entity_list() -> dict:
             ,(
                 'PersonPhone'
                 ,'Person.PersonPhone'
-                ,'BusinessEntityID'
+                ,'BusinessEntityID,PhoneNumber,PhoneNumberTypeID'
                 ,'ModifiedDate'
                 ,'incremental'
                 ,NULL
@@ -264,7 +264,7 @@ def populate_entity_list() -> dict:
             ,(
                 'ProductCostHistory'
                 ,'Production.ProductCostHistory'
-                ,'ProductID'
+                ,'ProductID,StartDate'
                 ,'ModifiedDate'
                 ,'incremental'
                 ,NULL
@@ -292,7 +292,7 @@ def populate_entity_list() -> dict:
             ,(
                 'ProductInventory'
                 ,'Production.ProductInventory'
-                ,'ProductID'
+                ,'ProductID,LocationID'
                 ,'ModifiedDate'
                 ,'incremental'
                 ,NULL
@@ -301,7 +301,7 @@ def populate_entity_list() -> dict:
             ,(
                 'ProductListPriceHistory'
                 ,'Production.ProductListPriceHistory'
-                ,'ProductID'
+                ,'ProductID,StartDate'
                 ,'ModifiedDate'
                 ,'incremental'
                 ,NULL
@@ -319,7 +319,7 @@ def populate_entity_list() -> dict:
             ,(
                 'ProductModelIllustration'
                 ,'Production.ProductModelIllustration'
-                ,'ProductModelID'
+                ,'ProductModelID,IllustrationID'
                 ,'ModifiedDate'
                 ,'incremental'
                 ,NULL
@@ -328,7 +328,7 @@ def populate_entity_list() -> dict:
             ,(
                 'ProductModelProductDescriptionCulture'
                 ,'Production.ProductModelProductDescriptionCulture'
-                ,'ProductModelID'
+                ,'ProductModelID,ProductDescriptionID,CultureID'
                 ,'ModifiedDate'
                 ,'incremental'
                 ,NULL
@@ -337,7 +337,7 @@ def populate_entity_list() -> dict:
             ,(
                 'ProductProductPhoto'
                 ,'Production.ProductProductPhoto'
-                ,'ProductID'
+                ,'ProductID,ProductPhotoID'
                 ,'ModifiedDate'
                 ,'incremental'
                 ,NULL
@@ -375,7 +375,7 @@ def populate_entity_list() -> dict:
                 ,'Production.TransactionHistory'
                 ,'TransactionID'
                 ,'ModifiedDate'
-                ,'incremental'
+                ,'append'
                 ,NULL
                 ,1
             )
@@ -409,7 +409,7 @@ def populate_entity_list() -> dict:
             ,(
                 'WorkOrderRouting'
                 ,'Production.WorkOrderRouting'
-                ,'WorkOrderID'
+                ,'WorkOrderID,ProductID,OperationSequence'
                 ,'ModifiedDate'
                 ,'incremental'
                 ,NULL
@@ -418,7 +418,7 @@ def populate_entity_list() -> dict:
             ,(
                 'ProductVendor'
                 ,'Purchasing.ProductVendor'
-                ,'ProductID'
+                ,'ProductID,BusinessEntityID'
                 ,'ModifiedDate'
                 ,'incremental'
                 ,NULL
@@ -427,7 +427,7 @@ def populate_entity_list() -> dict:
             ,(
                 'PurchaseOrderDetail'
                 ,'Purchasing.PurchaseOrderDetail'
-                ,'PurchaseOrderID'
+                ,'PurchaseOrderID,PurchaseOrderDetailID'
                 ,'ModifiedDate'
                 ,'incremental'
                 ,NULL
@@ -463,7 +463,7 @@ def populate_entity_list() -> dict:
             ,(
                 'CountryRegionCurrency'
                 ,'Sales.CountryRegionCurrency'
-                ,'CountryRegionCode'
+                ,'CountryRegionCode,CurrencyCode'
                 ,'ModifiedDate'
                 ,'incremental'
                 ,NULL
@@ -508,7 +508,7 @@ def populate_entity_list() -> dict:
             ,(
                 'PersonCreditCard'
                 ,'Sales.PersonCreditCard'
-                ,'BusinessEntityID'
+                ,'BusinessEntityID,CreditCardID'
                 ,'ModifiedDate'
                 ,'incremental'
                 ,NULL
@@ -517,7 +517,7 @@ def populate_entity_list() -> dict:
             ,(
                 'SalesOrderDetail'
                 ,'Sales.SalesOrderDetail'
-                ,'SalesOrderID'
+                ,'SalesOrderID,SalesOrderDetailID'
                 ,'ModifiedDate'
                 ,'incremental'
                 ,NULL
@@ -535,7 +535,7 @@ def populate_entity_list() -> dict:
             ,(
                 'SalesOrderHeaderSalesReason'
                 ,'Sales.SalesOrderHeaderSalesReason'
-                ,'SalesOrderID'
+                ,'SalesOrderID,SalesReasonID'
                 ,'ModifiedDate'
                 ,'incremental'
                 ,NULL
@@ -553,7 +553,7 @@ def populate_entity_list() -> dict:
             ,(
                 'SalesPersonQuotaHistory'
                 ,'Sales.SalesPersonQuotaHistory'
-                ,'BusinessEntityID'
+                ,'BusinessEntityID,QuotaDate'
                 ,'ModifiedDate'
                 ,'incremental'
                 ,NULL
@@ -589,7 +589,7 @@ def populate_entity_list() -> dict:
             ,(
                 'SalesTerritoryHistory'
                 ,'Sales.SalesTerritoryHistory'
-                ,'BusinessEntityID'
+                ,'BusinessEntityID,StartDate,TerritoryID'
                 ,'ModifiedDate'
                 ,'incremental'
                 ,NULL
@@ -616,7 +616,7 @@ def populate_entity_list() -> dict:
             ,(
                 'SpecialOfferProduct'
                 ,'Sales.SpecialOfferProduct'
-                ,'SpecialOfferID'
+                ,'SpecialOfferID,ProductID'
                 ,'ModifiedDate'
                 ,'incremental'
                 ,NULL
@@ -632,6 +632,16 @@ def populate_entity_list() -> dict:
                 ,1
             )
         ;""",
+
+        # read the largest tables in concurrent ranges of their business key
+        "adventureworks_partitions": """
+            UPDATE [ods_adventureworks].[entity_params]
+               SET partitions = 4
+             WHERE table_name IN (
+                 'SalesOrderDetail'
+                 ,'TransactionHistory'
+             )
+        ;""",
     }
 
     return entity_params
@@ -0,0 +1,126 @@
+from threading import Lock
+from typing import Optional
+
+
+class ChunkSizer:
+    """
+    Adapts the chunksize of a table's reads to what was observed so far.
+
+    After each chunk the size of the next read is recalculated from the
+    bytes per row and the seconds per row taken to read and write the
+    chunks seen so far. The next chunksize is the largest that fits within
+    the memory budget and, if set, the target seconds per chunk, moving by
+    no more than a factor of two per chunk and clamped to min_size and
+    max_size.
+    """
+
+    def __init__(
+        self,
+        chunksize: int,
+        min_size: int,
+        max_size: int,
+        memory_bytes: Optional[int] = None,
+        target_seconds: Optional[float] = None,
+    ) -> None:
+        """
+        Instantiate an instance of ChunkSizer.
+
+        Args:
+            chunksize (Integer): The chunksize of the first read, for example
+                the size learned on a previous run.
+            min_size (Integer): The smallest chunksize allowed.
+            max_size (Integer): The largest chunksize allowed.
+            memory_bytes (Integer, optional): The target in-memory size of a
+                single chunk.
+            target_seconds (Float, optional): The target time to read and
+                write a single chunk.
+
+        Returns:
+            None.
+        """
+
+        self.min_size = int(min_size)
+        self.max_size = int(max_size)
+        self.memory_bytes = memory_bytes
+        self.target_seconds = target_seconds
+        self.chunksize = self._clamp(chunksize)
+
+        self._lock = Lock()
+        self._rows_read = 0
+        self._bytes_read = 0
+        self._read_seconds = 0.0
+        self._rows_written = 0
+        self._write_seconds = 0.0
+
+    def _clamp(
+        self,
+        chunksize: float,
+    ) -> int:
+        return int(min(max(chunksize, self.min_size), self.max_size))
+
+    def record_read(
+        self,
+        rows: int,
+        nbytes: int,
+        seconds: float,
+    ) -> None:
+        """
+        Records the size and duration of a chunk read from the source.
+
+        Args:
+            rows (Integer): Rows in the chunk.
+            nbytes (Integer): In-memory size of the chunk in bytes.
+            seconds (Float): Time taken to read the chunk.
+
+        Returns:
+            None.
+        """
+
+        with self._lock:
+            self._rows_read += rows
+            self._bytes_read += nbytes
+            self._read_seconds += seconds
+
+    def record_write(
+        self,
+        rows: int,
+        seconds: float,
+    ) -> None:
+        """
+        Records the duration of a chunk written to the target and resizes.
+
+        Args:
+            rows (Integer): Rows in the chunk.
+            seconds (Float): Time taken to transform and write the chunk.
+
+        Returns:
+            None.
+        """
+
+        with self._lock:
+            self._rows_written += rows
+            self._write_seconds += seconds
+            self.chunksize = self._next_chunksize()
+
+    def _next_chunksize(
+        self,
+    ) -> int:
+
+        target = float(self.max_size)
+
+        if self.memory_bytes and self._rows_read and self._bytes_read:
+            bytes_per_row = self._bytes_read / self._rows_read
+            target = min(target, self.memory_bytes / bytes_per_row)
+
+        if self.target_seconds and self._rows_read and self._rows_written:
+            seconds_per_row = (
+                self._read_seconds / self._rows_read
+                + self._write_seconds / self._rows_written
+            )
+            if seconds_per_row > 0:
+                target = min(target, self.target_seconds / seconds_per_row)
+
+        # Move gradually so a single unusual chunk can't swing the size
+        target = min(max(target, self.chunksize / 2), self.chunksize * 2)
+
+        return self._clamp(target)
@@ -0,0 +1,150 @@
+from importlib.util import find_spec
+from typing import Optional
+
+import pandas as pd
+from pandas import DataFrame
+
+
+# pandas dtypes able to hold NULL for each SQL Server data type, used for
+# target columns that are missing from the source.
+NULL_DTYPES = {
+    "bit": "boolean",
+    "tinyint": "UInt8",
+    "smallint": "Int16",
+    "int": "Int32",
+    "bigint": "Int64",
+    "real": "Float32",
+    "float": "Float64",
+    "decimal": "Float64",
+    "numeric": "Float64",
+    "money": "Float64",
+    "smallmoney": "Float64",
+    "date": "datetime64[ns]",
+    "datetime": "datetime64[ns]",
+    "datetime2": "datetime64[ns]",
+    "smalldatetime": "datetime64[ns]",
+    "char": "string",
+    "nchar": "string",
+    "varchar": "string",
+    "nvarchar": "string",
+}
+
+
+def null_dtype(
+    data_type: Optional[str],
+) -> str:
+    """
+    Returns the pandas dtype for an all NULL column of a SQL data type.
+
+    Args:
+        data_type (str, optional): The SQL Server data type of the column.
+
+    Returns:
+        str: A nullable pandas dtype, object for unrecognised types.
+    """
+
+    return NULL_DTYPES.get((data_type or "").lower(), "object")
+
+
+# Compact pandas dtypes for source columns, by the SQL Server data type of
+# the target column. All are nullable, so NULLs are kept.
+READ_DTYPES = {
+    "bit": "boolean",
+    "tinyint": "UInt8",
+    "smallint": "Int16",
+    "int": "Int32",
+    "real": "Float32",
+}
+
+STRING_TYPES = ("char", "nchar", "varchar", "nvarchar")
+
+
+def string_dtype() -> str:
+    """
+    Returns the pandas string dtype, Arrow backed if pyarrow is installed.
+
+    Returns:
+        str: The name of the string dtype.
+    """
+
+    if find_spec("pyarrow") is not None:
+        return "string[pyarrow]"
+
+    return "string"
+
+
+def read_dtypes(
+    definition: dict,
+    category_max_length: Optional[int] = None,
+) -> dict:
+    """
+    Returns the dtype plan for chunks read for a target table.
+
+    Maps each target column whose type has a more compact pandas dtype than
+    the default to that dtype. Strings no longer than category_max_length,
+    typically low cardinality codes, are mapped to category.
+
+    Args:
+        definition (dict): The target table's columns, each with its
+            data_type and max_length, as held in the schema cache.
+        category_max_length (int, optional): Longest string column mapped to
+            category. If None, no columns are mapped to category.
+
+    Returns:
+        dict: The dtype of each column to convert.
+    """
+
+    strings = string_dtype()
+
+    dtypes = {}
+    for column, column_definition in definition.items():
+        data_type = (column_definition["data_type"] or "").lower()
+        max_length = column_definition.get("max_length")
+
+        if data_type in READ_DTYPES:
+            dtypes[column] = READ_DTYPES[data_type]
+
+        elif data_type in STRING_TYPES:
+            if (
+                category_max_length is not None
+                and max_length is not None
+                and not pd.isna(max_length)
+                and 0 < max_length <= category_max_length
+            ):
+                dtypes[column] = "category"
+            else:
+                dtypes[column] = strings
+
+    return dtypes
+
+
+def apply_dtypes(
+    chunk: DataFrame,
+    dtypes: dict,
+) -> DataFrame:
+    """
+    Converts the columns of a chunk to the dtypes of a dtype plan.
+
+    Columns not in the plan, or whose values can't be converted, for
+    example because the source type differs from the target's, are left as
+    read.
+
+    Args:
+        chunk (DataFrame): The chunk as read from the source.
+        dtypes (dict): The dtype plan, as returned by read_dtypes.
+
+    Returns:
+        DataFrame: The chunk with its columns converted.
+    """
+
+    for column in chunk.columns:
+        dtype = dtypes.get(column)
+        if dtype is None or str(chunk[column].dtype) == dtype:
+            continue
+
+        try:
+            chunk[column] = chunk[column].astype(dtype)
+        except (TypeError, ValueError):
+            pass
+
+    return chunk
@@ -0,0 +1,83 @@
+import numpy as np
+import pandas as pd
+from pandas.util import hash_pandas_object
+
+
+def normalise(
+    series: pd.Series,
+) -> pd.Series:
+    """
+    Returns a column as strings, so equal values hash equally.
+
+    The dtype a column is read as can change from one chunk to the next,
+    for example integers are read as floats in chunks with a NULL. Floats
+    holding only whole numbers are converted to integers before converting
+    to strings, so 1 and 1.0 are the same value. Missing values stay
+    missing.
+
+    Args:
+        series (Series): The column to normalise.
+
+    Returns:
+        Series: The column as the pandas string dtype.
+    """
+
+    if pd.api.types.is_float_dtype(series):
+        values = series.dropna()
+        if values.eq(values.round()).all():
+            try:
+                series = series.astype("Int64")
+            except (TypeError, ValueError, OverflowError):
+                pass
+
+    return series.astype("string")
+
+
+def hash_columns(
+    df: pd.DataFrame,
+    columns: list,
+) -> np.ndarray:
+    """
+    Returns a 64 bit hash of the given columns of each row.
+
+    Args:
+        df (DataFrame): The rows to hash.
+        columns (list): The columns to hash, in order.
+
+    Returns:
+        ndarray: A signed 64 bit hash per row, in the order of df, to match
+            SQL Server's bigint.
+    """
+
+    normalised = pd.DataFrame(
+        {column: normalise(df[column]) for column in columns},
+        index=df.index,
+    )
+
+    hashes = hash_pandas_object(normalised, index=False).to_numpy()
+
+    return hashes.view(np.int64)
+
+
+def changed_rows(
+    key_hashes: np.ndarray,
+    row_hashes: np.ndarray,
+    stored: pd.Series,
+) -> np.ndarray:
+    """
+    Returns a mask of rows that are new or differ from their stored hash.
+
+    Args:
+        key_hashes (ndarray): The hash of each row's business key.
+        row_hashes (ndarray): The hash of each row's values.
+        stored (Series): The row hash of each key already loaded, indexed
+            by key hash.
+
+    Returns:
+        ndarray: True for each row that's new or changed.
+    """
+
+    positions = stored.index.get_indexer(key_hashes)
+    previous = stored.to_numpy()[positions] if len(stored) else row_hashes
+
+    return (positions == -1) | (previous != row_hashes)
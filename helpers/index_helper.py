@@ -0,0 +1,101 @@
+from typing import Any
+from typing import Optional
+
+import pandas as pd
+
+from helpers.sql_helper import key_columns
+from helpers.sql_helper import qualify
+from helpers.sql_helper import quote
+
+
+def index_definitions(
+    table_name: str,
+    business_key: Any,
+    modified_field: Optional[str] = None,
+    load_method: Optional[str] = None,
+) -> list:
+    """
+    Returns the indexes supporting the loads of an ODS table.
+
+    Incremental and diff loads expire the current version of each staged
+    key, so get a filtered index on the business key of current records.
+    Tables with a modified field get an index on it, including
+    current_record, for the watermark read back when it's verified and the
+    rollback of resumed loads.
+
+    Args:
+        table_name (str): The name of the target table.
+        business_key (Any): The business key, comma separated or as a list.
+        modified_field (str, optional): The modified field of the table.
+        load_method (str, optional): The load method of the table.
+
+    Returns:
+        list: A dictionary per index, with its name, columns, included
+            columns and filter.
+    """
+
+    indexes: list = []
+
+    if load_method in ("incremental", "diff"):
+        indexes.append({
+            "name": f"IX_{table_name}_current",
+            "columns": key_columns(business_key),
+            "include": [],
+            "where": "current_record = 1",
+        })
+
+    if modified_field is not None and not pd.isna(modified_field):
+        indexes.append({
+            "name": f"IX_{table_name}_modified",
+            "columns": [modified_field],
+            "include": ["current_record"],
+            "where": None,
+        })
+
+    return indexes
+
+
+def index_ddl(
+    schema: str,
+    table_name: str,
+    index: dict,
+) -> str:
+    """
+    Returns the DDL creating an index if it doesn't already exist.
+
+    The names of the index, table and columns are validated and quoted, so
+    they're safe to use in the DDL's string literals as well.
+
+    Args:
+        schema (str): The schema of the table.
+        table_name (str): The name of the table.
+        index (dict): The index, as returned by index_definitions.
+
+    Returns:
+        str: The DDL, which can safely be run more than once.
+    """
+
+    name = quote(index["name"])
+    table = qualify(schema, table_name)
+    columns = ", ".join(map(quote, index["columns"]))
+
+    ddl = f"""
+        IF NOT EXISTS (
+            SELECT 1
+              FROM sys.indexes
+             WHERE name = N'{index["name"]}'
+               AND object_id = OBJECT_ID(N'{table}')
+        )
+        CREATE NONCLUSTERED INDEX {name}
+            ON {table} ({columns})"""
+
+    if index["include"]:
+        include = ", ".join(map(quote, index["include"]))
+        ddl += f"""
+            INCLUDE ({include})"""
+
+    if index["where"]:
+        ddl += f"""
+            WHERE {index["where"]}"""
+
+    return ddl + ";"
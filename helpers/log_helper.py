@@ -27,9 +27,11 @@ def update_log_running(
         int: Newly assigned run_id.
     """
 
+    # Lock the range until the insert commits so that instances starting
+    # concurrently can't be assigned the same run_id.
     query_max_id = text("""
         SELECT MAX(run_id) AS run_id
-          FROM [history]
+          FROM [history] WITH (UPDLOCK, HOLDLOCK)
     """)
 
     with cnxn.connect() as conn:
@@ -89,21 +91,26 @@ def update_log_finished(
     dttm_finished = datetime.now()
     time_taken = int((dttm_finished - dttm_started).total_seconds())
 
-    # Reduce the precision to match SQL Server
-    dttm_finished_str = dttm_finished.strftime("%Y-%m-%d %H:%M:%S.%f")[:-3]
-
     query = text(
-        f"""
+        """
         UPDATE [history]
-           SET dttm_finished = '{dttm_finished_str}',
-               time_taken = {time_taken},
-               run_status = '{run_status}'
-         WHERE run_id = {run_id}
+           SET dttm_finished = :dttm_finished,
+               time_taken = :time_taken,
+               run_status = :run_status
+         WHERE run_id = :run_id
     """,
     )
 
     with cnxn.connect() as conn:
-        conn.execute(query)
+        conn.execute(
+            query,
+            {
+                "dttm_finished": dttm_finished,
+                "time_taken": time_taken,
+                "run_status": run_status,
+                "run_id": run_id,
+            },
+        )
         conn.commit()
 
     return dttm_finished, time_taken
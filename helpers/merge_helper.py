@@ -0,0 +1,63 @@
+from typing import Generator
+from typing import Iterable
+
+
+def key_rows(
+    chunks: Iterable,
+) -> Generator:
+    """
+    Yields the rows of a sequence of DataFrames as tuples.
+
+    Args:
+        chunks (Iterable): DataFrames of key columns, in order.
+
+    Returns:
+        Generator: A tuple of the key values of each row, in order.
+    """
+
+    for chunk in chunks:
+        yield from chunk.itertuples(index=False, name=None)
+
+
+def missing_keys(
+    source: Iterable,
+    target: Iterable,
+) -> Generator:
+    """
+    Yields the keys of the target that aren't in the source.
+
+    Both sequences must be sorted ascending in the same order, and are
+    merged a key at a time, so only the current key of each is held in
+    memory however many keys there are.
+
+    Args:
+        source (Iterable): The source keys, as tuples, in order.
+        target (Iterable): The target keys, as tuples, in order.
+
+    Returns:
+        Generator: The target keys missing from the source, in order.
+
+    Raises:
+        ValueError: If either sequence isn't in order, as keys would
+            otherwise be reported missing that aren't.
+    """
+
+    def _ordered(keys, name):
+        previous = None
+        for key in keys:
+            if previous is not None and key < previous:
+                raise ValueError(
+                    f"{name} keys out of order: {key} after {previous}",
+                )
+            previous = key
+            yield key
+
+    sources = _ordered(source, "source")
+    current = next(sources, None)
+
+    for key in _ordered(target, "target"):
+        while current is not None and current < key:
+            current = next(sources, None)
+
+        if current is None or current != key:
+            yield key
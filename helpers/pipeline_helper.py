@@ -0,0 +1,166 @@
+from collections import deque
+from threading import Condition
+from threading import Thread
+from typing import Generator
+from typing import Iterable
+from typing import Optional
+
+from pandas import DataFrame
+
+
+def chunk_bytes(
+    chunk: DataFrame,
+) -> int:
+    """
+    Returns the in-memory size of a DataFrame in bytes.
+
+    Args:
+        chunk (DataFrame): The DataFrame to measure.
+
+    Returns:
+        int: Size of the DataFrame in bytes, including object contents.
+    """
+
+    return int(chunk.memory_usage(index=True, deep=True).sum())
+
+
+def prefetch(
+    chunks: Iterable,
+    depth: int,
+    max_bytes: Optional[int] = None,
+) -> Generator:
+    """
+    Yields chunks from an iterable, reading ahead on a background thread.
+
+    A reader thread keeps pulling chunks into a bounded buffer while the
+    caller processes the chunks already read, so extract and load overlap.
+    The buffer holds at most depth chunks and, if given, at most max_bytes
+    of data; a single chunk is always admitted so that one larger than
+    max_bytes cannot stall the pipeline. Errors raised by the reader are
+    re-raised to the caller once the chunks read before them are consumed.
+
+    Args:
+        chunks (Iterable): An iterable of DataFrames, such as read_data.
+        depth (int): Maximum number of chunks to hold in the buffer. Zero or
+            less disables read-ahead and chunks are yielded directly.
+        max_bytes (int, optional): Maximum size of the buffer in bytes.
+
+    Returns:
+        Generator: A Generator of DataFrames.
+    """
+
+    if depth <= 0:
+        yield from chunks
+        return
+
+    yield from read_ahead([chunks], depth, max_bytes)
+
+
+def read_ahead(
+    sources: list,
+    depth: int,
+    max_bytes: Optional[int] = None,
+) -> Generator:
+    """
+    Yields chunks from several iterables, each read on its own thread.
+
+    Each source is read by a separate thread into a shared buffer bounded
+    as for prefetch, and chunks are yielded in the order they're read, so
+    the order of chunks across sources isn't preserved. If any source
+    raises, the remaining sources are stopped and the error is re-raised to
+    the caller once the chunks already buffered are consumed.
+
+    Args:
+        sources (List): Iterables of DataFrames.
+        depth (int): Maximum number of chunks to hold in the buffer, at
+            least one.
+        max_bytes (int, optional): Maximum size of the buffer in bytes.
+
+    Returns:
+        Generator: A Generator of DataFrames.
+    """
+
+    depth = max(depth, 1)
+    buffer: deque = deque()
+    condition = Condition()
+    buffered_bytes = 0
+    running = len(sources)
+    stopped = False
+    error: Optional[BaseException] = None
+
+    def _is_full() -> bool:
+        if not buffer:
+            return False
+        if len(buffer) >= depth:
+            return True
+        return max_bytes is not None and buffered_bytes >= max_bytes
+
+    def _read(chunks: Iterable) -> None:
+        nonlocal buffered_bytes, running, stopped, error
+
+        try:
+            for chunk in chunks:
+                size = chunk_bytes(chunk) if max_bytes is not None else 0
+
+                with condition:
+                    while _is_full() and not stopped:
+                        condition.wait()
+
+                    if stopped:
+                        break
+
+                    buffer.append((chunk, size))
+                    buffered_bytes += size
+                    condition.notify_all()
+
+        except BaseException as e:
+            with condition:
+                if error is None:
+                    error = e
+                stopped = True
+
+        finally:
+            close = getattr(chunks, "close", None)
+            if close is not None:
+                close()
+
+            with condition:
+                running -= 1
+                condition.notify_all()
+
+    readers = [
+        Thread(target=_read, args=(chunks,), daemon=True)
+        for chunks in sources
+    ]
+    for reader in readers:
+        reader.start()
+
+    try:
+        while True:
+            with condition:
+                while not buffer and running:
+                    condition.wait()
+
+                if buffer:
+                    chunk, size = buffer.popleft()
+                    buffered_bytes -= size
+                    condition.notify_all()
+
+                elif error is not None:
+                    raise error
+
+                else:
+                    return
+
+            yield chunk
+
+    # Release the readers if the caller stops early, for example when a
+    # write fails, so no source cursor is left open.
+    finally:
+        with condition:
+            stopped = True
+            buffer.clear()
+            condition.notify_all()
+
+        for reader in readers:
+            reader.join()
@@ -0,0 +1,275 @@
+import re
+from functools import lru_cache
+from typing import Any
+from typing import Optional
+
+import pandas as pd
+from sqlalchemy import text
+from sqlalchemy import TextClause
+
+from helpers.dtype_helper import STRING_TYPES
+
+
+# SQL Server converts datetime columns to datetime2 to compare them with
+# datetime2 parameters, which can change their value, so parameters are cast
+# to the column's type instead.
+CAST_TYPES = ("datetime", "smalldatetime")
+
+# Strings are ordered by code point, as Python orders them, when compared
+# outside SQL Server.
+BINARY_COLLATION = "Latin1_General_BIN2"
+
+# Identifiers interpolated into statements must be plain names, anything
+# else is rejected rather than escaped.
+IDENTIFIER = re.compile(r"^[A-Za-z_@#][A-Za-z0-9_@#$]*$")
+
+
+def quote(
+    identifier: str,
+) -> str:
+    """
+    Returns an identifier validated and quoted for use in a SQL statement.
+
+    Args:
+        identifier (str): A single, unqualified, name such as a column.
+
+    Returns:
+        str: The quoted identifier.
+
+    Raises:
+        ValueError: If the identifier isn't a plain name.
+    """
+
+    if not isinstance(identifier, str) or not IDENTIFIER.match(identifier):
+        raise ValueError(f"Invalid identifier: {identifier!r}")
+
+    return f"[{identifier}]"
+
+
+def qualify(
+    *names: str,
+) -> str:
+    """
+    Returns a qualified name, each part validated and quoted.
+
+    Each name may itself be qualified, for example qualify("Sales.Customer")
+    and qualify("Sales", "Customer") both return [Sales].[Customer].
+
+    Args:
+        *names (str): The parts of the name, in order.
+
+    Returns:
+        str: The quoted, qualified name.
+    """
+
+    return ".".join(
+        quote(part) for name in names for part in str(name).split(".")
+    )
+
+
+@lru_cache(maxsize=4096)
+def statement(
+    sql: str,
+) -> TextClause:
+    """
+    Returns a statement, reusing it if the same text was built before.
+
+    Statements only interpolate identifiers, with every value bound as a
+    parameter, so the text of each statement is the same on every run of a
+    table and the server can reuse its plan.
+
+    Args:
+        sql (str): The text of the statement.
+
+    Returns:
+        TextClause: The statement, values are bound with bindparams.
+    """
+
+    return text(sql)
+
+
+def param(
+    name: str,
+    data_type: Optional[str] = None,
+) -> str:
+    """
+    Returns a bind parameter placeholder, cast to the column type if needed.
+
+    Args:
+        name (str): Name of the bind parameter.
+        data_type (str, optional): SQL data type of the column the parameter
+            is compared with.
+
+    Returns:
+        str: The placeholder for use in a SQL statement.
+    """
+
+    if data_type is not None and data_type.lower() in CAST_TYPES:
+        return f"CAST(:{name} AS {data_type})"
+
+    return f":{name}"
+
+
+def keyset_predicate(
+    columns: list,
+    types: Optional[dict] = None,
+    prefix: str = "last",
+) -> str:
+    """
+    Returns a predicate for rows positioned after a given row.
+
+    Given the columns a query is ordered by, returns a predicate for rows
+    that sort after the row whose values are bound to parameters named
+    prefix_0, prefix_1, etc. SQL Server doesn't support row value
+    comparisons, so the comparison is expanded column by column.
+
+    Args:
+        columns (list): Columns the rows are ordered by, in order.
+        types (dict, optional): SQL data type of each column.
+        prefix (str): Prefix of the bind parameter names.
+
+    Returns:
+        str: The predicate for use in a WHERE clause.
+    """
+
+    types = types or {}
+
+    terms = []
+    for i, column in enumerate(columns):
+        equal = [
+            f"{quote(prior)} = {param(f'{prefix}_{j}', types.get(prior))}"
+            for j, prior in enumerate(columns[:i])
+        ]
+        greater = (
+            f"{quote(column)} > {param(f'{prefix}_{i}', types.get(column))}"
+        )
+        terms.append(f"({' AND '.join(equal + [greater])})")
+
+    return f"({' OR '.join(terms)})"
+
+
+def keyset_params(
+    values: list,
+    prefix: str = "last",
+) -> dict:
+    """
+    Returns the bind parameters for a keyset_predicate.
+
+    Args:
+        values (list): Values of the row to position after.
+        prefix (str): Prefix of the bind parameter names.
+
+    Returns:
+        dict: Bind parameter names and their values.
+    """
+
+    return {
+        f"{prefix}_{i}": to_python(value)
+        for i, value in enumerate(values)
+    }
+
+
+def to_python(
+    value: Any,
+) -> Any:
+    """
+    Returns a pandas or numpy scalar as the equivalent Python value.
+
+    Args:
+        value (Any): The value to convert.
+
+    Returns:
+        Any: The value as a native Python type, None for missing values.
+    """
+
+    if value is None or (pd.api.types.is_scalar(value) and pd.isna(value)):
+        return None
+
+    if isinstance(value, pd.Timestamp):
+        return value.to_pydatetime()
+
+    if hasattr(value, "item"):
+        return value.item()
+
+    return value
+
+
+def key_columns(
+    business_key: Any,
+) -> list:
+    """
+    Returns the columns of a business key.
+
+    Business keys of more than one column are given in entity_params as a
+    comma separated list, for example "SalesOrderID,SalesOrderDetailID".
+
+    Args:
+        business_key (Any): The business key, as a comma separated string or
+            a list of columns.
+
+    Returns:
+        list: The columns of the business key, in order.
+    """
+
+    if isinstance(business_key, (list, tuple)):
+        return list(business_key)
+
+    return [
+        column.strip()
+        for column in str(business_key).split(",")
+        if column.strip()
+    ]
+
+
+def key_join(
+    columns: list,
+    left: str,
+    right: str,
+) -> str:
+    """
+    Returns a join condition matching the key columns of two tables.
+
+    Args:
+        columns (list): The key columns.
+        left (str): Alias of the first table.
+        right (str): Alias of the second table.
+
+    Returns:
+        str: The condition for use in an ON or WHERE clause.
+    """
+
+    return " AND ".join(
+        f"{left}.{quote(column)} = {right}.{quote(column)}"
+        for column in columns
+    )
+
+
+def key_order(
+    columns: list,
+    types: Optional[dict] = None,
+    direction: str = "asc",
+) -> str:
+    """
+    Returns an ORDER BY list matching the order Python sorts keys in.
+
+    String columns are ordered with a binary collation, as the collation of
+    the column may ignore case or order characters differently to Python.
+
+    Args:
+        columns (list): The key columns, in order.
+        types (dict, optional): SQL data type of each column.
+        direction (str): asc or desc.
+
+    Returns:
+        str: The columns for use in an ORDER BY clause.
+    """
+
+    types = types or {}
+    direction = "desc" if direction == "desc" else "asc"
+
+    return ", ".join(
+        f"{quote(column)} COLLATE {BINARY_COLLATION} {direction}"
+        if str(types.get(column, "")).lower() in STRING_TYPES
+        else f"{quote(column)} {direction}"
+        for column in columns
+    )
@@ -0,0 +1,393 @@
+import csv
+import os
+import subprocess
+from datetime import date
+from datetime import time
+from decimal import Decimal
+from tempfile import TemporaryDirectory
+from typing import Any
+from typing import Generator
+from typing import Optional
+from uuid import UUID
+
+import pandas as pd
+from pandas import DataFrame
+from sqlalchemy import Engine
+from sqlalchemy import text
+
+
+# SQL Server accepts at most 2100 parameters per statement and 1000 rows per
+# VALUES clause.
+MAX_PARAMS = 2100
+MAX_VALUES_ROWS = 1000
+
+# Field and row terminators for bulk copy files, control characters that
+# aren't expected in the data.
+BULK_FIELD_TERMINATOR = "\x1f"
+BULK_ROW_TERMINATOR = "\x1e"
+
+# bcp's character format loads an empty field as NULL, and a single NUL
+# character as an empty string.
+BULK_EMPTY_STRING = "\x00"
+
+# Python types of values the bulk engine can write to a character format
+# file as they are, bytes are written as hex.
+BULK_TYPES = (str, int, float, bool, Decimal, date, time, UUID)
+
+WRITE_ENGINES = ("default", "executemany", "values", "bulk")
+
+
+def to_rows(
+    df: DataFrame,
+) -> list:
+    """
+    Returns the rows of a DataFrame as tuples of native Python values.
+
+    Args:
+        df (DataFrame): The DataFrame to convert.
+
+    Returns:
+        list: A tuple per row, with None for missing values.
+    """
+
+    values = df.astype(object)
+    values = values.where(values.notna(), None)
+
+    return [
+        tuple(
+            value.to_pydatetime() if isinstance(value, pd.Timestamp)
+            else value
+            for value in row
+        )
+        for row in values.itertuples(index=False, name=None)
+    ]
+
+
+def values_batches(
+    rows: list,
+    n_columns: int,
+) -> Generator:
+    """
+    Yields batches of rows that fit in a single multi-row VALUES insert.
+
+    Args:
+        rows (list): The rows to insert, as returned by to_rows.
+        n_columns (int): The number of columns in each row.
+
+    Returns:
+        Generator: A Generator of lists of rows.
+    """
+
+    # Leave one parameter spare, drivers may reserve one
+    size = max(min(MAX_VALUES_ROWS, (MAX_PARAMS - 1) // max(n_columns, 1)), 1)
+
+    for start in range(0, len(rows), size):
+        yield rows[start:start + size]
+
+
+def values_statement(
+    table: str,
+    columns: list,
+    n_rows: int,
+) -> str:
+    """
+    Returns a multi-row VALUES insert with a named parameter per value.
+
+    Args:
+        table (str): The qualified name of the table to insert into.
+        columns (list): The columns to insert.
+        n_rows (int): The number of rows to insert.
+
+    Returns:
+        str: The INSERT statement, parameters are named p_<row>_<column>.
+    """
+
+    values = ",".join(
+        "(" + ",".join(f":p_{i}_{j}" for j in range(len(columns))) + ")"
+        for i in range(n_rows)
+    )
+
+    return (
+        f"INSERT INTO {table} ({','.join(f'[{c}]' for c in columns)}) "
+        f"VALUES {values}"
+    )
+
+
+def write_values(
+    engine: Engine,
+    df: DataFrame,
+    table: str,
+) -> None:  # pragma: no cover
+    """
+    Inserts a DataFrame using multi-row VALUES statements.
+
+    Args:
+        engine (Engine): SQLAlchemy Engine for the target.
+        df (DataFrame): The DataFrame to insert.
+        table (str): The qualified name of an existing table.
+
+    Returns:
+        None.
+    """
+
+    columns = list(df.columns)
+
+    with engine.connect() as cnxn:
+        for batch in values_batches(to_rows(df), len(columns)):
+            params = {
+                f"p_{i}_{j}": value
+                for i, row in enumerate(batch)
+                for j, value in enumerate(row)
+            }
+            cnxn.execute(
+                text(values_statement(table, columns, len(batch))),
+                params,
+            )
+
+        cnxn.close()
+
+
+def write_executemany(
+    engine: Engine,
+    df: DataFrame,
+    table: str,
+) -> None:  # pragma: no cover
+    """
+    Inserts a DataFrame using executemany with fast_executemany.
+
+    pyodbc's fast_executemany sends the rows as parameter arrays in a
+    single round trip, rather than a round trip per row.
+
+    Args:
+        engine (Engine): SQLAlchemy Engine for the target.
+        df (DataFrame): The DataFrame to insert.
+        table (str): The qualified name of an existing table.
+
+    Returns:
+        None.
+    """
+
+    columns = ",".join(f"[{c}]" for c in df.columns)
+    markers = ",".join("?" for _ in df.columns)
+
+    cnxn = engine.raw_connection()
+    try:
+        cursor = cnxn.cursor()
+        setattr(cursor, "fast_executemany", True)
+        cursor.executemany(
+            f"INSERT INTO {table} ({columns}) VALUES ({markers})",
+            to_rows(df),
+        )
+        cnxn.commit()
+
+    finally:
+        cnxn.close()
+
+
+def bulk_value(
+    value: Any,
+    column: str,
+) -> Any:
+    """
+    Returns a value of an object column as written to a bulk copy file.
+
+    Args:
+        value (Any): The value, not missing.
+        column (str): The name of the value's column, for errors.
+
+    Returns:
+        Any: Bytes as hex, empty strings and bytes as BULK_EMPTY_STRING,
+            booleans as 1 or 0 and other values unchanged.
+
+    Raises:
+        ValueError: If the value can't be written to the file as it is.
+    """
+
+    if isinstance(value, (bytes, bytearray)):
+        return value.hex() or BULK_EMPTY_STRING
+
+    if isinstance(value, bool):
+        return int(value)
+
+    if isinstance(value, str):
+        if any(
+            character in value
+            for character in (
+                BULK_FIELD_TERMINATOR,
+                BULK_ROW_TERMINATOR,
+                BULK_EMPTY_STRING,
+            )
+        ):
+            raise ValueError(
+                f"The bulk write_engine can't write column {column}, a value "
+                "contains a terminator or NUL character",
+            )
+        return value or BULK_EMPTY_STRING
+
+    if not isinstance(value, BULK_TYPES):
+        raise ValueError(
+            f"The bulk write_engine can't write column {column} of "
+            f"{type(value).__name__} values",
+        )
+
+    return value
+
+
+def bulk_file(
+    df: DataFrame,
+    path: str,
+) -> None:
+    """
+    Writes a DataFrame to a character format file for bulk copy.
+
+    Missing values are written as empty fields, which bulk copy loads as
+    NULL, and empty strings as a NUL character, which it loads as an empty
+    string. Bytes are written as hex, datetimes to millisecond precision
+    and booleans as 1 or 0. Columns of other types that can't be written
+    as they are raise before anything is written.
+
+    Args:
+        df (DataFrame): The DataFrame to write.
+        path (str): The path of the file to write.
+
+    Returns:
+        None.
+
+    Raises:
+        ValueError: If a column can't be written for bulk copy.
+    """
+
+    out = {}
+    for column in df.columns:
+        series = df[column]
+        if isinstance(series.dtype, pd.DatetimeTZDtype) or (
+            pd.api.types.is_timedelta64_dtype(series)
+        ):
+            raise ValueError(
+                f"The bulk write_engine can't write column {column} of "
+                f"dtype {series.dtype}",
+            )
+        elif pd.api.types.is_datetime64_any_dtype(series):
+            series = series.dt.strftime("%Y-%m-%d %H:%M:%S.%f").str[:-3]
+        elif pd.api.types.is_bool_dtype(series):
+            series = series.astype("Int8")
+        elif (
+            pd.api.types.is_object_dtype(series)
+            or pd.api.types.is_string_dtype(series)
+            or isinstance(series.dtype, pd.CategoricalDtype)
+        ):
+            series = series.astype(object).map(
+                lambda value: bulk_value(value, column),
+                na_action="ignore",
+            )
+        out[column] = series
+
+    DataFrame(out, index=df.index).to_csv(
+        path,
+        sep=BULK_FIELD_TERMINATOR,
+        lineterminator=BULK_ROW_TERMINATOR,
+        header=False,
+        index=False,
+        quoting=csv.QUOTE_NONE,
+        escapechar=None,
+        encoding="utf-8",
+    )
+
+
+def bulk_command(
+    engine: Engine,
+    table: str,
+    path: str,
+    bcp_path: str = "bcp",
+    bcp_args: Optional[list] = None,
+) -> list:
+    """
+    Returns the bcp command line to load a file into a table.
+
+    The password isn't included, so it can't be read from the process
+    list. Without -P bcp prompts for it, and write_bulk passes it on
+    standard input.
+
+    Args:
+        engine (Engine): SQLAlchemy Engine for the target, used for the
+            server, database and credentials.
+        table (str): The qualified name of an existing table.
+        path (str): The path of the file to load, as written by bulk_file.
+        bcp_path (str): The bcp executable.
+        bcp_args (list, optional): Extra arguments passed to bcp.
+
+    Returns:
+        list: The command and its arguments.
+    """
+
+    url = engine.url
+    server = url.host if url.port is None else f"{url.host},{url.port}"
+
+    command = [
+        bcp_path,
+        f"{url.database}.{table}",
+        "in",
+        path,
+        "-S", server,
+        "-c",
+        "-C", "65001",
+        "-t", f"0x{ord(BULK_FIELD_TERMINATOR):02x}",
+        "-r", f"0x{ord(BULK_ROW_TERMINATOR):02x}",
+    ]
+
+    if url.username:
+        command += ["-U", url.username]
+    else:
+        command += ["-T"]
+
+    return command + list(bcp_args or [])
+
+
+def write_bulk(
+    engine: Engine,
+    df: DataFrame,
+    table: str,
+    bcp_path: str = "bcp",
+    bcp_args: Optional[list] = None,
+) -> None:  # pragma: no cover
+    """
+    Inserts a DataFrame by writing it to a file and loading it with bcp.
+
+    If bcp fails, the error raised holds its output but not the command,
+    so the connection details aren't written to the log or history.
+
+    Args:
+        engine (Engine): SQLAlchemy Engine for the target.
+        df (DataFrame): The DataFrame to insert.
+        table (str): The qualified name of an existing table, its columns
+            in the same order as the DataFrame.
+        bcp_path (str): The bcp executable.
+        bcp_args (list, optional): Extra arguments passed to bcp.
+
+    Returns:
+        None.
+
+    Raises:
+        RuntimeError: If bcp exits with an error.
+    """
+
+    url = engine.url
+    password = f"{url.password or ''}\n" if url.username else None
+
+    with TemporaryDirectory() as directory:
+        path = os.path.join(directory, "chunk.dat")
+        bulk_file(df, path)
+
+        result = subprocess.run(
+            bulk_command(engine, table, path, bcp_path, bcp_args),
+            input=password,
+            capture_output=True,
+            text=True,
+        )
+
+    if result.returncode != 0:
+        output = (result.stderr or result.stdout).strip()
+        raise RuntimeError(
+            f"bcp failed loading {table} "
+            f"(exit code {result.returncode}): {output}",
+        )
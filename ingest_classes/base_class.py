@@ -1,22 +1,80 @@
+import json
 from abc import ABC
 from abc import abstractmethod
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from datetime import timedelta
+from itertools import chain
+from random import random
+from threading import BoundedSemaphore
+from threading import Lock
+from time import perf_counter
 from typing import Any
 from typing import Generator
+from typing import Iterator
+from typing import Optional
 
 import pandas as pd
 from cnxns import dbms as db
 from pandas import DataFrame
-from sqlalchemy import text
+
+from helpers.chunk_helper import ChunkSizer
+from helpers.dtype_helper import apply_dtypes
+from helpers.dtype_helper import null_dtype
+from helpers.dtype_helper import read_dtypes
+from helpers.hash_helper import changed_rows
+from helpers.hash_helper import hash_columns
+from helpers.index_helper import index_ddl
+from helpers.index_helper import index_definitions
+from helpers.merge_helper import key_rows
+from helpers.merge_helper import missing_keys
+from helpers.pipeline_helper import prefetch
+from helpers.sql_helper import key_columns
+from helpers.sql_helper import key_join
+from helpers.sql_helper import key_order
+from helpers.sql_helper import keyset_params
+from helpers.sql_helper import keyset_predicate
+from helpers.sql_helper import param
+from helpers.sql_helper import qualify
+from helpers.sql_helper import quote
+from helpers.sql_helper import statement
+from helpers.sql_helper import to_python
+from helpers.writer_helper import WRITE_ENGINES
+from helpers.writer_helper import write_bulk
+from helpers.writer_helper import write_executemany
+from helpers.writer_helper import write_values
 
 
 class BaseClass(ABC):
     "Base class for Ingest"
 
+    # entity_params columns that may be NULL, or absent from an entity_params
+    # table deployed before they were introduced.
+    optional_params = (
+        "extract_method",
+        "partitions",
+        "write_engine",
+        "upsert_method",
+        "detect_deletes",
+    )
+
+    upsert_methods = ("in", "join", "merge")
+
+    # Load methods that keep previous versions of records, expiring the
+    # current version of each key written.
+    versioned_methods = ("incremental", "diff")
+
+    # Load methods that only read records modified after the watermark
+    incremental_methods = ("incremental", "append")
+
+    # Columns added by transform_data rather than read from the source
+    metadata_columns = ("ingest_datetime", "current_record")
+
     def __init__(
         self,
         cnxns: dict,
         schema: str,
+        options: Optional[dict] = None,
     ) -> None:  # pragma: no cover
         """
         Instantiate an instance of BaseClass.
@@ -30,6 +88,8 @@ class BaseClass(ABC):
             cnxns (Dictionary): Dictionary of connections objects, expects a
                 source and target key.
             schema (String): Schema for the output tables.
+            options (Dictionary, optional): Instance level run options, see
+                the options section of config.yaml.
 
         Returns:
             None.
@@ -38,9 +98,96 @@ class BaseClass(ABC):
         self.source = cnxns["source"]
         self.target = cnxns["target"]
         self.schema = schema
+        self.options = options or {}
         self.status = "succeeded"
         self.error = ""
 
+        # Target table definitions, keyed by (schema, table), loaded once
+        # per run, and the column and dtype plans derived from them.
+        self.schema_cache: dict = {}
+        self.column_plans: dict = {}
+        self.dtype_plans: dict = {}
+
+        # Tables are ingested concurrently, with the number of simultaneous
+        # reads and writes capped separately for the source and target.
+        self.source_workers = int(self.options.get("source_workers", 1))
+        self.target_workers = int(self.options.get("target_workers", 1))
+        self._source_slots = BoundedSemaphore(self.source_workers)
+        self._target_slots = BoundedSemaphore(self.target_workers)
+        self._lock = Lock()
+
+        # Chunks are read ahead into a bounded buffer while the preceding
+        # chunk is written, zero disables read-ahead.
+        self.prefetch_depth = int(self.options.get("prefetch_depth", 0))
+        self.prefetch_bytes = self.options.get("prefetch_bytes")
+
+        # Opt-in, chunksize is adapted per table as chunks are read and
+        # written, starting from the size learned on the previous run.
+        self.adaptive_chunksize = bool(
+            self.options.get("adaptive_chunksize", False),
+        )
+        self.chunksize_min = int(self.options.get("chunksize_min", 10000))
+        self.chunksize_max = int(self.options.get("chunksize_max", 1000000))
+        self.chunk_memory_bytes = self.options.get("chunk_memory_bytes")
+        self.chunk_target_seconds = self.options.get("chunk_target_seconds")
+
+        # Only read the source columns that exist in the target table
+        self.project_columns = bool(self.options.get("project_columns", True))
+
+        # Opt-in, progress is checkpointed after every chunk so a failed
+        # load can be resumed from the last chunk written.
+        self.resume = bool(self.options.get("resume", False))
+
+        # Tables are started longest first, estimated from recent history.
+        self.schedule_runs = int(self.options.get("schedule_runs", 5))
+        self.plan: list = []
+
+        # Opt-in, chunks are converted to compact dtypes derived from the
+        # target column types as they're read.
+        self.dtype_mapping = bool(self.options.get("dtype_mapping", False))
+        self.category_max_length = self.options.get("category_max_length", 3)
+
+        # Engine used to write chunks to the target, unless a table sets its
+        # own write_engine in entity_params.
+        self.write_engine = self.options.get("write_engine", "default")
+        self.bcp_path = self.options.get("bcp_path", "bcp")
+        self.bcp_args = self.options.get("bcp_args", [])
+
+        # Staging tables are created once per table per run, and dropped at
+        # the end of the run unless kept for inspection.
+        self.keep_staging = bool(self.options.get("keep_staging", False))
+
+        # How incremental loads expire the current version of updated
+        # records, unless a table sets its own upsert_method.
+        self.upsert_method = self.options.get("upsert_method", "in")
+
+        # The watermark recorded for incremental loads is tracked as chunks
+        # are written. A sample of runs, by default none, also read it from
+        # the target table to verify it, recording any mismatch.
+        self.verify_watermark = float(
+            self.options.get("verify_watermark", 0.0),
+        )
+        self.watermark_mismatches: list = []
+
+        # Watermarks, fingerprints and learned chunksizes of every table,
+        # loaded once per run by read_watermarks
+        self.watermarks: Optional[dict] = None
+        self.fingerprints: Optional[dict] = None
+        self.chunksizes: Optional[dict] = None
+
+        # When each table was last checked for deletes, loaded alongside the
+        # watermarks, and the number of records expired by each check.
+        self.deletes_checked: Optional[dict] = None
+        self.deletes_expired: list = []
+
+        # Opt-in, the source is probed for changes to every table in one
+        # query at the start of each run, and tables unchanged since their
+        # last load are skipped. Tables that can't be probed are loaded.
+        self.change_probe = bool(self.options.get("change_probe", False))
+        self.probes: dict = {}
+        self.skipped: list = []
+        self.unprobed: list = []
+
     @abstractmethod
     def read_data(
         self,
@@ -49,6 +196,13 @@ class BaseClass(ABC):
         modified_field: str,
         max_modified: Any,
         chunksize: int,
+        sizer: Optional[ChunkSizer] = None,
+        ordered: bool = False,
+        keyset: Optional[list] = None,
+        last_key: Optional[list] = None,
+        partitions: int = 1,
+        partition_column: Optional[str] = None,
+        columns: Optional[list] = None,
     ) -> Generator:
         """
         Yields a Generator of DataFrames containing data from a source system.
@@ -62,6 +216,24 @@ class BaseClass(ABC):
             modified_field (String): The field representing when the record
                 was last modified.
             chunksize (Integer): The size of each chunk of data to read-in.
+            sizer (ChunkSizer, optional): If given, the size of each chunk is
+                taken from, and reported back to, the sizer in place of
+                chunksize.
+            ordered (Boolean): Whether records must be returned in order of
+                modified_field, even when max_modified isn't given.
+            keyset (List, optional): Key columns to paginate on. If given,
+                records are read a page at a time in order of modified_field
+                and the keys, each page starting after the last record of
+                the one before.
+            last_key (List, optional): Values of the keyset columns of the
+                last record already read, the record with modified value
+                max_modified. Reading starts after this record.
+            partitions (Integer): The number of ranges of partition_column to
+                read concurrently. Chunks from a partitioned read are not
+                returned in order.
+            partition_column (String, optional): The column to partition on.
+            columns (List, optional): The columns to read, all columns if not
+                given.
 
         Returns
             Generator: A Generator of DataFrames container data from a source
@@ -88,25 +260,31 @@ class BaseClass(ABC):
         """
 
         def _row_to_dict(row):
+            parameters = {
+                "entity_name": row["entity_name"],
+                "business_key": row["business_key"],
+                "modified_field": row["modified_field"],
+                "load_method": row["load_method"],
+                "chunksize": row["chunksize"],
+            }
+
+            for name in self.optional_params:
+                if name in row and not pd.isna(row[name]):
+                    parameters[name] = row[name]
+
             return {
-                row["table_name"]: {
-                    "entity_name": row["entity_name"],
-                    "business_key": row["business_key"],
-                    "modified_field": row["modified_field"],
-                    "load_method": row["load_method"],
-                    "chunksize": row["chunksize"],
-                },
+                row["table_name"]: parameters,
             }
 
         query = f"""
             SELECT *
-              FROM {self.schema}.entity_params
+              FROM {qualify(self.schema, "entity_params")}
              WHERE active = 1;
         """
 
         df = db.dbms_reader(
             self.target,
-            query=text(query),
+            query=statement(query),
         )
 
         params = df.apply(
@@ -120,6 +298,277 @@ class BaseClass(ABC):
             for key, value in parameter.items()
         }
 
+    def read_column_types(
+        self,
+        cnxn: Any,
+        entity_name: str,
+    ) -> dict:
+        """
+        Returns the SQL data type of each column of a table.
+
+        Args:
+            cnxn (Engine): SQLAlchemy Engine for the database holding the
+                table, the source or target.
+            entity_name (String): The table, optionally schema qualified.
+
+        Returns:
+            Dictionary: column name as key, data type as value.
+        """
+
+        table_schema, _, table_name = entity_name.rpartition(".")
+
+        query = """
+            SELECT COLUMN_NAME AS column_name
+                   ,DATA_TYPE AS data_type
+              FROM INFORMATION_SCHEMA.COLUMNS
+             WHERE TABLE_NAME = :table_name
+               AND (TABLE_SCHEMA = :table_schema OR :table_schema = '');
+        """
+
+        df = db.dbms_reader(
+            cnxn,
+            query=statement(query).bindparams(
+                table_name=table_name,
+                table_schema=table_schema,
+            ),
+        )
+
+        return dict(zip(df["column_name"], df["data_type"]))
+
+    def load_schema_cache(
+        self,
+    ) -> None:
+        """
+        Loads the definition of every table in the target schema.
+
+        Reads the columns, in order, and data types of every table in the
+        schema with a single query, replacing anything already cached.
+
+        Args:
+            None.
+
+        Returns:
+            None.
+        """
+
+        query = """
+            SELECT TABLE_NAME AS table_name
+                   ,COLUMN_NAME AS column_name
+                   ,DATA_TYPE AS data_type
+                   ,CHARACTER_MAXIMUM_LENGTH AS max_length
+              FROM INFORMATION_SCHEMA.COLUMNS
+             WHERE TABLE_SCHEMA = :table_schema
+             ORDER BY TABLE_NAME, ORDINAL_POSITION;
+        """
+
+        df = db.dbms_reader(
+            self.target,
+            query=statement(query).bindparams(table_schema=self.schema),
+        )
+
+        cache: dict = {}
+        for row in df.itertuples(index=False):
+            cache.setdefault((self.schema, row.table_name), {})[
+                row.column_name
+            ] = {
+                "data_type": row.data_type,
+                "max_length": (
+                    None if pd.isna(row.max_length) else int(row.max_length)
+                ),
+            }
+
+        with self._lock:
+            self.schema_cache = cache
+            self.column_plans = {}
+            self.dtype_plans = {}
+
+    def invalidate_schema_cache(
+        self,
+        table_name: Optional[str] = None,
+    ) -> None:
+        """
+        Removes cached table definitions.
+
+        Should be called whenever a target table is altered or replaced
+        during a run, the definition is read again when next needed.
+
+        Args:
+            table_name (String, optional): The table to remove, all tables
+                if not given.
+
+        Returns:
+            None.
+        """
+
+        with self._lock:
+            if table_name is None:
+                self.schema_cache = {}
+                self.column_plans = {}
+                self.dtype_plans = {}
+            else:
+                self.schema_cache.pop((self.schema, table_name), None)
+                self.column_plans.pop((self.schema, table_name), None)
+                self.dtype_plans.pop((self.schema, table_name), None)
+
+    def target_columns(
+        self,
+        table_name: str,
+    ) -> dict:
+        """
+        Returns the definition of a target table from the schema cache.
+
+        Tables missing from the cache, for example because they were created
+        or invalidated after it was loaded, are read and cached.
+
+        Args:
+            table_name (String): The name of the target table.
+
+        Returns:
+            Dictionary: column name as key, in table order, and a dictionary
+                of its data_type and max_length as value.
+        """
+
+        key = (self.schema, table_name)
+
+        with self._lock:
+            if key in self.schema_cache:
+                return self.schema_cache[key]
+
+        columns = {
+            column: {"data_type": data_type, "max_length": None}
+            for column, data_type in self.read_column_types(
+                self.target,
+                f"{self.schema}.{table_name}",
+            ).items()
+        }
+
+        if columns:
+            with self._lock:
+                self.schema_cache[key] = columns
+
+        return columns
+
+    def column_plan(
+        self,
+        table_name: str,
+    ) -> list:
+        """
+        Returns the column plan used to align chunks to a target table.
+
+        The plan is the target table's columns, in order, each with the
+        nullable pandas dtype used if the column is missing from a chunk. It
+        is derived once per table from the schema cache.
+
+        Args:
+            table_name (String): The name of the target table.
+
+        Returns:
+            List: a tuple of column name and dtype per column.
+        """
+
+        key = (self.schema, table_name)
+
+        with self._lock:
+            if key in self.column_plans:
+                return self.column_plans[key]
+
+        plan = [
+            (column, null_dtype(definition["data_type"]))
+            for column, definition in self.target_columns(table_name).items()
+        ]
+
+        with self._lock:
+            self.column_plans[key] = plan
+
+        return plan
+
+    def dtype_plan(
+        self,
+        table_name: str,
+    ) -> dict:
+        """
+        Returns the dtypes chunks read for a target table are converted to.
+
+        Derived once per table from the target column types in the schema
+        cache, see dtype_helper.read_dtypes.
+
+        Args:
+            table_name (String): The name of the target table.
+
+        Returns:
+            Dictionary: The dtype of each column to convert.
+        """
+
+        key = (self.schema, table_name)
+
+        with self._lock:
+            if key in self.dtype_plans:
+                return self.dtype_plans[key]
+
+        plan = read_dtypes(
+            self.target_columns(table_name),
+            self.category_max_length,
+        )
+
+        with self._lock:
+            self.dtype_plans[key] = plan
+
+        return plan
+
+    def target_types(
+        self,
+        table_name: str,
+    ) -> dict:
+        """
+        Returns the data type of each column of a target table.
+
+        Args:
+            table_name (String): The name of the target table.
+
+        Returns:
+            Dictionary: column name as key, data type as value.
+        """
+
+        return {
+            column: definition["data_type"]
+            for column, definition in self.target_columns(table_name).items()
+        }
+
+    def read_columns(
+        self,
+        table_name: str,
+        entity_name: str,
+        required: list,
+    ) -> list | None:
+        """
+        Returns the source columns to read for a table.
+
+        Only columns that exist in both the source entity and the target
+        table are read, in target order, so columns that would be dropped by
+        transform_data aren't transferred. Target columns missing from the
+        source are added as NULL by transform_data.
+
+        Args:
+            table_name (String): The name of the target table.
+            entity_name (String): The source entity.
+            required (List): Columns that must be read if they exist in the
+                source, such as the columns the read is ordered by.
+
+        Returns:
+            list | None: The columns to read, None to read every column.
+        """
+
+        target = self.target_columns(table_name)
+        source = self.read_column_types(self.source, entity_name)
+
+        columns = [column for column in target if column in source]
+        columns += [
+            column for column in required
+            if column in source and column not in columns
+        ]
+
+        return columns or None
+
     def read_history(
         self,
         table_name: str,
@@ -129,8 +578,10 @@ class BaseClass(ABC):
         Returns a maximum modified value.
 
         Given a table name and a modified field, returns the maximum value
-        from the instances history table for that table. The datatype of the
-        returned value will be dependent on the subclass it's called from.
+        recorded by the latest run of that table. If the watermarks have been
+        loaded by read_watermarks it's taken from them, otherwise it's read
+        from the instances history table. The datatype of the returned value
+        will be dependent on the subclass it's called from.
 
         Args:
             table_name: The name of the table.
@@ -141,16 +592,23 @@ class BaseClass(ABC):
             Any | None: The maximum modified value.
         """
 
+        with self._lock:
+            if self.watermarks is not None:
+                return self.watermarks.get(table_name)
+
+        if pd.isna(modified_field):
+            return None
+
         query = f"""
-            SELECT TOP(1) {modified_field}
-              FROM {self.schema}.history
-             WHERE table_name = '{table_name}'
+            SELECT TOP(1) {quote(modified_field)}
+              FROM {qualify(self.schema, "history")}
+             WHERE table_name = :table_name
              ORDER BY run_id desc;
         """
 
         df = db.dbms_reader(
             self.target,
-            query=text(query),
+            query=statement(query).bindparams(table_name=table_name),
         )
 
         if df.empty:
@@ -158,6 +616,193 @@ class BaseClass(ABC):
         else:
             return df[modified_field][0]
 
+    def read_watermarks(
+        self,
+    ) -> dict:
+        """
+        Loads the watermark of every table from the watermark table.
+
+        The watermark table holds one row per table, written alongside each
+        history record, so every table's watermark is read in one query
+        regardless of the length of the history. Once loaded, read_history
+        returns watermarks from memory. The fingerprint of each table's
+        source, recorded by its last complete load, is loaded alongside for
+        the change probe, as are when it was last checked for deletes and
+        the chunksize learned by its adaptive runs, served by
+        read_chunksize.
+
+        Returns:
+            Dictionary: The latest modified value of each table, None if its
+                latest run didn't record one.
+        """
+
+        query = f"""
+            SELECT table_name
+                   ,last_modified
+                   ,row_count
+                   ,checksum
+                   ,deletes_checked
+                   ,chunksize
+              FROM {qualify(self.schema, "watermark")};
+        """
+
+        df = db.dbms_reader(
+            self.target,
+            query=statement(query),
+        )
+
+        watermarks = {
+            row.table_name: to_python(row.last_modified)
+            for row in df.itertuples(index=False)
+        }
+
+        fingerprints = {
+            row.table_name: (
+                to_python(row.row_count),
+                to_python(row.checksum),
+            )
+            for row in df.itertuples(index=False)
+            if not pd.isna(row.row_count) and not pd.isna(row.checksum)
+        }
+
+        deletes_checked = {
+            row.table_name: to_python(row.deletes_checked)
+            for row in df.itertuples(index=False)
+            if not pd.isna(row.deletes_checked)
+        }
+
+        chunksizes = {
+            row.table_name: int(row.chunksize)
+            for row in df.itertuples(index=False)
+            if not pd.isna(row.chunksize)
+        }
+
+        with self._lock:
+            self.watermarks = watermarks
+            self.fingerprints = fingerprints
+            self.deletes_checked = deletes_checked
+            self.chunksizes = chunksizes
+
+        return watermarks
+
+    def read_chunksize(
+        self,
+        table_name: str,
+    ) -> int | None:
+        """
+        Returns the chunksize learned for a table on its most recent run.
+
+        If the watermarks have been loaded by read_watermarks it's taken
+        from them, otherwise it's read from the history table.
+
+        Args:
+            table_name: The name of the table.
+
+        Returns:
+            int | None: The learned chunksize, None if there isn't one.
+        """
+
+        with self._lock:
+            if self.chunksizes is not None:
+                return self.chunksizes.get(table_name)
+
+        query = f"""
+            SELECT TOP(1) chunksize
+              FROM {qualify(self.schema, "history")}
+             WHERE table_name = :table_name
+               AND chunksize IS NOT NULL
+             ORDER BY run_id desc;
+        """
+
+        df = db.dbms_reader(
+            self.target,
+            query=statement(query).bindparams(table_name=table_name),
+        )
+
+        if df.empty:
+            return None
+        else:
+            return int(df["chunksize"][0])
+
+    def read_checkpoint(
+        self,
+        table_name: str,
+    ) -> dict | None:
+        """
+        Returns the checkpoint left by a failed load of a table.
+
+        Args:
+            table_name: The name of the table.
+
+        Returns:
+            dict | None: The checkpoint, with the load_method, the
+                ingest_datetime of the failed load, the chunk_count written,
+                the last_modified value fully written and, for keyset reads,
+                the last_key written, None if the table has no checkpoint.
+        """
+
+        query = f"""
+            SELECT load_method
+                   ,ingest_datetime
+                   ,chunk_count
+                   ,last_modified
+                   ,last_key
+              FROM {qualify(self.schema, "checkpoint")}
+             WHERE table_name = :table_name;
+        """
+
+        df = db.dbms_reader(
+            self.target,
+            query=statement(query).bindparams(table_name=table_name),
+        )
+
+        if df.empty:
+            return None
+
+        checkpoint = df.iloc[0].to_dict()
+        checkpoint["last_key"] = (
+            None if pd.isna(checkpoint["last_key"])
+            else json.loads(checkpoint["last_key"])
+        )
+
+        return checkpoint
+
+    @staticmethod
+    def advance_watermark(
+        watermark: tuple,
+        values: pd.Series,
+    ) -> tuple:
+        """
+        Returns the watermark after a chunk read in modified order is written.
+
+        The watermark is a tuple of the highest modified value written and
+        the highest value known to be complete. As records are read in order
+        of modified value, every record with a value below the highest seen
+        has been read, but records sharing the highest value may continue in
+        the next chunk.
+
+        Args:
+            watermark (Tuple): The highest and the complete modified values
+                before the chunk, (None, None) before the first chunk.
+            values (Series): The modified values of the chunk.
+
+        Returns:
+            Tuple: The highest and the complete modified values after the
+                chunk.
+        """
+
+        highest, complete = watermark
+        distinct = values.dropna().drop_duplicates().nlargest(2).tolist()
+
+        if not distinct or (highest is not None and distinct[0] <= highest):
+            return highest, complete
+
+        below = [
+            value for value in distinct[1:] + [highest] if value is not None
+        ]
+
+        return distinct[0], max(below) if below else complete
+
     def transform_data(
         self,
         df: DataFrame,
@@ -174,6 +819,10 @@ class BaseClass(ABC):
         from the DataFrame. This avoids errors when changes are made to the
         source entity. Additionally, adds some metadata.
 
+        The input DataFrame isn't modified and its columns aren't copied, the
+        output is assembled from them alongside the new columns, following
+        the table's column plan.
+
         Args:
             df (DataFrame): The DataFrame to transform.
             table_name (String): The table for whose definition the DataFrame
@@ -185,29 +834,24 @@ class BaseClass(ABC):
                 table.
         """
 
-        df["ingest_datetime"] = start_time
-        df["current_record"] = True
-
-        # Get column list only
-        fields = db.dbms_reader(
-            self.target,
-            query=text(
-                f"""
-                SELECT TOP(0) *
-                  FROM {self.schema}.{table_name}
-            """,
-            ),
-        ).columns
-
-        missing_fields = set(fields) - set(df.columns)
-        if missing_fields:
-            new_cols = pd.DataFrame(
-                {col: [None] * len(df) for col in missing_fields},
-            )
-
-            df = pd.concat([df, new_cols], axis=1)
-
-        return df[fields]
+        columns = []
+        for field, dtype in self.column_plan(table_name):
+            if field == "ingest_datetime":
+                column = pd.Series(start_time, index=df.index)
+            elif field == "current_record":
+                column = pd.Series(True, index=df.index)
+            elif field in df.columns:
+                column = df[field]
+            else:
+                column = pd.Series(index=df.index, dtype=dtype)
+
+            columns.append(column)
+
+        return pd.concat(
+            columns,
+            axis=1,
+            keys=[field for field, _ in self.column_plan(table_name)],
+        )
 
     # side-effect heavy with no returns
     # skipping unit test.
@@ -218,6 +862,10 @@ class BaseClass(ABC):
         load_method: str,
         business_key: str,
         chunk_count: int,
+        write_engine: str = "default",
+        staging: Optional[str] = None,
+        upsert_method: str = "in",
+        insert_only: bool = False,
     ) -> None:  # pragma: no cover
         """
         Writes a given DataFrame to the Deltalake.
@@ -232,223 +880,2110 @@ class BaseClass(ABC):
             load_method (String): The method by which to load the data, either
                 incrementally, or by truncating and populating.
             business_key (String): The business key for the table, required if
-                using an incremental load method.
+                using an incremental load method. Keys of more than one
+                column are comma separated.
             chunk_count (Integer): The number of chunks already written.
                 Alters the behaviour of the load method, if set to truncate
                 the data will be appended for subsequent chunks (so as not to
                 truncate the preceding chunks).
+            write_engine (String): The engine used to write the DataFrame to
+                the staging table, see write_staging.
+            staging (String, optional): The staging table for the run, as
+                created by create_staging. If None, a staging table is
+                created for this chunk and dropped once it's written.
+            upsert_method (String): How incremental loads expire updated
+                records, see upsert_statements.
+            insert_only (Boolean): Whether the DataFrame can be inserted
+                without expiring any records, as none of its keys are in the
+                target table.
 
         Returns:
             None.
         """
 
-        # write to a temporary table first
-        db.dbms_writer(
-            self.target,
-            df,
-            f"{table_name}_temp",
-            schema=self.schema,
-        )
-
-        with self.target.connect() as cnxn:
+        temporary = staging is None
+        if staging is None:
+            staging = f"{table_name}_temp"
+            self.create_staging(table_name, staging)
 
-            if load_method == "incremental":
-                # Update any existing records in target table
-                update = f"""
-                    UPDATE {self.schema}.{table_name}
-                       SET current_record = 0
-                     WHERE {business_key} IN (
-                          SELECT {business_key}
-                            FROM {self.schema}.{table_name}_temp
-                        );
-                """
+        # write to the staging table first
+        self.write_staging(df, staging, write_engine)
 
-                cnxn.execute(text(update))
+        with self.target.connect() as cnxn:
 
-            elif chunk_count == 1:
-                # Only truncate table on first chunk
-                truncate = f"""
-                    TRUNCATE TABLE {self.schema}.{table_name};
-                """
+            if load_method in self.versioned_methods and not insert_only:
+                # Expire any existing records in target table and insert
+                # the new versions
+                for upsert in self.upsert_statements(
+                    table_name,
+                    business_key,
+                    staging,
+                    upsert_method,
+                ):
+                    cnxn.execute(statement(upsert))
 
-                cnxn.execute(text(truncate))
+            else:
+                # Appends and versioned inserts add to the table
+                truncate = load_method not in (
+                    self.versioned_methods + self.incremental_methods
+                )
 
-            insert = f"""
-                INSERT INTO {self.schema}.{table_name}
-                SELECT *
-                  FROM {self.schema}.{table_name}_temp;
-            """
+                if truncate and chunk_count == 1:
+                    # Only truncate table on first chunk
+                    truncate_table = f"""
+                        TRUNCATE TABLE {qualify(self.schema, table_name)};
+                    """
 
-            cnxn.execute(text(insert))
+                    cnxn.execute(statement(truncate_table))
 
-            drop = f"""
-                DROP TABLE {self.schema}.{table_name}_temp;
-            """
+                insert = f"""
+                    INSERT INTO {qualify(self.schema, table_name)}
+                    SELECT *
+                      FROM {qualify(self.schema, staging)};
+                """
 
-            cnxn.execute(text(drop))
+                cnxn.execute(statement(insert))
 
             cnxn.close()
 
-    # side-effect heavy with no returns
-    # skipping unit test.
-    def write_to_history(
+        if temporary:
+            self.drop_staging(staging)
+
+    def upsert_statements(
         self,
-        run_id: int,
+        table_name: str,
+        business_key: str,
+        staging: str,
+        upsert_method: str = "in",
+    ) -> list:
+        """
+        Returns the statements for an incremental write from a staging table.
+
+        Each method marks the current version of every record in the staging
+        table as no longer current, then inserts the staged records. Only
+        records with current_record = 1 are expired.
+            in: UPDATE ... WHERE business_key IN the staging table, or WHERE
+                EXISTS in it for keys of more than one column.
+            join: UPDATE joined to the distinct keys in the staging table.
+            merge: a single MERGE expiring records matched by the current
+                staged version of each key, nested in an INSERT of its output
+                so the new versions of matched records are written in the
+                same statement.
+
+        Args:
+            table_name (String): The name of the target table.
+            business_key (String): The business key for the table, comma
+                separated for keys of more than one column.
+            staging (String): The name of the staging table.
+            upsert_method (String): The method, one of upsert_methods.
+
+        Returns:
+            List: the SQL statements to execute in order.
+        """
+
+        if upsert_method not in self.upsert_methods:
+            raise ValueError(f"Unknown upsert_method: {upsert_method}")
+
+        target = qualify(self.schema, table_name)
+        source = qualify(self.schema, staging)
+        keys = key_columns(business_key)
+
+        insert = f"""
+                INSERT INTO {target}
+                SELECT *
+                  FROM {source};
+            """
+
+        if upsert_method == "in" and len(keys) == 1:
+            update = f"""
+                UPDATE {target}
+                   SET current_record = 0
+                 WHERE current_record = 1
+                   AND {quote(keys[0])} IN (
+                      SELECT {quote(keys[0])}
+                        FROM {source}
+                    );
+            """
+
+            return [update, insert]
+
+        if upsert_method == "in":
+            update = f"""
+                UPDATE tgt
+                   SET current_record = 0
+                  FROM {target} AS tgt
+                 WHERE tgt.current_record = 1
+                   AND EXISTS (
+                      SELECT 1
+                        FROM {source} AS src
+                       WHERE {key_join(keys, "src", "tgt")}
+                    );
+            """
+
+            return [update, insert]
+
+        if upsert_method == "join":
+            update = f"""
+                UPDATE tgt
+                   SET current_record = 0
+                  FROM {target} AS tgt
+                 INNER JOIN (
+                      SELECT DISTINCT {", ".join(map(quote, keys))}
+                        FROM {source}
+                    ) AS src
+                    ON {key_join(keys, "tgt", "src")}
+                 WHERE tgt.current_record = 1;
+            """
+
+            return [update, insert]
+
+        columns = [quote(column) for column in self.target_columns(table_name)]
+        column_list = ", ".join(columns)
+        source_list = ", ".join(f"src.{column}" for column in columns)
+
+        # Superseded versions staged alongside the current version of a key
+        # don't match, so each target record is matched at most once and
+        # they're inserted as they are.
+        merge = f"""
+                INSERT INTO {target} ({column_list})
+                SELECT {column_list}
+                  FROM (
+                      MERGE {target} WITH (HOLDLOCK) AS tgt
+                      USING {source} AS src
+                         ON {key_join(keys, "tgt", "src")}
+                        AND tgt.current_record = 1
+                        AND src.current_record = 1
+                       WHEN MATCHED THEN
+                            UPDATE SET tgt.current_record = 0
+                       WHEN NOT MATCHED BY TARGET THEN
+                            INSERT ({column_list})
+                            VALUES ({source_list})
+                     OUTPUT $action AS merge_action, {source_list}
+                  ) AS changes
+                 WHERE merge_action = 'UPDATE';
+            """
+
+        return [merge]
+
+    @staticmethod
+    def flag_current(
+        df: DataFrame,
+        business_key: Any,
+        modified_field: Optional[str] = None,
+    ) -> DataFrame:
+        """
+        Flags all but the latest version of each key in a chunk as expired.
+
+        A chunk of an incremental load may hold several versions of the same
+        record. Only the latest, by modified_field if given, else the last
+        read, keeps current_record = True.
+
+        Args:
+            df (DataFrame): The chunk, as returned by transform_data.
+            business_key (Any): The business key for the table, comma
+                separated or as a list of columns.
+            modified_field (String, optional): The field recording when each
+                record was last modified.
+
+        Returns:
+            DataFrame: The chunk, with current_record set.
+        """
+
+        keys = key_columns(business_key)
+
+        ordered = df
+        if modified_field is not None and not pd.isna(modified_field):
+            ordered = df.sort_values(modified_field, kind="stable")
+
+        superseded = ordered.duplicated(keys, keep="last")
+        if not superseded.any():
+            return df
+
+        return df.assign(current_record=~superseded.reindex(df.index))
+
+    def read_max_key(
+        self,
+        table_name: str,
+        business_key: Any,
+    ) -> Optional[tuple]:
+        """
+        Returns the highest business key of the current records of a table.
+
+        Keys are ordered as key_order orders them, so they compare in Python
+        as they do in SQL Server.
+
+        Args:
+            table_name (String): The name of the table.
+            business_key (Any): The business key for the table, comma
+                separated or as a list of columns.
+
+        Returns:
+            Tuple | None: The values of the highest key, or None if the
+                table has no current records.
+        """
+
+        keys = key_columns(business_key)
+        order = key_order(keys, self.target_types(table_name), "desc")
+
+        query = f"""
+            SELECT TOP(1) {", ".join(map(quote, keys))}
+              FROM {qualify(self.schema, table_name)}
+             WHERE current_record = 1
+             ORDER BY {order};
+        """
+
+        df = db.dbms_reader(
+            self.target,
+            query=statement(query),
+        )
+
+        if df.empty:
+            return None
+
+        return tuple(to_python(value) for value in df.iloc[0][keys])
+
+    @staticmethod
+    def key_bounds(
+        df: DataFrame,
+        business_key: Any,
+    ) -> tuple:
+        """
+        Returns the lowest and highest business key of a chunk.
+
+        Records with a NULL key are ignored.
+
+        Args:
+            df (DataFrame): The chunk.
+            business_key (Any): The business key for the table, comma
+                separated or as a list of columns.
+
+        Returns:
+            Tuple: The lowest and highest key, each a tuple of values, or
+                None if the chunk has no keys.
+        """
+
+        keys = key_columns(business_key)
+        values = df[keys].dropna()
+
+        if values.empty:
+            return None, None
+
+        if len(keys) == 1:
+            column = values[keys[0]]
+            return (to_python(column.min()),), (to_python(column.max()),)
+
+        rows = [
+            tuple(to_python(value) for value in row)
+            for row in values.itertuples(index=False, name=None)
+        ]
+
+        return min(rows), max(rows)
+
+    @staticmethod
+    def insert_only(
+        low: Optional[tuple],
+        max_key: Optional[tuple],
+    ) -> bool:
+        """
+        Returns whether a chunk's keys are all above the target's keys.
+
+        Args:
+            low (Tuple, optional): The lowest key of the chunk, as returned
+                by key_bounds.
+            max_key (Tuple, optional): The highest key of the target's
+                current records, None if it has none.
+
+        Returns:
+            Boolean: True if the chunk can be inserted without expiring any
+                records.
+        """
+
+        if low is None:
+            return False
+
+        try:
+            return max_key is None or low > max_key
+        except TypeError:
+            return False
+
+    def diff_chunk(
+        self,
+        df: DataFrame,
+        table_name: str,
+        business_key: Any,
+        stored: pd.Series,
+    ) -> tuple:
+        """
+        Returns the records of a chunk that are new or changed.
+
+        Each current record is hashed on its business key and, separately,
+        on every column but the metadata columns. Records whose key has no
+        stored hash, or whose values hash differently to the stored hash,
+        are returned, alongside their hashes to store once written.
+
+        Args:
+            df (DataFrame): The chunk, as returned by flag_current.
+            table_name (String): The table being written to.
+            business_key (Any): The business key for the table, comma
+                separated or as a list of columns.
+            stored (Series): The row hash of each key already loaded,
+                indexed by key hash, as returned by read_row_hashes.
+
+        Returns:
+            Tuple: The new or changed records, and a DataFrame of their
+                table_name, key_hash and row_hash.
+        """
+
+        df = df[df["current_record"].astype(bool)]
+
+        keys = key_columns(business_key)
+        columns = [
+            column for column in df.columns
+            if column not in self.metadata_columns
+        ]
+
+        key_hashes = hash_columns(df, keys)
+        row_hashes = hash_columns(df, columns)
+        changed = changed_rows(key_hashes, row_hashes, stored)
+
+        hashes = DataFrame({
+            "table_name": table_name,
+            "key_hash": key_hashes[changed],
+            "row_hash": row_hashes[changed],
+        })
+
+        return df[changed], hashes
+
+    def read_row_hashes(
+        self,
+        table_name: str,
+    ) -> pd.Series:
+        """
+        Returns the stored row hash of every key of a diff loaded table.
+
+        Args:
+            table_name (String): The name of the table.
+
+        Returns:
+            Series: The row hash of each key, indexed by key hash.
+        """
+
+        query = f"""
+            SELECT key_hash
+                   ,row_hash
+              FROM {qualify(self.schema, "row_hash")}
+             WHERE table_name = :table_name;
+        """
+
+        df = db.dbms_reader(
+            self.target,
+            query=statement(query).bindparams(table_name=table_name),
+        )
+
+        return pd.Series(
+            df["row_hash"].to_numpy(dtype="int64"),
+            index=pd.Index(df["key_hash"].to_numpy(dtype="int64")),
+        )
+
+    # side-effect heavy with no returns
+    # skipping unit test.
+    def write_row_hashes(
+        self,
+        hashes: DataFrame,
+        table_name: str,
+        staging: str,
+        write_engine: str = "default",
+    ) -> None:  # pragma: no cover
+        """
+        Stores the row hashes of the records written by a diff load.
+
+        The hashes are written to their own staging table, then merged into
+        the row_hash table, replacing the stored hash of each key.
+
+        Args:
+            hashes (DataFrame): The table_name, key_hash and row_hash of
+                each record written, as returned by diff_chunk.
+            table_name (String): The table written to.
+            staging (String): The staging table for the hashes, created by
+                create_staging from the row_hash table.
+            write_engine (String): The engine used to write the hashes to
+                the staging table, see write_staging.
+
+        Returns:
+            None.
+        """
+
+        self.write_staging(hashes, staging, write_engine)
+
+        merge = f"""
+            WITH tgt AS (
+                SELECT table_name
+                       ,key_hash
+                       ,row_hash
+                  FROM {qualify(self.schema, "row_hash")}
+                 WHERE table_name = :table_name
+            )
+            MERGE tgt
+            USING {qualify(self.schema, staging)} AS src
+               ON tgt.key_hash = src.key_hash
+             WHEN MATCHED THEN
+                  UPDATE SET row_hash = src.row_hash
+             WHEN NOT MATCHED THEN
+                  INSERT (table_name, key_hash, row_hash)
+                  VALUES (src.table_name, src.key_hash, src.row_hash);
+        """
+
+        with self.target.connect() as cnxn:
+            cnxn.execute(statement(merge), {"table_name": table_name})
+            cnxn.close()
+
+    @staticmethod
+    def staging_name(
+        table_name: str,
+        run_id: int,
+    ) -> str:
+        """
+        Returns the name of a table's staging table for a run.
+
+        The run_id is unique to each run, so concurrent runs don't share a
+        staging table.
+
+        Args:
+            table_name (String): The name of the target table.
+            run_id (Integer): The run_id for the class instance.
+
+        Returns:
+            String: The name of the staging table.
+        """
+
+        return f"{table_name}_stage_{run_id}"
+
+    # side-effect heavy with no returns
+    # skipping unit test.
+    def create_staging(
+        self,
+        table_name: str,
+        staging: str,
+    ) -> None:  # pragma: no cover
+        """
+        Creates an empty staging table with the target table's definition.
+
+        Any existing table with the same name, for example left by a failed
+        run with keep_staging set, is replaced.
+
+        Args:
+            table_name (String): The name of the target table.
+            staging (String): The name of the staging table.
+
+        Returns:
+            None.
+        """
+
+        with self.target.connect() as cnxn:
+            create = f"""
+                DROP TABLE IF EXISTS {qualify(self.schema, staging)};
+
+                SELECT TOP(0) *
+                  INTO {qualify(self.schema, staging)}
+                  FROM {qualify(self.schema, table_name)};
+            """
+
+            cnxn.execute(statement(create))
+
+            cnxn.close()
+
+    @staticmethod
+    def shadow_name(
+        table_name: str,
+        run_id: int,
+    ) -> str:
+        """
+        Returns the name of the shadow table a swap load is written to.
+
+        Args:
+            table_name (String): The name of the target table.
+            run_id (Integer): The run_id for the class instance.
+
+        Returns:
+            String: The name of the shadow table.
+        """
+
+        return f"{table_name}_shadow_{run_id}"
+
+    # side-effect heavy with no returns
+    # skipping unit test.
+    def swap_table(
+        self,
+        table_name: str,
+        shadow: str,
+        run_id: int,
+        indexes: Optional[list] = None,
+    ) -> None:  # pragma: no cover
+        """
+        Swaps a fully loaded shadow table in for its target table.
+
+        The shadow table's indexes are created first, then both tables are
+        renamed in a single transaction, which only changes metadata, and the
+        previous table is dropped. If the swap fails the target table is left
+        as it was.
+
+        Args:
+            table_name (String): The name of the target table.
+            shadow (String): The name of the loaded shadow table.
+            run_id (Integer): The run_id for the class instance.
+            indexes (List, optional): The indexes to create on the shadow
+                table, as returned by index_helper.index_definitions.
+
+        Returns:
+            None.
+        """
+
+        previous = f"{table_name}_previous_{run_id}"
+
+        with self.target.connect() as cnxn:
+            for index in indexes or []:
+                cnxn.execute(statement(index_ddl(self.schema, shadow, index)))
+
+            swap = f"""
+                SET XACT_ABORT ON;
+
+                BEGIN TRANSACTION;
+
+                EXEC sp_rename :table_name, :previous;
+                EXEC sp_rename :shadow, :target;
+
+                COMMIT TRANSACTION;
+
+                DROP TABLE {qualify(self.schema, previous)};
+            """
+
+            cnxn.execute(
+                statement(swap).bindparams(
+                    table_name=qualify(self.schema, table_name),
+                    previous=previous,
+                    shadow=qualify(self.schema, shadow),
+                    target=table_name,
+                ),
+            )
+
+            cnxn.close()
+
+        self.invalidate_schema_cache(table_name)
+
+    # side-effect heavy with no returns
+    # skipping unit test.
+    def drop_staging(
+        self,
+        staging: str,
+    ) -> None:  # pragma: no cover
+        """
+        Drops a staging table.
+
+        Args:
+            staging (String): The name of the staging table.
+
+        Returns:
+            None.
+        """
+
+        with self.target.connect() as cnxn:
+            drop = f"""
+                DROP TABLE IF EXISTS {qualify(self.schema, staging)};
+            """
+
+            cnxn.execute(statement(drop))
+
+            cnxn.close()
+
+    # side-effect heavy with no returns
+    # skipping unit test.
+    def write_staging(
+        self,
+        df: DataFrame,
+        staging: str,
+        write_engine: str = "default",
+        truncate: bool = True,
+    ) -> None:  # pragma: no cover
+        """
+        Replaces the contents of a staging table with a DataFrame.
+
+        The staging table is truncated, unless appending, then the DataFrame
+        is inserted with the given engine:
+            default: pandas to_sql.
+            executemany: a parameterised insert using fast_executemany.
+            values: multi-row VALUES inserts, batched to SQL Server's limits
+                of 2100 parameters and 1000 rows per statement.
+            bulk: the DataFrame is written to a file loaded with bcp.
+
+        Args:
+            df (DataFrame): The DataFrame to write out, aligned to the target
+                table by transform_data.
+            staging (String): The name of the staging table.
+            write_engine (String): The engine to write with.
+            truncate (Boolean): Whether to truncate the staging table first,
+                or append to it.
+
+        Returns:
+            None.
+        """
+
+        if write_engine not in WRITE_ENGINES:
+            raise ValueError(f"Unknown write_engine: {write_engine}")
+
+        if truncate:
+            with self.target.connect() as cnxn:
+                clear = f"""
+                    TRUNCATE TABLE {qualify(self.schema, staging)};
+                """
+
+                cnxn.execute(statement(clear))
+
+                cnxn.close()
+
+        table = qualify(self.schema, staging)
+
+        if write_engine == "default":
+            df.to_sql(
+                staging,
+                self.target,
+                schema=self.schema,
+                if_exists="append",
+                index=False,
+            )
+
+        elif write_engine == "executemany":
+            write_executemany(self.target, df, table)
+
+        elif write_engine == "values":
+            write_values(self.target, df, table)
+
+        else:
+            write_bulk(self.target, df, table, self.bcp_path, self.bcp_args)
+
+    # side-effect heavy with no returns
+    # skipping unit test.
+    def write_checkpoint(
+        self,
+        run_id: int,
+        table_name: str,
+        load_method: str,
+        ingest_datetime: datetime,
+        chunk_count: int,
+        last_modified: Any,
+        last_key: Optional[list] = None,
+    ) -> None:  # pragma: no cover
+        """
+        Records the progress of a load in the checkpoint table.
+
+        Args:
+            run_id (Integer): The run_id for the current run.
+            table_name (String): The table being written to.
+            load_method (String): The load method used to write to the
+                table.
+            ingest_datetime (DateTime): The ingest_datetime of the records
+                written by the load.
+            chunk_count (Integer): The number of chunks written.
+            last_modified (Any): The highest modified value for which every
+                record has been written.
+            last_key (List, optional): For keyset reads, the key values of
+                the last record written, the record with modified value
+                last_modified.
+
+        Returns:
+            None.
+        """
+
+        ingest_param = param("ingest_datetime", "datetime")
+
+        upsert = f"""
+            MERGE {qualify(self.schema, "checkpoint")} AS tgt
+            USING (SELECT :table_name AS table_name) AS src
+               ON tgt.table_name = src.table_name
+             WHEN MATCHED THEN
+                  UPDATE SET run_id = :run_id
+                             ,load_method = :load_method
+                             ,ingest_datetime = {ingest_param}
+                             ,chunk_count = :chunk_count
+                             ,last_modified = :last_modified
+                             ,last_key = :last_key
+                             ,updated = GETDATE()
+             WHEN NOT MATCHED THEN
+                  INSERT (
+                      table_name
+                      ,run_id
+                      ,load_method
+                      ,ingest_datetime
+                      ,chunk_count
+                      ,last_modified
+                      ,last_key
+                      ,updated
+                  )
+                  VALUES (
+                      :table_name
+                      ,:run_id
+                      ,:load_method
+                      ,{ingest_param}
+                      ,:chunk_count
+                      ,:last_modified
+                      ,:last_key
+                      ,GETDATE()
+                  );
+        """
+
+        with self.target.connect() as cnxn:
+            cnxn.execute(
+                statement(upsert),
+                {
+                    "table_name": table_name,
+                    "run_id": run_id,
+                    "load_method": load_method,
+                    "ingest_datetime": ingest_datetime,
+                    "chunk_count": chunk_count,
+                    "last_modified": to_python(last_modified),
+                    "last_key": (
+                        None if last_key is None
+                        else json.dumps(
+                            [to_python(value) for value in last_key],
+                            default=str,
+                        )
+                    ),
+                },
+            )
+
+            cnxn.close()
+
+    # side-effect heavy with no returns
+    # skipping unit test.
+    def clear_checkpoint(
+        self,
+        table_name: str,
+    ) -> None:  # pragma: no cover
+        """
+        Removes the checkpoint for a table once its load has completed.
+
+        Args:
+            table_name (String): The table that was written to.
+
+        Returns:
+            None.
+        """
+
+        delete = f"""
+            DELETE FROM {qualify(self.schema, "checkpoint")}
+             WHERE table_name = :table_name;
+        """
+
+        with self.target.connect() as cnxn:
+            cnxn.execute(statement(delete), {"table_name": table_name})
+            cnxn.close()
+
+    # side-effect heavy with no returns
+    # skipping unit test.
+    def rollback_checkpoint(
+        self,
+        table_name: str,
+        modified_field: str,
+        checkpoint: dict,
+        keyset: Optional[list] = None,
+    ) -> None:  # pragma: no cover
+        """
+        Removes records written by a failed load after its checkpoint.
+
+        Records written by the failed load that sort after the checkpoint
+        may be incomplete, these are deleted so that they can be read again
+        when the load resumes. For keyset reads the checkpoint is the exact
+        position of the last record written, otherwise it's the highest
+        modified value fully written. Without either, every record written
+        by the failed load is deleted.
+
+        Args:
+            table_name (String): The table that was written to.
+            modified_field (String): The name of the field containing the
+                modified value.
+            checkpoint (Dictionary): The checkpoint, as returned by
+                read_checkpoint.
+            keyset (List, optional): Key columns of a keyset read.
+
+        Returns:
+            None.
+        """
+
+        position = []
+        values = []
+
+        if not pd.isna(modified_field) and not pd.isna(
+            checkpoint["last_modified"],
+        ):
+            position.append(modified_field)
+            values.append(checkpoint["last_modified"])
+
+        if keyset is not None and checkpoint["last_key"] is not None:
+            position += keyset
+            values += checkpoint["last_key"]
+
+        types = self.target_types(table_name)
+
+        after = f"AND {keyset_predicate(position, types)}" if position else ""
+
+        delete = f"""
+            DELETE FROM {qualify(self.schema, table_name)}
+             WHERE ingest_datetime = {param("ingest_datetime", "datetime")}
+                   {after};
+        """
+
+        with self.target.connect() as cnxn:
+            cnxn.execute(
+                statement(delete),
+                {
+                    "ingest_datetime": to_python(
+                        checkpoint["ingest_datetime"],
+                    ),
+                    **keyset_params(values),
+                },
+            )
+
+            cnxn.close()
+
+    # side-effect heavy with no returns
+    # skipping unit test.
+    def write_to_history(
+        self,
+        run_id: int,
         table_name: str,
         load_method: str,
         modified_field: str,
         start_time: datetime,
         end_time: datetime,
         rows_processed: int,
+        chunksize: Optional[int] = None,
+        max_modified: Any = None,
+        fingerprint: Optional[tuple] = None,
+        chunks: Optional[int] = None,
+        insert_only_chunks: Optional[int] = None,
+        verify: bool = True,
+    ) -> None:  # pragma: no cover
+        """
+        Writes metadata to the history table.
+
+        Given a DataFrame and some metadata, write out to the history table.
+
+        Args:
+            run_id (Integer): The run_id for the current run.
+            table_name (Sring): The table that was written out to.
+            load_method (String): The load method used to write to the
+                table.
+            modified_field: The name of the field containing the modified
+                value, used for incremental loads.
+            start_time (DateTime): The date and time the table run started.
+            end_time (DateTime): The date and time the table run ended.
+            rows_processed (Integer): How many rows were written to the
+                table.
+            chunksize (Integer, optional): The chunksize learned during an
+                adaptive run, used as the starting size of the next run.
+            max_modified (Any, optional): The highest modified value written,
+                tracked as chunks were written. If None, or if the run is
+                sampled for verification (see verify_watermark), it's read
+                from the target table instead.
+            fingerprint (Tuple, optional): The row count and checksum of the
+                source, as probed before a complete load, recorded for the
+                change probe of the next run.
+            chunks (Integer, optional): The number of chunks written.
+            insert_only_chunks (Integer, optional): How many of the chunks
+                were inserted without expiring any records, every chunk of
+                an append load and those of an incremental load that took
+                the fast path.
+            verify (Boolean): Whether max_modified may be read from the
+                target table. If False, max_modified is recorded as given,
+                as when a failed load keeps its previous watermark.
+
+        Returns:
+            None.
+        """
+
+        time_taken = int((end_time - start_time).total_seconds())
+
+        incremental = load_method in self.incremental_methods
+
+        with self.target.connect() as cnxn:
+
+            if incremental and verify and (
+                max_modified is None or random() < self.verify_watermark
+            ):
+                # Read from target to verify the actual max value
+                query = f"""
+                    SELECT MAX({quote(modified_field)}) AS max_modified
+                      FROM {qualify(self.schema, table_name)}
+                     WHERE current_record = 1;
+                """
+
+                target_modified = to_python(db.dbms_reader(
+                    cnxn,
+                    query=statement(query),
+                )["max_modified"][0])
+
+                if (
+                    max_modified is not None
+                    and pd.Timestamp(to_python(max_modified))
+                    != pd.Timestamp(target_modified)
+                ):
+                    with self._lock:
+                        self.watermark_mismatches.append(
+                            (table_name, max_modified, target_modified),
+                        )
+
+                max_modified = target_modified
+
+            # The watermark of non-incremental loads isn't recorded
+            last_modified = to_python(max_modified) if incremental else None
+            modified_column = (
+                f",{quote(modified_field)}"
+                if last_modified is not None else ""
+            )
+            modified_value = (
+                ",:last_modified" if last_modified is not None else ""
+            )
+
+            # The history and watermark are written in one transaction, so
+            # the watermark always matches the latest history.
+            insert = f"""
+                SET XACT_ABORT ON;
+
+                BEGIN TRANSACTION;
+
+                INSERT INTO {qualify(self.schema, "history")} (
+                    run_id
+                    ,table_name
+                    ,start_time
+                    ,end_time
+                    ,time_taken
+                    ,rows_processed
+                    ,chunksize
+                    ,chunks
+                    ,insert_only_chunks
+                    {modified_column}
+                )
+
+                VALUES (
+                    :run_id
+                    ,:table_name
+                    ,{param("start_time", "datetime")}
+                    ,{param("end_time", "datetime")}
+                    ,:time_taken
+                    ,:rows_processed
+                    ,:chunksize
+                    ,:chunks
+                    ,:insert_only_chunks
+                    {modified_value}
+                );
+
+                MERGE {qualify(self.schema, "watermark")} WITH (HOLDLOCK)
+                      AS tgt
+                USING (SELECT :table_name AS table_name) AS src
+                   ON tgt.table_name = src.table_name
+                 WHEN MATCHED THEN
+                      UPDATE SET last_modified = :last_modified
+                                 ,chunksize = COALESCE(
+                                     :chunksize,
+                                     tgt.chunksize
+                                 )
+                                 ,row_count = :row_count
+                                 ,checksum = :checksum
+                                 ,run_id = :run_id
+                                 ,updated = GETDATE()
+                 WHEN NOT MATCHED THEN
+                      INSERT (table_name, last_modified, chunksize,
+                              row_count, checksum, run_id, updated)
+                      VALUES (src.table_name, :last_modified, :chunksize,
+                              :row_count, :checksum, :run_id, GETDATE());
+
+                COMMIT TRANSACTION;
+            """
+
+            cnxn.execute(
+                statement(insert),
+                {
+                    "run_id": run_id,
+                    "table_name": table_name,
+                    "start_time": start_time,
+                    "end_time": end_time,
+                    "time_taken": time_taken,
+                    "rows_processed": int(rows_processed),
+                    "chunksize": None if chunksize is None else int(chunksize),
+                    "chunks": chunks,
+                    "insert_only_chunks": insert_only_chunks,
+                    "last_modified": last_modified,
+                    "row_count": None if fingerprint is None
+                    else fingerprint[0],
+                    "checksum": None if fingerprint is None
+                    else fingerprint[1],
+                },
+            )
+
+            cnxn.close()
+
+        with self._lock:
+            if self.watermarks is not None:
+                self.watermarks[table_name] = last_modified
+            if self.chunksizes is not None and chunksize is not None:
+                self.chunksizes[table_name] = int(chunksize)
+            if self.fingerprints is not None:
+                if fingerprint is None:
+                    self.fingerprints.pop(table_name, None)
+                else:
+                    self.fingerprints[table_name] = fingerprint
+
+    def read_durations(
+        self,
+    ) -> dict:
+        """
+        Returns the recent average duration and row count for each table.
+
+        Reads the instance's history table once, averaging time_taken and
+        rows_processed over the most recent schedule_runs runs of each
+        table.
+
+        Args:
+            None.
+
+        Returns:
+            Dictionary: table name as key, and a tuple of the average time
+                taken in seconds and the average rows processed as value.
+        """
+
+        query = f"""
+            SELECT table_name
+                   ,AVG(CAST(time_taken AS FLOAT)) AS time_taken
+                   ,AVG(CAST(rows_processed AS FLOAT)) AS rows_processed
+              FROM (
+                   SELECT table_name
+                          ,time_taken
+                          ,rows_processed
+                          ,ROW_NUMBER() OVER (
+                              PARTITION BY table_name
+                              ORDER BY run_id desc
+                          ) AS run_rank
+                     FROM {qualify(self.schema, "history")}
+                   ) AS recent
+             WHERE run_rank <= :schedule_runs
+             GROUP BY table_name;
+        """
+
+        df = db.dbms_reader(
+            self.target,
+            query=statement(query).bindparams(
+                schedule_runs=self.schedule_runs,
+            ),
+        )
+
+        return {
+            row["table_name"]: (row["time_taken"], row["rows_processed"])
+            for _, row in df.iterrows()
+        }
+
+    def estimate_rows(
+        self,
+        entity_names: list,
+    ) -> dict:
+        """
+        Returns an estimated row count for each source entity.
+
+        Used to schedule tables that have no history. Subclasses should
+        overwrite this where the source system can provide a cheap estimate,
+        by default no estimates are returned.
+
+        Args:
+            entity_names (List): The entities to estimate.
+
+        Returns:
+            Dictionary: entity name as key, estimated row count as value.
+        """
+
+        return {}
+
+    def schedule_tables(
+        self,
+        params: dict,
+        durations: dict,
+        row_counts: dict,
+    ) -> list:
+        """
+        Returns the tables ordered longest first, with their estimates.
+
+        Each table's duration is taken from its history where available.
+        Otherwise it is estimated from the source row count at the average
+        rate of the tables that do have history, and tables with neither
+        are assumed to be quick. Tables are then assigned longest first to
+        whichever worker is free soonest, which is the order the worker
+        pool will start them in.
+
+        Args:
+            params (Dictionary): Entity parameters, as returned by
+                read_params.
+            durations (Dictionary): Table durations, as returned by
+                read_durations.
+            row_counts (Dictionary): Entity row counts, as returned by
+                estimate_rows.
+
+        Returns:
+            List: a dictionary per table, with the table name, estimated
+                seconds, the basis of the estimate, and the worker it's
+                expected to run on.
+        """
+
+        total_time = sum(time for time, _ in durations.values())
+        total_rows = sum(rows for _, rows in durations.values())
+        seconds_per_row = total_time / total_rows if total_rows else 0.0
+
+        plan = []
+        for table, parameters in params.items():
+            entity_name = parameters["entity_name"]
+
+            if table in durations:
+                estimate, basis = durations[table][0], "history"
+            elif entity_name in row_counts:
+                estimate = row_counts[entity_name] * seconds_per_row
+                basis = "row_count"
+            else:
+                estimate, basis = 0.0, "none"
+
+            plan.append({
+                "table_name": table,
+                "estimate": float(estimate),
+                "basis": basis,
+            })
+
+        plan.sort(key=lambda entry: entry["estimate"], reverse=True)
+
+        workers = [0.0] * max(self.source_workers, self.target_workers)
+        for entry in plan:
+            worker = workers.index(min(workers))
+            workers[worker] += entry["estimate"]
+            entry["worker"] = worker
+
+        return plan
+
+    def plan_tables(
+        self,
+        params: dict,
+    ) -> dict:
+        """
+        Returns the entity parameters reordered longest table first.
+
+        Estimates each table's duration and records the chosen plan in
+        self.plan for inspection. If no estimates can be read the order
+        from read_params is kept.
+
+        Args:
+            params (Dictionary): Entity parameters, as returned by
+                read_params.
+
+        Returns:
+            Dictionary: The entity parameters in scheduled order.
+        """
+
+        durations = self.read_durations()
+
+        # Only estimate from the source where history is missing
+        unseen = [
+            parameters["entity_name"]
+            for table, parameters in params.items()
+            if table not in durations
+        ]
+        row_counts = self.estimate_rows(unseen) if unseen else {}
+
+        self.plan = self.schedule_tables(params, durations, row_counts)
+
+        return {
+            entry["table_name"]: params[entry["table_name"]]
+            for entry in self.plan
+        }
+
+    @staticmethod
+    def modified_probe(
+        parameters: dict,
+    ) -> bool:
+        """
+        Returns whether a table is probed for changes on its modified field.
+
+        Incremental and append tables with a modified field only load
+        records modified after their watermark, so are unchanged while the
+        source's highest modified value hasn't passed it. Other tables are
+        probed with a fingerprint of the whole table.
+
+        Args:
+            parameters (Dictionary): The entity parameters for the table.
+
+        Returns:
+            Boolean: True if probed on the modified field, False if probed
+                with a fingerprint.
+        """
+
+        return (
+            parameters["load_method"] in BaseClass.incremental_methods
+            and not pd.isna(parameters["modified_field"])
+        )
+
+    def probe_tables(
+        self,
+        params: dict,
+    ) -> dict:
+        """
+        Returns the current state of each table's source.
+
+        Subclasses should overwrite this where the source system can be
+        probed cheaply, by default no tables are probed so none are skipped.
+
+        Args:
+            params (Dictionary): Entity parameters, as returned by
+                read_params.
+
+        Returns:
+            Dictionary: table name as key, and a dictionary of the source's
+                last_modified value and fingerprint as value.
+        """
+
+        return {}
+
+    def unchanged_tables(
+        self,
+        params: dict,
+        probes: dict,
+    ) -> list:
+        """
+        Returns the tables whose source hasn't changed since their last load.
+
+        A table probed on its modified field is unchanged if the source's
+        highest modified value is no later than its watermark, or the source
+        is empty. A table probed with a fingerprint is unchanged if the row
+        count and checksum match those recorded by its last complete load.
+        Tables that weren't probed are never unchanged.
+
+        Args:
+            params (Dictionary): Entity parameters, as returned by
+                read_params.
+            probes (Dictionary): The state of each source, as returned by
+                probe_tables.
+
+        Returns:
+            List: The unchanged tables, in the order of params.
+        """
+
+        watermarks = self.watermarks or {}
+        fingerprints = self.fingerprints or {}
+
+        unchanged = []
+        for table, parameters in params.items():
+            if table not in probes:
+                continue
+
+            probe = probes[table]
+
+            if self.modified_probe(parameters):
+                source = to_python(probe["last_modified"])
+                watermark = watermarks.get(table)
+
+                try:
+                    current = source is None or (
+                        watermark is not None and source <= watermark
+                    )
+                except TypeError:
+                    current = False
+
+            else:
+                current = (
+                    probe["fingerprint"] is not None
+                    and fingerprints.get(table) == probe["fingerprint"]
+                )
+
+            if current:
+                unchanged.append(table)
+
+        return unchanged
+
+    def skip_unchanged(
+        self,
+        params: dict,
+    ) -> dict:
+        """
+        Returns the entity parameters without the tables that are unchanged.
+
+        With change_probe set, every table is probed in one round trip and
+        those unchanged since their last load are recorded in self.skipped
+        rather than loaded. The watermarks must already be loaded.
+
+        A single table that can't be probed, such as one whose entity or
+        modified field is missing from the source, fails the whole probe,
+        so if it fails each table is probed on its own instead. Tables
+        that still fail are recorded in self.unprobed and loaded.
+
+        Args:
+            params (Dictionary): Entity parameters, as returned by
+                read_params.
+
+        Returns:
+            Dictionary: The entity parameters of the tables to load.
+        """
+
+        if not self.change_probe:
+            return params
+
+        try:
+            self.probes = self.probe_tables(params)
+
+        except Exception:
+            self.probes = {}
+            for table, parameters in params.items():
+                try:
+                    self.probes.update(
+                        self.probe_tables({table: parameters}),
+                    )
+
+                except Exception:
+                    self.unprobed.append(table)
+
+        # An unchanged table may still have had records deleted
+        now = datetime.now()
+        self.skipped = [
+            table
+            for table in self.unchanged_tables(params, self.probes)
+            if not self.deletes_due(table, params[table], now)
+        ]
+
+        return {
+            table: parameters
+            for table, parameters in params.items()
+            if table not in self.skipped
+        }
+
+    # side-effect heavy with no returns
+    # skipping unit test.
+    def clear_fingerprint(
+        self,
+        table_name: str,
     ) -> None:  # pragma: no cover
         """
-        Writes metadata to the history table.
+        Removes the recorded fingerprint of a table before it's loaded.
 
-        Given a DataFrame and some metadata, write out to the history table.
+        A load that fails part way through leaves the target out of step
+        with its source, so the fingerprint is cleared first and only
+        recorded again once a load completes.
 
         Args:
-            run_id (Integer): The run_id for the current run.
-            table_name (Sring): The table that was written out to.
-            load_method (String): The load method used to write to the
-                table.
-            modified_field: The name of the field containing the modified
-                value, used for incremental loads.
-            start_time (DateTime): The date and time the table run started.
-            end_time (DateTime): The date and time the table run ended.
-            rows_processed (Integer): How many rows were written to the
-                table.
+            table_name (String): The table about to be written to.
 
         Returns:
             None.
         """
 
-        time_taken = int((end_time - start_time).total_seconds())
-        start_time_str = start_time.strftime("%Y-%m-%d %H:%M:%S.%f")[:-3]
-        end_time_str = end_time.strftime("%Y-%m-%d %H:%M:%S.%f")[:-3]
+        update = f"""
+            UPDATE {qualify(self.schema, "watermark")}
+               SET row_count = NULL
+                   ,checksum = NULL
+             WHERE table_name = :table_name;
+        """
 
         with self.target.connect() as cnxn:
+            cnxn.execute(statement(update), {"table_name": table_name})
+            cnxn.close()
 
-            insert = f"""
-                INSERT INTO {self.schema}.history (
-                    run_id
-                    ,table_name
-                    ,start_time
-                    ,end_time
-                    ,time_taken
-                    ,rows_processed
-                )
+        with self._lock:
+            if self.fingerprints is not None:
+                self.fingerprints.pop(table_name, None)
 
-                VALUES (
-                    {run_id}
-                    ,'{table_name}'
-                    ,'{start_time_str}'
-                    ,'{end_time_str}'
-                    ,{time_taken}
-                    ,{rows_processed}
-                )
-            """
+    def deletes_due(
+        self,
+        table_name: str,
+        parameters: dict,
+        now: datetime,
+    ) -> bool:
+        """
+        Returns whether a table is due to be checked for deletes.
+
+        Tables are checked if they set detect_deletes, the number of days
+        between checks, zero to check every run. Only load methods that
+        keep versions of records are checked.
 
-            cnxn.execute(text(insert))
+        Args:
+            table_name (String): The name of the table.
+            parameters (Dictionary): The entity parameters for the table.
+            now (DateTime): The time the check would run.
 
-            if load_method == "incremental":
+        Returns:
+            Boolean: True if the table is due a check.
+        """
 
-                # Read from target to ensure the actual max value is recorded
-                query = f"""
-                    SELECT MAX({modified_field}) AS max_modified
-                      FROM {self.schema}.{table_name}
-                     WHERE current_record = 1;
-                """
+        interval = parameters.get("detect_deletes")
+        if interval is None or pd.isna(interval):
+            return False
 
-                max_modified = db.dbms_reader(
-                    cnxn,
-                    query=text(query),
-                )["max_modified"][0].strftime("%Y-%m-%d %H:%M:%S.%f")[:-3]
-
-                update = f"""
-                    UPDATE {self.schema}.history
-                       SET {modified_field} = '{max_modified}'
-                     WHERE run_id = {run_id}
-                       AND table_name = '{table_name}';
+        if parameters["load_method"] not in self.versioned_methods:
+            return False
+
+        checked = (self.deletes_checked or {}).get(table_name)
+
+        return checked is None or now - checked >= timedelta(
+            days=float(interval),
+        )
+
+    def source_keys(
+        self,
+        entity_name: str,
+        keys: list,
+        chunksize: int,
+    ) -> Optional[Iterator]:
+        """
+        Returns the business keys of every record of a source entity.
+
+        Subclasses should overwrite this where the source system can return
+        keys in the order of key_order, by default no keys are returned so
+        deletes aren't detected.
+
+        Args:
+            entity_name (String): The entity to read keys from.
+            keys (List): The business key columns.
+            chunksize (Integer): The number of keys in each chunk.
+
+        Returns:
+            Iterator | None: DataFrames of keys, in order, or None if the
+                source can't be read in order.
+        """
+
+        return None
+
+    def target_keys(
+        self,
+        table_name: str,
+        keys: list,
+        chunksize: int,
+    ) -> Iterator:
+        """
+        Returns the business keys of every current record of a table.
+
+        Keys with a NULL column are skipped, as they are when reading the
+        source's keys, so every key can be compared.
+
+        Args:
+            table_name (String): The table to read keys from.
+            keys (List): The business key columns.
+            chunksize (Integer): The number of keys in each chunk.
+
+        Returns:
+            Iterator: DataFrames of keys, in the order of key_order.
+        """
+
+        not_null = " AND ".join(f"{quote(key)} IS NOT NULL" for key in keys)
+
+        query = f"""
+            SELECT {", ".join(map(quote, keys))}
+              FROM {qualify(self.schema, table_name)}
+             WHERE current_record = 1
+               AND {not_null}
+             ORDER BY {key_order(keys, self.target_types(table_name))};
+        """
+
+        return db.dbms_read_chunks(
+            self.target,
+            query=statement(query),
+            chunksize=chunksize,
+        )
+
+    # side-effect heavy with no returns
+    # skipping unit test.
+    def detect_deletes(
+        self,
+        run_id: int,
+        table_name: str,
+        parameters: dict,
+        chunksize: int,
+    ) -> int:  # pragma: no cover
+        """
+        Expires the current records of keys deleted from the source.
+
+        The business keys of the source and of the current records of the
+        target are streamed in the same order and merged, so only a chunk of
+        each is held in memory. Keys missing from the source are written to
+        a staging table, then expired with a single UPDATE. For diff loads,
+        their stored row hashes are removed so they're written again if they
+        reappear. If the source returns no keys at all, which is more likely
+        a fault than every record having been deleted, nothing is expired.
+
+        Args:
+            run_id (Integer): The run_id for the current run.
+            table_name (String): The table to check.
+            parameters (Dictionary): The entity parameters for the table.
+            chunksize (Integer): The number of keys read and staged at once.
+
+        Returns:
+            Integer: The number of records expired.
+        """
+
+        checked = datetime.now()
+        keys = key_columns(parameters["business_key"])
+        write_engine = parameters.get("write_engine", self.write_engine)
+
+        source = self.source_keys(parameters["entity_name"], keys, chunksize)
+        if source is None:
+            return 0
+
+        source = key_rows(source)
+        first = next(source, None)
+        if first is None:
+            return 0
+
+        staging = self.staging_name(f"{table_name}_deletes", run_id)
+        expired = 0
+
+        try:
+            with self.target.connect() as cnxn:
+                create = f"""
+                    DROP TABLE IF EXISTS {qualify(self.schema, staging)};
+
+                    SELECT TOP(0) {", ".join(map(quote, keys))}
+                           ,CAST(NULL AS BIGINT) AS key_hash
+                      INTO {qualify(self.schema, staging)}
+                      FROM {qualify(self.schema, table_name)};
                 """
 
-                cnxn.execute(text(update))
+                cnxn.execute(statement(create))
+                cnxn.close()
 
-            cnxn.close()
+            batch: list = []
+            missing = missing_keys(
+                chain([first], source),
+                key_rows(self.target_keys(table_name, keys, chunksize)),
+            )
 
-    def __call__(
+            for key in chain(missing, [None]):
+                if key is not None:
+                    batch.append(key)
+
+                if batch and (key is None or len(batch) >= chunksize):
+                    df = DataFrame(batch, columns=keys)
+                    df["key_hash"] = hash_columns(df, keys)
+                    self.write_staging(
+                        df,
+                        staging,
+                        write_engine,
+                        truncate=False,
+                    )
+                    expired += len(batch)
+                    batch = []
+
+            expire = f"""
+                SET XACT_ABORT ON;
+
+                BEGIN TRANSACTION;
+
+                UPDATE tgt
+                   SET current_record = 0
+                  FROM {qualify(self.schema, table_name)} AS tgt
+                 WHERE tgt.current_record = 1
+                   AND EXISTS (
+                       SELECT 1
+                         FROM {qualify(self.schema, staging)} AS src
+                        WHERE {key_join(keys, "src", "tgt")}
+                   );
+
+                DELETE h
+                  FROM {qualify(self.schema, "row_hash")} AS h
+                 WHERE h.table_name = :table_name
+                   AND EXISTS (
+                       SELECT 1
+                         FROM {qualify(self.schema, staging)} AS src
+                        WHERE src.key_hash = h.key_hash
+                   );
+
+                UPDATE {qualify(self.schema, "watermark")}
+                   SET deletes_checked = {param("checked", "datetime")}
+                 WHERE table_name = :table_name;
+
+                COMMIT TRANSACTION;
+            """
+
+            with self.target.connect() as cnxn:
+                cnxn.execute(
+                    statement(expire),
+                    {"table_name": table_name, "checked": checked},
+                )
+                cnxn.close()
+
+        finally:
+            if not self.keep_staging:
+                self.drop_staging(staging)
+
+        with self._lock:
+            if self.deletes_checked is not None:
+                self.deletes_checked[table_name] = checked
+
+        return expired
+
+    def fetch_chunks(
+        self,
+        chunks: Iterator,
+        dtypes: Optional[dict] = None,
+        slots: bool = True,
+    ) -> Generator:
+        """
+        Yields chunks from an iterator, holding a source slot for each read.
+
+        Wraps the Generator returned by read_data so that no more than
+        source_workers chunks are being read from the source at once,
+        regardless of how many tables are being ingested concurrently. If
+        given a dtype plan, each chunk is converted as it's read, so chunks
+        held in the read-ahead buffer are already converted.
+
+        Args:
+            chunks (Iterator): An iterator of DataFrames, as returned by
+                read_data.
+            dtypes (Dictionary, optional): The dtype plan to convert each
+                chunk to, as returned by dtype_plan.
+            slots (Boolean): Whether to hold a source slot for each read.
+                Partitioned reads take a slot in each partition's reader
+                instead, so aren't read holding a slot as well.
+
+        Returns:
+            Generator: A Generator of DataFrames.
+        """
+
+        while True:
+            if slots:
+                with self._source_slots:
+                    chunk = next(chunks, None)
+            else:
+                chunk = next(chunks, None)
+
+            if chunk is None:
+                return
+
+            if dtypes:
+                chunk = apply_dtypes(chunk, dtypes)
+
+            yield chunk
+
+    def ingest_table(
         self,
         cls_id: int,
+        table: str,
+        parameters: dict,
     ) -> None:  # pragma: no cover
         """
-        Calls the functions of the class.
+        Ingests a single table.
 
-        Uses the details provided during instantiation, run each of the
-        functions specified in the class.
+        Reads, transforms and writes each chunk for the given table, then
+        records the run in the history table. Any error is recorded against
+        the instance rather than raised, so other tables continue to run.
 
         Args:
             cls_id (Integer): The run_id for the class instance.
+            table (String): The name of the target table.
+            parameters (Dictionary): The entity parameters for the table, as
+                returned by read_params.
 
         Returns:
             None.
         """
 
-        params = self.read_params()
+        start_time = datetime.now()
+        ingest_datetime = start_time
+        rows_processed = 0
+        chunk_count = 0
+        completed = False
+
+        has_modified = not pd.isna(parameters["modified_field"])
+        keys = key_columns(parameters["business_key"])
+        keyset = (
+            keys
+            if parameters.get("extract_method") == "keyset"
+            else None
+        )
+
+        write_engine = parameters.get("write_engine", self.write_engine)
+        upsert_method = parameters.get("upsert_method", self.upsert_method)
+
+        # Keyset reads are paginated in order, so aren't partitioned
+        partitions = 1 if keyset else int(parameters.get("partitions", 1))
+
+        # Swap loads are written to a shadow table named for the run, so
+        # can't be resumed by a later run.
+        swap = parameters["load_method"] == "swap"
+
+        # Diff loads only write records whose hash differs from the hash
+        # stored when they were last written, so aren't resumed either.
+        diff = parameters["load_method"] == "diff"
+        versioned = parameters["load_method"] in self.versioned_methods
+
+        # Append loads never expire records. Incremental loads skip expiring
+        # records for chunks whose keys are all above the highest key of the
+        # target, tracked as chunks are written.
+        append = parameters["load_method"] == "append"
+        fast_path = parameters["load_method"] == "incremental"
+        max_key = None
+        chunks_written = 0
+        insert_only_chunks = 0
+
+        # Checkpoints rely on records being read in a known order. Only
+        # incremental and append loads are resumed: a resumed truncate load
+        # would keep rows deleted or changed at the source since the failed
+        # load, as its table isn't truncated again. Swap and diff loads
+        # aren't incremental methods, so aren't resumed either.
+        checkpointed = (
+            self.resume
+            and parameters["load_method"] in self.incremental_methods
+            and partitions == 1
+            and (has_modified or keyset is not None)
+        )
+        watermark: tuple = (None, None)
+        max_modified = None
+        last_key = None
+
+        # Set a default chunksize if none given
+        chunksize_param = int(
+            1000000 if pd.isna(parameters["chunksize"])
+            else parameters["chunksize"],
+        )
 
-        for table, parameters in params.items():
-            start_time = datetime.now()
-            rows_processed = 0
-            chunk_count = 0
-
-            # Set a default chunksize if none given
-            chunksize_param = int(
-                1000000 if pd.isna(parameters["chunksize"])
-                else parameters["chunksize"],
-            )
+        # The fingerprint of the source probed before the load, recorded
+        # once the load completes.
+        fingerprint = self.probes.get(table, {}).get("fingerprint")
+
+        sizer = None
+        staging = None
+        shadow = None
+        hash_staging = None
+        stored = None
+
+        try:
+            with self._target_slots:
+                # Swap loads leave the target untouched if they fail
+                if (
+                    not swap
+                    and table in (self.fingerprints or {})
+                    and not self.modified_probe(parameters)
+                ):
+                    self.clear_fingerprint(table)
 
-            try:
                 max_modified = self.read_history(
                     table,
                     parameters["modified_field"],
                 )
 
-                for chunk in self.read_data(
+                checkpoint = (
+                    self.read_checkpoint(table) if checkpointed else None
+                )
+
+                # Resume a failed load of the same kind from the last
+                # position it completed, continuing its chunk count.
+                if (
+                    checkpoint is not None
+                    and checkpoint["load_method"] == parameters["load_method"]
+                    and (checkpoint["last_key"] is None) == (keyset is None)
+                    and (
+                        not pd.isna(checkpoint["last_modified"])
+                        or checkpoint["last_key"] is not None
+                    )
+                ):
+                    self.rollback_checkpoint(
+                        table,
+                        parameters["modified_field"],
+                        checkpoint,
+                        keyset,
+                    )
+                    max_modified = to_python(checkpoint["last_modified"])
+                    last_key = checkpoint["last_key"]
+                    ingest_datetime = checkpoint["ingest_datetime"]
+                    chunk_count = int(checkpoint["chunk_count"])
+                    watermark = (max_modified, max_modified)
+
+                columns = None
+                if self.project_columns:
+                    columns = self.read_columns(
+                        table,
+                        parameters["entity_name"],
+                        [
+                            column
+                            for column in [parameters["modified_field"]]
+                            + (keyset or [])
+                            + keys
+                            if not pd.isna(column)
+                        ],
+                    )
+
+                dtypes = self.dtype_plan(table) if self.dtype_mapping else None
+
+                if diff:
+                    stored = self.read_row_hashes(table)
+
+                if fast_path:
+                    max_key = self.read_max_key(table, keys)
+
+                if self.adaptive_chunksize:
+                    sizer = ChunkSizer(
+                        self.read_chunksize(table) or chunksize_param,
+                        self.chunksize_min,
+                        self.chunksize_max,
+                        self.chunk_memory_bytes,
+                        self.chunk_target_seconds,
+                    )
+
+            chunks = self.fetch_chunks(
+                self.read_data(
                     parameters["entity_name"],
                     parameters["load_method"],
                     parameters["modified_field"],
                     max_modified,
                     chunksize_param,
-                ):
+                    sizer=sizer,
+                    ordered=checkpointed,
+                    keyset=keyset,
+                    last_key=last_key,
+                    partitions=partitions,
+                    partition_column=keys[0],
+                    columns=columns,
+                ),
+                dtypes,
+                slots=partitions == 1,
+            )
+
+            for chunk in prefetch(
+                chunks,
+                self.prefetch_depth,
+                self.prefetch_bytes,
+            ):
+
+                if not chunk.empty:
+                    chunk_size = len(chunk)
+                    chunk_count += 1
+
+                    write_started = perf_counter()
+
+                    with self._target_slots:
+                        if staging is None:
+                            staging = self.staging_name(table, cls_id)
+                            self.create_staging(table, staging)
 
-                    if not chunk.empty:
-                        chunk_size = len(chunk)
-                        chunk_count += 1
+                        # Swap loads write to a shadow table, leaving the
+                        # target table untouched until it's swapped in.
+                        destination = table
+                        if swap:
+                            if shadow is None:
+                                shadow = self.shadow_name(table, cls_id)
+                                self.create_staging(table, shadow)
+                            destination = shadow
 
                         df = self.transform_data(
                             chunk,
                             table,
-                            start_time,
+                            ingest_datetime,
                         )
 
-                        self.write_data(
-                            df,
+                        if versioned:
+                            df = self.flag_current(
+                                df,
+                                keys,
+                                parameters["modified_field"],
+                            )
+
+                        hashes = None
+                        if diff:
+                            df, hashes = self.diff_chunk(
+                                df,
+                                table,
+                                keys,
+                                stored,
+                            )
+
+                        insert_only = append
+                        if fast_path:
+                            low, high = self.key_bounds(df, keys)
+                            insert_only = self.insert_only(low, max_key)
+
+                        if not df.empty:
+                            self.write_data(
+                                df,
+                                destination,
+                                parameters["load_method"],
+                                parameters["business_key"],
+                                chunk_count,
+                                write_engine,
+                                staging,
+                                upsert_method,
+                                insert_only,
+                            )
+
+                        chunks_written += 1
+                        if insert_only:
+                            insert_only_chunks += 1
+
+                        # The chunk's keys are now in the target
+                        if fast_path and high is not None and (
+                            max_key is None or self.insert_only(high, max_key)
+                        ):
+                            max_key = high
+
+                        # Hashes are stored once their records are written
+                        if hashes is not None and not hashes.empty:
+                            if hash_staging is None:
+                                hash_staging = self.staging_name(
+                                    f"{table}_hash",
+                                    cls_id,
+                                )
+                                self.create_staging("row_hash", hash_staging)
+
+                            self.write_row_hashes(
+                                hashes,
+                                table,
+                                hash_staging,
+                                write_engine,
+                            )
+
+                        # The highest modified value written is tracked for
+                        # the history table, rather than read back from the
+                        # target.
+                        if has_modified:
+                            watermark = self.advance_watermark(
+                                watermark,
+                                chunk[parameters["modified_field"]],
+                            )
+
+                        # Keyset reads checkpoint the exact position of
+                        # the last record written.
+                        if checkpointed and keyset is not None:
+                            last = chunk.iloc[-1]
+                            self.write_checkpoint(
+                                cls_id,
+                                table,
+                                parameters["load_method"],
+                                ingest_datetime,
+                                chunk_count,
+                                (
+                                    last[parameters["modified_field"]]
+                                    if has_modified else None
+                                ),
+                                [last[key] for key in keyset],
+                            )
+
+                        elif checkpointed:
+                            self.write_checkpoint(
+                                cls_id,
+                                table,
+                                parameters["load_method"],
+                                ingest_datetime,
+                                chunk_count,
+                                watermark[1],
+                            )
+
+                    if sizer is not None:
+                        sizer.record_write(
+                            chunk_size,
+                            perf_counter() - write_started,
+                        )
+
+                    rows_processed += chunk_size
+
+            if shadow is not None:
+                with self._target_slots:
+                    self.swap_table(
+                        table,
+                        shadow,
+                        cls_id,
+                        index_definitions(
                             table,
+                            keys,
+                            parameters["modified_field"],
                             parameters["load_method"],
-                            parameters["business_key"],
-                            chunk_count,
-                        )
+                        ),
+                    )
+                shadow = None
 
-                        rows_processed += chunk_size
+            completed = True
 
-            # Ensures that any error is recorded but allows failover to the
-            # next entity.
-            except Exception as e:
-                error = repr(e)
+        # Ensures that any error is recorded but allows failover to the
+        # next entity.
+        except Exception as e:
+            error = repr(e)
+            with self._lock:
                 self.status = "failed"
                 self.error += f"\ntable: {table}\n{error}"
 
-            if rows_processed > 0:
-                end_time = datetime.now()
+        # Deletes are detected once the table's been loaded, so the keys of
+        # the target include every record read. An error detecting them is
+        # recorded, but leaves the completed load's watermark, checkpoint
+        # and fingerprint as they are.
+        if completed and self.deletes_due(table, parameters, start_time):
+            try:
+                with self._source_slots, self._target_slots:
+                    expired = self.detect_deletes(
+                        cls_id,
+                        table,
+                        parameters,
+                        chunksize_param,
+                    )
+
+                with self._lock:
+                    self.deletes_expired.append((table, expired))
 
+            except Exception as e:
+                error = repr(e)
+                with self._lock:
+                    self.status = "failed"
+                    self.error += f"\ntable: {table}\ndeletes: {error}"
+
+        if completed and checkpointed:
+            with self._target_slots:
+                self.clear_checkpoint(table)
+
+        if staging is not None and not self.keep_staging:
+            with self._target_slots:
+                self.drop_staging(staging)
+
+        if hash_staging is not None and not self.keep_staging:
+            with self._target_slots:
+                self.drop_staging(hash_staging)
+
+        # A shadow table is only left if the load failed before the swap
+        if shadow is not None and not self.keep_staging:
+            with self._target_slots:
+                self.drop_staging(shadow)
+
+        if rows_processed > 0:
+            end_time = datetime.now()
+
+            # A failed load records the highest value known to be
+            # complete, as records sharing the highest value written may not
+            # have been read. Chunks read out of modified order, such as
+            # those of a partitioned read, may leave unread records below
+            # the highest value written, so those keep their previous
+            # watermark.
+            ordered = partitions == 1 and bool(
+                max_modified or checkpointed or keyset,
+            )
+            if completed:
+                last_modified = watermark[0]
+            elif ordered and watermark[1] is not None:
+                last_modified = watermark[1]
+            else:
+                last_modified = max_modified
+
+            # Append loads never expire records, so records a failed load
+            # wrote beyond the watermark it records would be inserted again
+            # by the next run. They're removed, and a keyset checkpoint,
+            # positioned beyond them, is cleared.
+            if append and not completed:
+                with self._target_slots:
+                    self.rollback_checkpoint(
+                        table,
+                        parameters["modified_field"],
+                        {
+                            "ingest_datetime": ingest_datetime,
+                            "last_modified": last_modified,
+                            "last_key": None,
+                        },
+                    )
+
+                    if checkpointed and keyset is not None:
+                        self.clear_checkpoint(table)
+
+            with self._target_slots:
                 self.write_to_history(
                     cls_id,
                     table,
@@ -457,4 +2992,45 @@ class BaseClass(ABC):
                     start_time,
                     end_time,
                     rows_processed,
+                    None if sizer is None else sizer.chunksize,
+                    last_modified,
+                    fingerprint=fingerprint if completed else None,
+                    chunks=chunks_written,
+                    insert_only_chunks=insert_only_chunks,
+                    verify=completed,
                 )
+
+    def __call__(
+        self,
+        cls_id: int,
+    ) -> None:  # pragma: no cover
+        """
+        Calls the functions of the class.
+
+        Uses the details provided during instantiation, run each of the
+        functions specified in the class. Tables are independent of one
+        another, so are ingested concurrently by a pool of workers sized by
+        the larger of source_workers and target_workers.
+
+        Args:
+            cls_id (Integer): The run_id for the class instance.
+
+        Returns:
+            None.
+        """
+
+        self.load_schema_cache()
+        self.read_watermarks()
+
+        params = self.plan_tables(self.skip_unchanged(self.read_params()))
+
+        max_workers = max(self.source_workers, self.target_workers)
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = [
+                executor.submit(self.ingest_table, cls_id, table, parameters)
+                for table, parameters in params.items()
+            ]
+
+            for future in futures:
+                future.result()
@@ -1,15 +1,188 @@
+from time import perf_counter
+from time import sleep
 from typing import Any
 from typing import Generator
+from typing import Optional
 
+import pandas as pd
 from cnxns import dbms as db
-from sqlalchemy import text
+from sqlalchemy import TextClause
 
+from helpers.chunk_helper import ChunkSizer
+from helpers.pipeline_helper import chunk_bytes
+from helpers.pipeline_helper import read_ahead
+from helpers.sql_helper import key_order
+from helpers.sql_helper import keyset_params
+from helpers.sql_helper import keyset_predicate
+from helpers.sql_helper import param
+from helpers.sql_helper import qualify
+from helpers.sql_helper import quote
+from helpers.sql_helper import statement
+from helpers.sql_helper import to_python
 from ingest_classes.base_class import BaseClass
 
 
+INTEGER_TYPES = ("tinyint", "smallint", "int", "bigint")
+
+
 class DBMSClass(BaseClass):
     "Class for ingestesting data from a DBMS system, extends BaseClass"
 
+    def estimate_rows(
+        self,
+        entity_names: list,
+    ) -> dict:  # pragma: no cover
+        """
+        Returns an estimated row count for each source entity.
+
+        Reads row counts from the SQL Server catalogue, which is cheap as no
+        table is scanned. Other source types return no estimates.
+
+        Args:
+            entity_names (List): The entities to estimate.
+
+        Returns:
+            Dictionary: entity name as key, estimated row count as value.
+        """
+
+        if self.source.dialect.name != "mssql":
+            return {}
+
+        query = """
+            SELECT CONCAT(s.name, '.', t.name) AS entity_name
+                   ,SUM(p.rows) AS row_count
+              FROM sys.tables AS t
+             INNER JOIN sys.schemas AS s
+                ON s.schema_id = t.schema_id
+             INNER JOIN sys.partitions AS p
+                ON p.object_id = t.object_id
+               AND p.index_id IN (0, 1)
+             GROUP BY s.name, t.name;
+        """
+
+        df = db.dbms_reader(
+            self.source,
+            query=statement(query),
+        )
+
+        row_counts = dict(zip(df["entity_name"], df["row_count"]))
+
+        return {
+            entity_name: row_counts[entity_name]
+            for entity_name in entity_names
+            if entity_name in row_counts
+        }
+
+    def probe_tables(
+        self,
+        params: dict,
+    ) -> dict:
+        """
+        Returns the current state of each table's source, in one query.
+
+        Incremental tables with a modified field are probed for their
+        highest modified value. Other tables are probed for a fingerprint,
+        their row count and the CHECKSUM_AGG of every row's BINARY_CHECKSUM,
+        which reads the whole table but not into Python. Columns of types
+        that can't be compared, such as xml, aren't part of the checksum.
+        Only SQL Server sources are probed.
+
+        Args:
+            params (Dictionary): Entity parameters, as returned by
+                read_params.
+
+        Returns:
+            Dictionary: table name as key, and a dictionary of the source's
+                last_modified value and fingerprint as value.
+        """
+
+        if not params or self.source.dialect.name != "mssql":
+            return {}
+
+        selects = []
+        tables = {}
+        for i, (table, parameters) in enumerate(params.items()):
+            tables[f"table_{i}"] = table
+            entity = qualify(parameters["entity_name"])
+
+            if self.modified_probe(parameters):
+                selects.append(f"""
+                    SELECT :table_{i} AS table_name
+                           ,MAX({quote(parameters["modified_field"])})
+                               AS last_modified
+                           ,CAST(NULL AS BIGINT) AS row_count
+                           ,CAST(NULL AS INT) AS checksum
+                      FROM {entity}""")
+
+            else:
+                selects.append(f"""
+                    SELECT :table_{i} AS table_name
+                           ,NULL AS last_modified
+                           ,COUNT_BIG(*) AS row_count
+                           ,CHECKSUM_AGG(BINARY_CHECKSUM(*)) AS checksum
+                      FROM {entity}""")
+
+        query = "\n UNION ALL".join(selects) + ";"
+
+        df = db.dbms_reader(
+            self.source,
+            query=statement(query).bindparams(**tables),
+        )
+
+        return {
+            row.table_name: {
+                "last_modified": to_python(row.last_modified),
+                "fingerprint": (
+                    None if pd.isna(row.row_count) or pd.isna(row.checksum)
+                    else (to_python(row.row_count), to_python(row.checksum))
+                ),
+            }
+            for row in df.itertuples(index=False)
+        }
+
+    def source_keys(
+        self,
+        entity_name: str,
+        keys: list,
+        chunksize: int,
+    ) -> Optional[Generator]:
+        """
+        Returns the business keys of every record of a source entity.
+
+        Keys are read in the order of key_order, string keys ordered with a
+        binary collation, so they can be merged with the keys of the target.
+        Records with a NULL key are never loaded as a key, so aren't read.
+        Only SQL Server sources are read.
+
+        Args:
+            entity_name (String): The entity to read keys from.
+            keys (List): The business key columns.
+            chunksize (Integer): The number of keys in each chunk.
+
+        Returns:
+            Generator | None: DataFrames of keys, in order, or None if the
+                source isn't SQL Server.
+        """
+
+        if self.source.dialect.name != "mssql":
+            return None
+
+        types = self.read_column_types(self.source, entity_name)
+        not_null = " AND ".join(f"{quote(key)} IS NOT NULL" for key in keys)
+
+        query = f"""
+            SELECT {", ".join(map(quote, keys))}
+              FROM {qualify(entity_name)}
+             WHERE {not_null}
+             ORDER BY {key_order(keys, types)};
+        """
+
+        return db.dbms_read_chunks(
+            self.source,
+            query=statement(query),
+            chunksize=chunksize,
+        )
+
     def read_data(
         self,
         entity_name: str,
@@ -17,6 +190,13 @@ class DBMSClass(BaseClass):
         modified_field: str,
         max_modified: Any,
         chunksize: int,
+        sizer: Optional[ChunkSizer] = None,
+        ordered: bool = False,
+        keyset: Optional[list] = None,
+        last_key: Optional[list] = None,
+        partitions: int = 1,
+        partition_column: Optional[str] = None,
+        columns: Optional[list] = None,
     ) -> Generator:
         """
         Yields a Generator of DataFrames containing data from a DBMS system.
@@ -31,31 +211,491 @@ class DBMSClass(BaseClass):
             modified_field (String): The field representing when the record
                 was last modified.
             chunksize (Integer): The size of each chunk of data to read-in.
+            sizer (ChunkSizer, optional): If given, the size of each chunk is
+                taken from, and reported back to, the sizer in place of
+                chunksize.
+            ordered (Boolean): Whether records must be returned in order of
+                modified_field, even when max_modified isn't given.
+            keyset (List, optional): Key columns to paginate on. If given,
+                records are read a page at a time in order of modified_field
+                and the keys, each page starting after the last record of
+                the one before.
+            last_key (List, optional): Values of the keyset columns of the
+                last record already read, the record with modified value
+                max_modified. Reading starts after this record.
+            partitions (Integer): The number of ranges of partition_column to
+                read concurrently, each on its own connection. Chunks from a
+                partitioned read are not returned in order.
+            partition_column (String, optional): The column to partition on.
+            columns (List, optional): The columns to read, all columns if not
+                given.
 
         Returns
             Generator: A Generator of DataFrames container data from a source
                 system.
         """
 
-        query = f"""
-            SELECT *
-              FROM {entity_name}
-        """
+        if keyset:
+            yield from self.read_keyset_pages(
+                entity_name,
+                modified_field,
+                max_modified,
+                chunksize,
+                keyset,
+                last_key,
+                sizer,
+                columns,
+            )
+            return
+
+        conditions = []
+        params: dict = {}
 
         if max_modified:
-            # Convert precision to match SQL
-            max_modified_str = (
-                max_modified.strftime("%Y-%m-%d %H:%M:%S.%f")[:-3]
+            # The watermark is bound at full precision, cast to the type of
+            # the column so SQL Server compares it exactly.
+            types = self.read_column_types(self.source, entity_name)
+            conditions.append(
+                f"{quote(modified_field)} > "
+                f"{param('max_modified', types.get(modified_field))}",
+            )
+            params["max_modified"] = to_python(max_modified)
+
+        # Read each range of a partitioned table on its own connection and
+        # thread, chunks are yielded in the order they're read. Each reader
+        # holds a source slot for every chunk it reads, so partitions count
+        # towards source_workers.
+        if partitions > 1 and partition_column:
+            with self._source_slots:
+                boundaries = self.partition_bounds(
+                    entity_name,
+                    partition_column,
+                    partitions,
+                    conditions,
+                    params,
+                )
+
+            yield from read_ahead(
+                [
+                    self.fetch_chunks(
+                        self.read_chunks(
+                            statement(
+                                self.build_query(
+                                    entity_name,
+                                    conditions + [condition],
+                                    columns=columns,
+                                ),
+                            ).bindparams(**params, **bounds),
+                            chunksize,
+                            sizer,
+                        ),
+                    )
+                    for condition, bounds in self.partition_ranges(
+                        partition_column,
+                        boundaries,
+                    )
+                ],
+                depth=partitions,
             )
+            return
+
+        query = self.build_query(
+            entity_name,
+            conditions,
+            modified_field if max_modified or ordered else None,
+            columns,
+        )
+
+        yield from self.read_chunks(
+            statement(query).bindparams(**params),
+            chunksize,
+            sizer,
+        )
+
+    def build_query(
+        self,
+        entity_name: str,
+        conditions: list,
+        order_by: Optional[str] = None,
+        columns: Optional[list] = None,
+    ) -> str:
+        """
+        Returns a SELECT statement for an entity.
+
+        The entity, columns and order_by are validated and quoted, values in
+        conditions must be bind parameters.
+
+        Args:
+            entity_name (String): The entity to read data from.
+            conditions (List): Conditions to filter on, combined with AND.
+            order_by (String, optional): The column to order by.
+            columns (List, optional): The columns to select, all columns if
+                not given.
+
+        Returns:
+            String: The SELECT statement.
+        """
 
+        query = f"""
+            SELECT {", ".join(map(quote, columns)) if columns else "*"}
+              FROM {qualify(entity_name)}
+        """
+
+        if conditions:
+            query += f"""
+                WHERE {" AND ".join(conditions)}
+            """
+
+        if order_by:
             query += f"""
-                WHERE {modified_field} > '{max_modified_str}'
-                ORDER BY {modified_field} asc;
+                ORDER BY {quote(order_by)} asc
             """
 
+        return query + ";"
+
+    def read_chunks(
+        self,
+        query: TextClause,
+        chunksize: int,
+        sizer: Optional[ChunkSizer] = None,
+    ) -> Generator:
+        """
+        Yields a Generator of DataFrames containing the results of a query.
+
+        Args:
+            query (TextClause): The query to read.
+            chunksize (Integer): The size of each chunk of data to read-in.
+            sizer (ChunkSizer, optional): If given, the size of each chunk is
+                taken from, and reported back to, the sizer in place of
+                chunksize.
+
+        Returns
+            Generator: A Generator of DataFrames.
+        """
+
+        if sizer is not None:
+            yield from self.read_adaptive_chunks(query, sizer)
+            return
+
         for chunk in db.dbms_read_chunks(
             self.source,
-            query=text(query),
+            query=query,
             chunksize=chunksize,
         ):
             yield chunk
+
+    def partition_bounds(
+        self,
+        entity_name: str,
+        column: str,
+        partitions: int,
+        conditions: list,
+        params: Optional[dict] = None,
+    ) -> list:
+        """
+        Returns the boundaries splitting an entity into ranges on a column.
+
+        Integer columns are split into ranges of equal width between their
+        minimum and maximum values, which only needs a cheap MIN/MAX query.
+        Other columns are split into ranges with equal numbers of records
+        using NTILE, which sorts the column on the source.
+
+        Args:
+            entity_name (String): The entity to read data from.
+            column (String): The column to partition on.
+            partitions (Integer): The number of ranges to split into.
+            conditions (List): Conditions the read is filtered on.
+            params (Dictionary, optional): Bind parameters of the conditions.
+
+        Returns:
+            List: The upper boundary of every range but the last, in order.
+        """
+
+        types = self.read_column_types(self.source, entity_name)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        entity, quoted = qualify(entity_name), quote(column)
+
+        if types.get(column, "").lower() in INTEGER_TYPES:
+            query = f"""
+                SELECT MIN({quoted}) AS lower
+                       ,MAX({quoted}) AS upper
+                  FROM {entity}
+                  {where};
+            """
+
+            df = db.dbms_reader(
+                self.source,
+                query=statement(query).bindparams(**(params or {})),
+            )
+
+            lower, upper = df["lower"][0], df["upper"][0]
+            if pd.isna(lower) or pd.isna(upper):
+                return []
+
+            lower, upper = int(lower), int(upper)
+            boundaries = [
+                lower + (upper - lower) * i // partitions
+                for i in range(1, partitions)
+            ]
+
+        else:
+            query = f"""
+                SELECT MAX({quoted}) AS upper
+                  FROM (
+                       SELECT {quoted}
+                              ,NTILE(:partitions) OVER (
+                                  ORDER BY {quoted}
+                              ) AS tile
+                         FROM {entity}
+                         {where}
+                       ) AS tiles
+                 GROUP BY tile
+                 ORDER BY upper;
+            """
+
+            df = db.dbms_reader(
+                self.source,
+                query=statement(query).bindparams(
+                    partitions=int(partitions),
+                    **(params or {}),
+                ),
+            )
+
+            boundaries = df["upper"].dropna().tolist()[:-1]
+
+        return sorted(set(boundaries))
+
+    def partition_ranges(
+        self,
+        column: str,
+        boundaries: list,
+    ) -> list:
+        """
+        Returns the condition and bind parameters for each partition range.
+
+        The ranges are open ended at either end, so every record, including
+        any with a NULL value, falls into exactly one range.
+
+        Args:
+            column (String): The column to partition on.
+            boundaries (List): The upper boundary of every range but the
+                last, as returned by partition_bounds.
+
+        Returns:
+            List: A tuple of condition and bind parameters per range.
+        """
+
+        if not boundaries:
+            return [("1 = 1", {})]
+
+        column = quote(column)
+        ranges = [
+            (
+                f"({column} <= :upper OR {column} IS NULL)",
+                {"upper": to_python(boundaries[0])},
+            ),
+        ]
+
+        for lower, upper in zip(boundaries, boundaries[1:]):
+            ranges.append((
+                f"{column} > :lower AND {column} <= :upper",
+                {"lower": to_python(lower), "upper": to_python(upper)},
+            ))
+
+        ranges.append((
+            f"{column} > :lower",
+            {"lower": to_python(boundaries[-1])},
+        ))
+
+        return ranges
+
+    def read_adaptive_chunks(
+        self,
+        query: TextClause,
+        sizer: ChunkSizer,
+    ) -> Generator:
+        """
+        Yields a Generator of DataFrames, sized by a ChunkSizer.
+
+        Streams the results of the query from a server-side cursor, fetching
+        as many rows as the sizer currently allows for each chunk and
+        reporting the size and read time of each chunk back to it.
+
+        Args:
+            query (TextClause): The query to read.
+            sizer (ChunkSizer): The sizer to take chunksizes from.
+
+        Returns
+            Generator: A Generator of DataFrames.
+        """
+
+        with self.source.connect() as cnxn:
+            result = cnxn.execution_options(stream_results=True).execute(
+                query,
+            )
+            columns = list(result.keys())
+
+            while True:
+                started = perf_counter()
+                rows = result.fetchmany(sizer.chunksize)
+
+                if not rows:
+                    break
+
+                chunk = pd.DataFrame.from_records(
+                    rows,
+                    columns=columns,
+                    coerce_float=True,
+                )
+
+                sizer.record_read(
+                    len(chunk),
+                    chunk_bytes(chunk),
+                    perf_counter() - started,
+                )
+
+                yield chunk
+
+    def read_keyset_pages(
+        self,
+        entity_name: str,
+        modified_field: str,
+        max_modified: Any,
+        chunksize: int,
+        keyset: list,
+        last_key: Optional[list] = None,
+        sizer: Optional[ChunkSizer] = None,
+        columns: Optional[list] = None,
+    ) -> Generator:
+        """
+        Yields a Generator of DataFrames, one per page of a keyset read.
+
+        Records are ordered by modified_field, if given, then the keyset
+        columns, and each page is a separate TOP(n) query for the records
+        after the last record of the previous page. Each query is short,
+        can use an index on the ordering columns and is retried on its own
+        if it fails. The keyset columns must uniquely identify a record
+        alongside modified_field, or records may be skipped between pages.
+        A page can't start after a NULL, which matches nothing, so the read
+        fails if a page ends on a record with a NULL ordering column.
+
+        Args:
+            entity_name (String): The entity to read data from.
+            modified_field (String): The field representing when the record
+                was last modified.
+            max_modified (Any): Only records modified after this value are
+                read, unless last_key is given.
+            chunksize (Integer): The number of records in each page.
+            keyset (List): Key columns to paginate on.
+            last_key (List, optional): Values of the keyset columns of the
+                last record already read, the record with modified value
+                max_modified. Reading starts after this record.
+            sizer (ChunkSizer, optional): If given, the size of each page is
+                taken from, and reported back to, the sizer in place of
+                chunksize.
+            columns (List, optional): The columns to read, all columns if not
+                given.
+
+        Returns
+            Generator: A Generator of DataFrames.
+
+        Raises:
+            ValueError: If a full page ends on a NULL ordering column.
+        """
+
+        has_modified = not pd.isna(modified_field)
+        order = ([modified_field] if has_modified else []) + list(keyset)
+        types = self.read_column_types(self.source, entity_name)
+        entity = qualify(entity_name)
+        select = ", ".join(map(quote, columns)) if columns else "*"
+        order_by = ", ".join(f"{quote(column)} asc" for column in order)
+
+        position = None
+        if last_key is not None:
+            position = ([max_modified] if has_modified else []) + last_key
+
+        while True:
+            page_size = sizer.chunksize if sizer is not None else chunksize
+            params: dict = {"page_size": page_size}
+
+            if position is not None:
+                where = f"WHERE {keyset_predicate(order, types)}"
+                params.update(keyset_params(position))
+
+            elif max_modified and has_modified:
+                where = (
+                    f"WHERE {quote(modified_field)} > "
+                    f"{param('max_modified', types.get(modified_field))}"
+                )
+                params["max_modified"] = to_python(max_modified)
+
+            else:
+                where = ""
+
+            query = f"""
+                SELECT TOP(:page_size) {select}
+                  FROM {entity}
+                  {where}
+                 ORDER BY {order_by};
+            """
+
+            started = perf_counter()
+            page = self.read_page(statement(query).bindparams(**params))
+
+            if sizer is not None and not page.empty:
+                sizer.record_read(
+                    len(page),
+                    chunk_bytes(page),
+                    perf_counter() - started,
+                )
+
+            if page.empty:
+                return
+
+            last = page.iloc[-1][order]
+            if len(page) >= page_size and last.isna().any():
+                nulls = ", ".join(last.index[last.isna()])
+                raise ValueError(
+                    f"Keyset read of {entity_name} can't continue after a "
+                    f"NULL {nulls}, the ordering columns must be NOT NULL",
+                )
+
+            yield page
+
+            if len(page) < page_size:
+                return
+
+            position = last.tolist()
+
+    def read_page(
+        self,
+        query: TextClause,
+    ) -> pd.DataFrame:
+        """
+        Returns the result of a query, retrying if it fails.
+
+        The query is attempted up to page_retries further times, waiting
+        twice as long after each failure, starting at one second.
+
+        Args:
+            query (TextClause): The query to read.
+
+        Returns:
+            DataFrame: The result of the query.
+        """
+
+        retries = int(self.options.get("page_retries", 3))
+        attempt = 0
+
+        while True:
+            try:
+                return db.dbms_reader(
+                    self.source,
+                    query=query,
+                )
+
+            except Exception:
+                if attempt >= retries:
+                    raise
+                sleep(2 ** attempt)
+                attempt += 1
@@ -1,19 +1,116 @@
 import argparse
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
 import yaml
+from sqlalchemy import Engine
 
 import ingest_classes as classes
 from helpers.cnxns_helper import get_cnxns
 from helpers.log_helper import update_log_finished
 from helpers.log_helper import update_log_running
+from ingest_classes.base_class import BaseClass
 
 
 LOGGER = logging.getLogger(__name__)
 LOGGER.setLevel(logging.INFO)
 
 
+def _run_instance(
+    cnxn: Engine,
+    job: str,
+    run_id: int,
+    cls: str,
+    cls_instance: BaseClass,
+) -> str:
+    """
+    Run a single instance and record it in the mdh history table.
+
+    Logs the instance as running under the parent run_id, calls it and logs
+    it as finished. Any error is logged rather than raised so that other
+    instances, which may be running concurrently, are unaffected.
+
+    Args:
+        cnxn (Engine): SQLAlchemy Engine for the mdh database.
+        job (str): Name of the parent job.
+        run_id (int): Run ID of the parent job.
+        cls (str): Name of the instance.
+        cls_instance (BaseClass): The instantiated ingest class.
+
+    Returns:
+        str: Status of the instance on completion.
+    """
+
+    cls_started = datetime.now()
+    cls_status = "failed"
+    cls_id = update_log_running(
+        cnxn,
+        f"{job}_{cls}",
+        cls_started,
+        parent_id=run_id,
+    )
+
+    try:
+        LOGGER.info(f"{cls}/{cls_id} started: {cls_started}")
+
+        cls_instance(cls_id)
+        cls_status = cls_instance.status
+
+        for entry in cls_instance.plan:
+            LOGGER.info(
+                f"{cls}/{cls_id} plan: {entry['table_name']} "
+                f"worker={entry['worker']} "
+                f"estimate={entry['estimate']:.1f}s ({entry['basis']})",
+            )
+        if cls_instance.skipped:
+            LOGGER.info(
+                f"{cls}/{cls_id} unchanged, skipped: "
+                f"{', '.join(cls_instance.skipped)}",
+            )
+        if cls_instance.unprobed:
+            LOGGER.warning(
+                f"{cls}/{cls_id} probe failed, loaded: "
+                f"{', '.join(cls_instance.unprobed)}",
+            )
+        for table, expired in cls_instance.deletes_expired:
+            LOGGER.info(
+                f"{cls}/{cls_id} deletes: {table} expired {expired}",
+            )
+        for table, streamed, target in cls_instance.watermark_mismatches:
+            LOGGER.warning(
+                f"{cls}/{cls_id} watermark: {table} tracked {streamed}, "
+                f"target {target}",
+            )
+        LOGGER.info(f"{cls}/{cls_id}: {cls_status}")
+
+        if cls_status == "failed":
+            cls_error = cls_instance.error
+            LOGGER.error(
+                f"{cls}/{cls_id}: raised an error: {cls_error}",
+            )
+
+    # Ensures that any error is recorded but allows failover to the next
+    # instance.
+    except Exception:
+        cls_status = "failed"
+        LOGGER.error(
+            f"{cls}/{cls_id}: raised an error:", exc_info=True,
+        )
+
+    finally:
+        cls_finished, cls_time_taken = update_log_finished(
+            cnxn,
+            cls_id,
+            cls_started,
+            cls_status,
+        )
+        LOGGER.info(f"{cls}/{cls_id} finished: {cls_finished}")
+        LOGGER.info(f"{cls}/{cls_id} time_taken: {cls_time_taken}")
+
+    return cls_status
+
+
 def run(
     config: dict,
     *instances: str,
@@ -56,6 +153,7 @@ def run(
                     "target": cnxns["ods"],
                 },
                 config["ods"]["adventureworks"],
+                config.get("options", {}).get("adventureworks"),
             )
 
         if len(cls_instances) == 0:
@@ -63,47 +161,26 @@ def run(
 
         else:
 
-            for cls in cls_instances.keys():
+            max_instances = int(
+                config["parameters"].get("max_instances", 1),
+            )
 
-                try:
-                    cls_started = datetime.now()
-                    cls_id = update_log_running(
+            with ThreadPoolExecutor(max_workers=max_instances) as executor:
+                futures = [
+                    executor.submit(
+                        _run_instance,
                         cnxns["mdh"],
-                        f"{job}_{cls}",
-                        cls_started,
-                        parent_id=run_id,
+                        job,
+                        run_id,
+                        cls,
+                        cls_instance,
                     )
+                    for cls, cls_instance in cls_instances.items()
+                ]
 
-                    LOGGER.info(f"{cls}/{cls_id} started: {cls_started}")
-
-                    cls_instances[cls](cls_id)
-                    cls_status = cls_instances[cls].status
-                    LOGGER.info(f"{cls}/{cls_id}: {cls_status}")
-
-                    if cls_status == "failed":
+                for future in futures:
+                    if future.result() == "failed":
                         run_status = "failed"
-                        cls_error = cls_instances[cls].error
-                        LOGGER.error(
-                            f"{cls}/{cls_id}: raised an error: {cls_error}",
-                        )
-
-                # Ensures that any error is recorded but allows failover to the
-                # next instance.
-                except Exception:
-                    cls_status = "failed"
-                    LOGGER.error(
-                        f"{cls}/{cls_id}: raised an error:", exc_info=True,
-                    )
-
-                finally:
-                    cls_finished, cls_time_taken = update_log_finished(
-                        cnxns["mdh"],
-                        cls_id,
-                        cls_started,
-                        cls_status,
-                    )
-                    LOGGER.info(f"{cls}/{cls_id} finished: {cls_finished}")
-                    LOGGER.info(f"{cls}/{cls_id} time_taken: {cls_time_taken}")
 
     # Ensures a graceful fail
     except Exception:
@@ -20,6 +20,13 @@ class BaseClassDummy(BaseClass):
         modified_field,
         max_modified,
         chunksize,
+        sizer=None,
+        ordered=False,
+        keyset=None,
+        last_key=None,
+        partitions=1,
+        partition_column=None,
+        columns=None,
     ):
         # Dummy generator implementation for testing
         yield pd.DataFrame()
@@ -97,6 +104,110 @@ class TestBaseClass:
             assert result == expected
             mock_reader.assert_called_once()
 
+    def test_read_params_optional(
+        self,
+        base_class_instance,
+    ):
+        "Test read_params includes optional parameters only when set"
+
+        test_data = pd.DataFrame([
+            {
+                "table_name": "orders",
+                "entity_name": "Order",
+                "business_key": "order_id",
+                "modified_field": "modified_at",
+                "load_method": "incremental",
+                "chunksize": 500,
+                "extract_method": "keyset",
+            },
+            {
+                "table_name": "customers",
+                "entity_name": "Customer",
+                "business_key": "customer_id",
+                "modified_field": "last_update",
+                "load_method": "incremental",
+                "chunksize": 500,
+                "extract_method": None,
+            },
+        ])
+
+        with patch(
+            "ingest_classes.base_class.db.dbms_reader",
+            return_value=test_data,
+        ):
+            result = base_class_instance.read_params()
+
+        assert result["orders"]["extract_method"] == "keyset"
+        assert "extract_method" not in result["customers"]
+
+    def test_read_column_types(
+        self,
+        base_class_instance,
+    ):
+        "Test read_column_types splits the schema from the table name"
+
+        test_df = pd.DataFrame([
+            {"column_name": "customer_id", "data_type": "int"},
+            {"column_name": "last_update", "data_type": "datetime"},
+        ])
+
+        with patch(
+            "ingest_classes.base_class.db.dbms_reader",
+            return_value=test_df,
+        ) as mock_reader:
+            result = base_class_instance.read_column_types(
+                "dummy_source",
+                "Sales.Customer",
+            )
+
+        assert result == {"customer_id": "int", "last_update": "datetime"}
+        params = mock_reader.call_args[1]["query"].compile().params
+        assert params["table_schema"] == "Sales"
+        assert params["table_name"] == "Customer"
+
+    def test_read_columns(
+        self,
+        base_class_instance,
+    ):
+        "Test read_columns only reads target columns found in the source"
+
+        target = {
+            "customer_id": "int",
+            "name": "nvarchar",
+            "ingest_datetime": "datetime",
+            "current_record": "bit",
+        }
+        source = {
+            "customer_id": "int",
+            "rowguid": "uniqueidentifier",
+            "photo": "varbinary",
+            "modified_at": "datetime",
+        }
+
+        with patch.object(
+            base_class_instance,
+            "read_column_types",
+            side_effect=[target, source],
+        ):
+            result = base_class_instance.read_columns(
+                "customers",
+                "Sales.Customer",
+                ["modified_at", "missing"],
+            )
+
+        assert result == ["customer_id", "modified_at"]
+
+        with patch.object(
+            base_class_instance,
+            "read_column_types",
+            return_value={},
+        ):
+            assert base_class_instance.read_columns(
+                "customers",
+                "Sales.Customer",
+                [],
+            ) is None
+
     def test_read_history(
         self,
         base_class_instance,
@@ -141,6 +252,269 @@ class TestBaseClass:
             assert result_none is None
             mock_reader_empty.assert_called_once()
 
+    def test_read_watermarks(
+        self,
+        base_class_instance,
+    ):
+        "Test watermarks are loaded in one query and served from memory"
+
+        test_df = pd.DataFrame([
+            {"table_name": "customers", "last_modified": pd.Timestamp(
+                "2025-08-29 12:00:00",
+            ), "row_count": None, "checksum": None,
+             "deletes_checked": pd.NaT, "chunksize": 250000},
+            {"table_name": "orders", "last_modified": pd.NaT,
+             "row_count": 10, "checksum": -123,
+             "deletes_checked": pd.Timestamp("2025-08-01"),
+             "chunksize": None},
+        ])
+
+        with patch(
+            "ingest_classes.base_class.db.dbms_reader",
+            return_value=test_df,
+        ) as mock_reader:
+
+            result = base_class_instance.read_watermarks()
+
+            assert result == {
+                "customers": datetime(2025, 8, 29, 12, 0, 0),
+                "orders": None,
+            }
+            assert base_class_instance.read_history(
+                "customers",
+                "last_update",
+            ) == datetime(2025, 8, 29, 12, 0, 0)
+            assert base_class_instance.read_history(
+                "products",
+                "last_update",
+            ) is None
+            assert base_class_instance.fingerprints == {"orders": (10, -123)}
+            assert base_class_instance.deletes_checked == {
+                "orders": datetime(2025, 8, 1),
+            }
+            assert base_class_instance.read_chunksize("customers") == 250000
+            assert base_class_instance.read_chunksize("orders") is None
+            mock_reader.assert_called_once()
+
+    @pytest.mark.parametrize(
+        "load_method, probe, expected",
+        [
+            ("incremental", {"last_modified": datetime(2025, 1, 1)}, True),
+            ("incremental", {"last_modified": datetime(2025, 1, 2)}, False),
+            ("incremental", {"last_modified": None}, True),
+            ("truncate", {"fingerprint": (10, -123)}, True),
+            ("truncate", {"fingerprint": (11, -123)}, False),
+            ("truncate", {"fingerprint": None}, False),
+        ],
+    )
+    def test_unchanged_tables(
+        self,
+        base_class_instance,
+        load_method,
+        probe,
+        expected,
+    ):
+        "Test tables are unchanged if the source hasn't passed the watermark"
+
+        params = {
+            table: {"load_method": load_method, "modified_field": "modified"}
+            for table in ["customers", "orders"]
+        }
+        base_class_instance.watermarks = {"customers": datetime(2025, 1, 1)}
+        base_class_instance.fingerprints = {"customers": (10, -123)}
+
+        result = base_class_instance.unchanged_tables(
+            params,
+            {
+                "customers": {
+                    "last_modified": None,
+                    "fingerprint": None,
+                    **probe,
+                },
+            },
+        )
+
+        # orders wasn't probed so is never skipped
+        assert result == (["customers"] if expected else [])
+
+    @pytest.mark.parametrize(
+        "table, detect_deletes, load_method, expected",
+        [
+            ("customers", None, "incremental", False),
+            ("customers", 7, "truncate", False),
+            ("customers", 7, "incremental", False),
+            ("customers", 5, "diff", True),
+            ("customers", 0, "incremental", True),
+            ("orders", 7, "incremental", True),
+        ],
+    )
+    def test_deletes_due(
+        self,
+        base_class_instance,
+        table,
+        detect_deletes,
+        load_method,
+        expected,
+    ):
+        "Test tables are checked for deletes once their interval has passed"
+
+        base_class_instance.deletes_checked = {
+            "customers": datetime(2025, 1, 1),
+        }
+
+        assert base_class_instance.deletes_due(
+            table,
+            {"detect_deletes": detect_deletes, "load_method": load_method},
+            datetime(2025, 1, 6),
+        ) is expected
+
+    def test_skip_unchanged(
+        self,
+        base_class_instance,
+    ):
+        "Test unchanged tables are only skipped when change_probe is set"
+
+        params = {
+            "customers": {"load_method": "truncate", "modified_field": None},
+            "orders": {"load_method": "truncate", "modified_field": None},
+        }
+        probes = {
+            table: {"last_modified": None, "fingerprint": (1, 1)}
+            for table in params
+        }
+        base_class_instance.fingerprints = {"customers": (1, 1)}
+
+        with patch.object(
+            base_class_instance,
+            "probe_tables",
+            return_value=probes,
+        ) as mock_probe:
+            assert base_class_instance.skip_unchanged(params) == params
+            mock_probe.assert_not_called()
+
+            base_class_instance.change_probe = True
+            result = base_class_instance.skip_unchanged(params)
+
+        assert list(result) == ["orders"]
+        assert base_class_instance.skipped == ["customers"]
+
+    def test_skip_unchanged_probe_failed(
+        self,
+        base_class_instance,
+    ):
+        "Test tables are probed one at a time if probing them together fails"
+
+        params = {
+            "customers": {"load_method": "truncate", "modified_field": None},
+            "orders": {"load_method": "truncate", "modified_field": None},
+            "missing": {"load_method": "truncate", "modified_field": None},
+        }
+        base_class_instance.fingerprints = {"customers": (1, 1)}
+        base_class_instance.change_probe = True
+
+        def _probe_tables(tables):
+            if len(tables) > 1 or "missing" in tables:
+                raise ValueError("Invalid object name")
+            return {
+                table: {"last_modified": None, "fingerprint": (1, 1)}
+                for table in tables
+            }
+
+        with patch.object(
+            base_class_instance,
+            "probe_tables",
+            side_effect=_probe_tables,
+        ):
+            result = base_class_instance.skip_unchanged(params)
+
+        assert list(result) == ["orders", "missing"]
+        assert base_class_instance.skipped == ["customers"]
+        assert base_class_instance.unprobed == ["missing"]
+
+    def test_read_chunksize(
+        self,
+        base_class_instance,
+    ):
+        "Test read_chunksize returns the learned chunksize or None"
+
+        with patch(
+            "ingest_classes.base_class.db.dbms_reader",
+            return_value=pd.DataFrame([{"chunksize": 250000}]),
+        ):
+            assert base_class_instance.read_chunksize("customers") == 250000
+
+        with patch(
+            "ingest_classes.base_class.db.dbms_reader",
+            return_value=pd.DataFrame(columns=["chunksize"]),
+        ):
+            assert base_class_instance.read_chunksize("customers") is None
+
+    def test_read_checkpoint(
+        self,
+        base_class_instance,
+    ):
+        "Test read_checkpoint returns the checkpoint or None"
+
+        checkpoint = {
+            "load_method": "truncate",
+            "ingest_datetime": datetime(2025, 8, 29, 15, 0, 0),
+            "chunk_count": 40,
+            "last_modified": datetime(2025, 8, 1, 12, 0, 0),
+            "last_key": None,
+        }
+
+        with patch(
+            "ingest_classes.base_class.db.dbms_reader",
+            return_value=pd.DataFrame([checkpoint]),
+        ):
+            result = base_class_instance.read_checkpoint("customers")
+
+        assert result == checkpoint
+
+        with patch(
+            "ingest_classes.base_class.db.dbms_reader",
+            return_value=pd.DataFrame([{**checkpoint, "last_key": "[42]"}]),
+        ):
+            result = base_class_instance.read_checkpoint("customers")
+
+        assert result["last_key"] == [42]
+
+        with patch(
+            "ingest_classes.base_class.db.dbms_reader",
+            return_value=pd.DataFrame(columns=list(checkpoint)),
+        ):
+            assert base_class_instance.read_checkpoint("customers") is None
+
+    @pytest.mark.parametrize(
+        "watermark, values, expected",
+        [
+            # first chunk, the highest value may continue in the next chunk
+            ((None, None), [1, 2, 2, 3, 3], (3, 2)),
+            # a single value can't be known to be complete
+            ((None, None), [1, 1], (1, None)),
+            # the previous highest value is now complete
+            ((3, 2), [3, 4, 4], (4, 3)),
+            ((3, 2), [5, 5], (5, 3)),
+            # the chunk continues the previous highest value
+            ((3, 2), [3, 3], (3, 2)),
+            ((3, 2), [], (3, 2)),
+        ],
+    )
+    def test_advance_watermark(
+        self,
+        watermark,
+        values,
+        expected,
+    ):
+        "Test advance_watermark only completes values below the highest"
+
+        result = BaseClass.advance_watermark(
+            watermark,
+            pd.Series(values, dtype="int64"),
+        )
+
+        assert result == expected
+
     def test_transform(
         self,
         base_class_instance,
@@ -155,19 +529,19 @@ class TestBaseClass:
             "extra_column": ["a", "b"],
         })
 
-        target_columns = pd.DataFrame(
-            columns=[
-                "customer_id",
-                "name",
-                "email",
-                "ingest_datetime",
-                "current_record",
-            ],
-        )
+        base_class_instance.schema_cache[("test_schema", "customers")] = {
+            column: {"data_type": data_type, "max_length": None}
+            for column, data_type in [
+                ("customer_id", "int"),
+                ("name", "nvarchar"),
+                ("email", "nvarchar"),
+                ("ingest_datetime", "datetime"),
+                ("current_record", "bit"),
+            ]
+        }
 
         with patch(
             "ingest_classes.base_class.db.dbms_reader",
-            return_value=target_columns,
         ) as mock_reader:
 
             start_time = datetime(2025, 8, 29, 15, 0, 0)
@@ -200,7 +574,8 @@ class TestBaseClass:
             assert (result_df["ingest_datetime"] == start_time).all()
             assert (result_df["current_record"]).all()
 
-            mock_reader.assert_called_once()
+            # Target columns are read from the schema cache
+            mock_reader.assert_not_called()
 
     # -----------------------------
     # Additional tests for uncovered branches
@@ -213,11 +588,15 @@ class TestBaseClass:
         "Test transform_data branch where missing fields are added"
 
         input_df = pd.DataFrame({"customer_id": [1]})
-        target_columns = pd.DataFrame(columns=["customer_id", "name"])
+        target_types = pd.DataFrame([
+            {"column_name": "customer_id", "data_type": "int"},
+            {"column_name": "name", "data_type": "nvarchar"},
+        ])
 
+        # Not cached, so read from the target
         with patch(
             "ingest_classes.base_class.db.dbms_reader",
-            return_value=target_columns,
+            return_value=target_types,
         ):
             result_df = base_class_instance.transform_data(
                 df=input_df,
@@ -228,6 +607,40 @@ class TestBaseClass:
             # 'name' column should be added
             assert "name" in result_df.columns
 
+    def test_transform_typed_nulls(
+        self,
+        base_class_instance,
+    ):
+        "Test transform_data adds typed NULLs and leaves the input unchanged"
+
+        input_df = pd.DataFrame({"customer_id": [1, 2]})
+        base_class_instance.schema_cache[("test_schema", "customers")] = {
+            column: {"data_type": data_type, "max_length": None}
+            for column, data_type in [
+                ("customer_id", "int"),
+                ("rank", "smallint"),
+                ("signup", "datetime"),
+                ("ingest_datetime", "datetime"),
+                ("current_record", "bit"),
+            ]
+        }
+
+        result_df = base_class_instance.transform_data(
+            df=input_df,
+            table_name="customers",
+            start_time=datetime(2025, 8, 29),
+        )
+
+        assert str(result_df["rank"].dtype) == "Int16"
+        assert str(result_df["signup"].dtype) == "datetime64[ns]"
+        assert result_df["rank"].isna().all()
+        assert list(input_df.columns) == ["customer_id"]
+
+        # The plan is reused until the table's definition is invalidated
+        assert ("test_schema", "customers") in base_class_instance.column_plans
+        base_class_instance.invalidate_schema_cache("customers")
+        assert base_class_instance.column_plans == {}
+
     def test_read_history_empty_branch(
         self,
         base_class_instance,
@@ -244,3 +657,741 @@ class TestBaseClass:
                 modified_field="last_update",
             )
             assert result is None
+
+    def test_fetch_chunks(
+        self,
+        base_class_instance,
+    ):
+        "Test fetch_chunks yields every chunk and releases its source slot"
+
+        chunks = [pd.DataFrame({"a": [1]}), pd.DataFrame({"a": [2]})]
+
+        result = list(base_class_instance.fetch_chunks(iter(chunks)))
+
+        assert result == chunks
+        assert base_class_instance._source_slots.acquire(blocking=False)
+
+    def test_fetch_chunks_without_slots(
+        self,
+        base_class_instance,
+    ):
+        "Test fetch_chunks doesn't wait for a source slot if told not to"
+
+        chunks = [pd.DataFrame({"a": [1]})]
+
+        # Hold every slot, as the readers of a partitioned read might
+        while base_class_instance._source_slots.acquire(blocking=False):
+            pass
+
+        result = list(
+            base_class_instance.fetch_chunks(iter(chunks), slots=False),
+        )
+
+        assert result == chunks
+
+    def test_write_staging_unknown_engine(
+        self,
+        base_class_instance,
+    ):
+        "Test write_staging rejects an unknown write engine"
+
+        with pytest.raises(ValueError, match="Unknown write_engine"):
+            base_class_instance.write_staging(
+                pd.DataFrame({"a": [1]}),
+                "customers_stage_1",
+                "odbc",
+            )
+
+    @pytest.mark.parametrize(
+        "upsert_method, expected",
+        [
+            ("in", ["WHERE current_record = 1", "[id] IN ("]),
+            ("join", ["INNER JOIN (", "WHERE tgt.current_record = 1"]),
+            ("merge", [
+                "MERGE [test_schema].[customers]",
+                "AND tgt.current_record = 1",
+                "VALUES (src.[id], src.[current_record])",
+            ]),
+        ],
+    )
+    def test_upsert_statements(
+        self,
+        base_class_instance,
+        upsert_method,
+        expected,
+    ):
+        "Test each upsert method only expires current records"
+
+        base_class_instance.schema_cache[("test_schema", "customers")] = {
+            "id": {"data_type": "int", "max_length": None},
+            "current_record": {"data_type": "bit", "max_length": None},
+        }
+
+        statements = base_class_instance.upsert_statements(
+            "customers",
+            "id",
+            "customers_stage_1",
+            upsert_method,
+        )
+
+        assert len(statements) == (1 if upsert_method == "merge" else 2)
+        for fragment in expected:
+            assert fragment in statements[0]
+        assert "[test_schema].[customers_stage_1]" in statements[-1]
+
+        with pytest.raises(ValueError, match="Unknown upsert_method"):
+            base_class_instance.upsert_statements(
+                "customers",
+                "id",
+                "customers_stage_1",
+                "replace",
+            )
+
+    def test_upsert_statements_composite_key(
+        self,
+        base_class_instance,
+    ):
+        "Test composite keys are matched on every column"
+
+        base_class_instance.schema_cache[("test_schema", "lines")] = {
+            "order_id": {"data_type": "int", "max_length": None},
+            "line_id": {"data_type": "int", "max_length": None},
+            "current_record": {"data_type": "bit", "max_length": None},
+        }
+
+        for upsert_method in base_class_instance.upsert_methods:
+            statement = base_class_instance.upsert_statements(
+                "lines",
+                "order_id,line_id",
+                "lines_stage_1",
+                upsert_method,
+            )[0]
+
+            assert " IN (" not in statement
+            assert ".[order_id] = " in statement
+            assert ".[line_id] = " in statement
+
+    def test_flag_current(
+        self,
+        base_class_instance,
+    ):
+        "Test only the latest version of each key in a chunk is current"
+
+        df = pd.DataFrame({
+            "order_id": [1, 1, 1, 2],
+            "line_id": [1, 1, 2, 1],
+            "modified": pd.to_datetime([
+                "2025-01-02", "2025-01-01", "2025-01-01", "2025-01-01",
+            ]),
+            "current_record": True,
+        })
+
+        result = base_class_instance.flag_current(
+            df,
+            "order_id,line_id",
+            "modified",
+        )
+
+        assert result["current_record"].tolist() == [True, False, True, True]
+        assert df["current_record"].all()
+
+        unique = df.iloc[[0, 2, 3]]
+        assert base_class_instance.flag_current(
+            unique,
+            ["order_id", "line_id"],
+        ) is unique
+
+    def test_key_bounds(
+        self,
+        base_class_instance,
+    ):
+        "Test the lowest and highest keys of a chunk ignore NULL keys"
+
+        df = pd.DataFrame({
+            "order_id": [3, 1, None, 2],
+            "line_id": [1, 2, 1, 9],
+        })
+
+        assert base_class_instance.key_bounds(df, "order_id") == (
+            (1,),
+            (3,),
+        )
+        assert base_class_instance.key_bounds(df, "order_id,line_id") == (
+            (1, 2),
+            (3, 1),
+        )
+        assert base_class_instance.key_bounds(df.iloc[[2]], "order_id") == (
+            None,
+            None,
+        )
+
+    @pytest.mark.parametrize(
+        "low, max_key, expected",
+        [
+            ((5,), (4,), True),
+            ((4,), (4,), False),
+            ((1, 9), (2, 1), False),
+            ((5,), None, True),
+            (None, (4,), False),
+            (("a",), (4,), False),
+        ],
+    )
+    def test_insert_only(
+        self,
+        base_class_instance,
+        low,
+        max_key,
+        expected,
+    ):
+        "Test chunks are only insert only when above every target key"
+
+        assert base_class_instance.insert_only(low, max_key) is expected
+
+    def test_read_max_key(
+        self,
+        base_class_instance,
+    ):
+        "Test the highest current key is read in descending key order"
+
+        base_class_instance.schema_cache[("test_schema", "lines")] = {
+            "order_id": {"data_type": "int", "max_length": None},
+            "code": {"data_type": "nvarchar", "max_length": 3},
+        }
+
+        with patch(
+            "ingest_classes.base_class.db.dbms_reader",
+            side_effect=[
+                pd.DataFrame({"order_id": [7], "code": ["b"]}),
+                pd.DataFrame({"order_id": [], "code": []}),
+            ],
+        ) as mock_reader:
+            assert base_class_instance.read_max_key(
+                "lines",
+                "order_id,code",
+            ) == (7, "b")
+            assert base_class_instance.read_max_key(
+                "lines",
+                "order_id",
+            ) is None
+
+        query = mock_reader.call_args_list[0][1]["query"].text
+        assert "WHERE current_record = 1" in query
+        assert (
+            "ORDER BY [order_id] desc, [code] COLLATE Latin1_General_BIN2 desc"
+            in query
+        )
+
+    def test_ingest_table_fast_path(
+        self,
+        base_class_instance,
+    ):
+        "Test incremental chunks above the target's keys skip the expire step"
+
+        parameters = {
+            "entity_name": "Order",
+            "business_key": "order_id",
+            "modified_field": "modified_at",
+            "load_method": "incremental",
+            "chunksize": None,
+        }
+
+        chunks = [
+            pd.DataFrame({
+                "order_id": ids,
+                "modified_at": pd.to_datetime(["2025-01-01"] * len(ids)),
+                "current_record": True,
+            })
+            for ids in ([11, 12], [5, 13], [14])
+        ]
+
+        instance = base_class_instance
+        with (
+            patch.object(instance, "read_columns", return_value=None),
+            patch.object(instance, "read_history", return_value=None),
+            patch.object(instance, "read_max_key", return_value=(10,)),
+            patch.object(instance, "read_data", return_value=iter(chunks)),
+            patch.object(
+                instance,
+                "transform_data",
+                side_effect=lambda chunk, *args: chunk,
+            ),
+            patch.object(instance, "create_staging"),
+            patch.object(instance, "write_data") as mock_write,
+            patch.object(instance, "drop_staging"),
+            patch.object(instance, "write_to_history") as mock_history,
+        ):
+
+            instance.ingest_table(1, "orders", parameters)
+
+        assert instance.status == "succeeded"
+        assert [call[0][-1] for call in mock_write.call_args_list] == [
+            True,
+            False,
+            True,
+        ]
+        assert mock_history.call_args[1]["chunks"] == 3
+        assert mock_history.call_args[1]["insert_only_chunks"] == 2
+
+    def test_ingest_table_deletes_failed(
+        self,
+        base_class_instance,
+    ):
+        "Test an error detecting deletes leaves the load completed"
+
+        parameters = {
+            "entity_name": "Order",
+            "business_key": "order_id",
+            "modified_field": "modified_at",
+            "load_method": "incremental",
+            "detect_deletes": 1,
+            "chunksize": None,
+        }
+
+        chunk = pd.DataFrame({
+            "order_id": [1, 2],
+            "modified_at": pd.to_datetime(["2025-01-01", "2025-01-02"]),
+        })
+
+        instance = base_class_instance
+        with (
+            patch.object(instance, "read_columns", return_value=None),
+            patch.object(instance, "read_history", return_value=None),
+            patch.object(instance, "read_max_key", return_value=None),
+            patch.object(instance, "read_data", return_value=iter([chunk])),
+            patch.object(
+                instance,
+                "transform_data",
+                side_effect=lambda chunk, *args: chunk,
+            ),
+            patch.object(instance, "create_staging"),
+            patch.object(instance, "write_data"),
+            patch.object(instance, "drop_staging"),
+            patch.object(
+                instance,
+                "detect_deletes",
+                side_effect=ValueError("target keys out of order"),
+            ),
+            patch.object(instance, "write_to_history") as mock_history,
+        ):
+
+            instance.ingest_table(1, "orders", parameters)
+
+        assert instance.status == "failed"
+        assert "deletes: ValueError" in instance.error
+
+        # The highest value written is recorded, as for any complete load
+        assert mock_history.call_args[0][8] == pd.Timestamp("2025-01-02")
+        assert mock_history.call_args[1]["verify"] is True
+
+    def test_ingest_table_append_failed(
+        self,
+        base_class_instance,
+    ):
+        "Test a failed append load removes the records it wrote"
+
+        parameters = {
+            "entity_name": "TransactionHistory",
+            "business_key": "TransactionID",
+            "modified_field": "ModifiedDate",
+            "load_method": "append",
+            "partitions": 4,
+            "chunksize": None,
+        }
+        previous = datetime(2025, 1, 1)
+
+        def _read_data(*args, **kwargs):
+            yield pd.DataFrame({
+                "TransactionID": [1, 2],
+                "ModifiedDate": pd.to_datetime(["2025-01-03", "2025-01-02"]),
+            })
+            raise ValueError("partition failed")
+
+        instance = base_class_instance
+        with (
+            patch.object(instance, "read_columns", return_value=None),
+            patch.object(instance, "read_history", return_value=previous),
+            patch.object(instance, "read_data", side_effect=_read_data),
+            patch.object(
+                instance,
+                "transform_data",
+                side_effect=lambda chunk, *args: chunk,
+            ),
+            patch.object(instance, "create_staging"),
+            patch.object(instance, "write_data") as mock_write,
+            patch.object(instance, "drop_staging"),
+            patch.object(instance, "rollback_checkpoint") as mock_rollback,
+            patch.object(instance, "write_to_history") as mock_history,
+        ):
+
+            instance.ingest_table(1, "TransactionHistory", parameters)
+
+        assert instance.status == "failed"
+        mock_write.assert_called_once()
+
+        # Partitioned reads aren't ordered, so every record written is
+        # beyond the previous watermark, which is recorded again
+        table, modified_field, checkpoint = mock_rollback.call_args[0]
+        assert table == "TransactionHistory"
+        assert modified_field == "ModifiedDate"
+        assert checkpoint["last_modified"] == previous
+        assert mock_history.call_args[0][8] == previous
+        assert mock_history.call_args[1]["verify"] is False
+
+    def test_diff_chunk(
+        self,
+        base_class_instance,
+    ):
+        "Test only new or changed current records are kept, with their hashes"
+
+        df = pd.DataFrame({
+            "id": [1, 2, 3, 3],
+            "name": ["a", "b", "c", "d"],
+            "ingest_datetime": pd.Timestamp("2025-01-01"),
+            "current_record": [True, True, False, True],
+        })
+
+        first, hashes = base_class_instance.diff_chunk(
+            df,
+            "customers",
+            "id",
+            pd.Series([], dtype="int64"),
+        )
+
+        assert first["name"].tolist() == ["a", "b", "d"]
+        assert list(hashes.columns) == ["table_name", "key_hash", "row_hash"]
+        assert (hashes["table_name"] == "customers").all()
+
+        # A later run only writes the record that changed, whatever its
+        # ingest_datetime
+        stored = pd.Series(
+            hashes["row_hash"].to_numpy(),
+            index=pd.Index(hashes["key_hash"].to_numpy()),
+        )
+        df.loc[1, "name"] = "B"
+        df["ingest_datetime"] = pd.Timestamp("2025-01-02")
+
+        second, hashes = base_class_instance.diff_chunk(
+            df,
+            "customers",
+            "id",
+            stored,
+        )
+
+        assert second["name"].tolist() == ["B"]
+        assert len(hashes) == 1
+
+    def test_read_row_hashes(
+        self,
+        base_class_instance,
+    ):
+        "Test row hashes are returned indexed by key hash"
+
+        with patch(
+            "ingest_classes.base_class.db.dbms_reader",
+            return_value=pd.DataFrame({"key_hash": [5], "row_hash": [-7]}),
+        ) as mock_reader:
+            result = base_class_instance.read_row_hashes("customers")
+
+        assert result.to_dict() == {5: -7}
+        assert result.dtype == "int64"
+        query = mock_reader.call_args[1]["query"]
+        assert query.compile().params["table_name"] == "customers"
+
+    def test_staging_name(
+        self,
+        base_class_instance,
+    ):
+        "Test staging tables are named per table and run"
+
+        assert (
+            base_class_instance.staging_name("customers", 42)
+            == "customers_stage_42"
+        )
+
+    def test_fetch_chunks_dtypes(
+        self,
+        base_class_instance,
+    ):
+        "Test fetch_chunks converts chunks to the table's dtype plan"
+
+        base_class_instance.schema_cache[("test_schema", "customers")] = {
+            "qty": {"data_type": "tinyint", "max_length": None},
+            "code": {"data_type": "nchar", "max_length": 3},
+        }
+        chunks = [pd.DataFrame({"qty": [1, 2], "code": ["GB", "US"]})]
+
+        dtypes = base_class_instance.dtype_plan("customers")
+        result = list(base_class_instance.fetch_chunks(iter(chunks), dtypes))
+
+        assert str(result[0]["qty"].dtype) == "UInt8"
+        assert str(result[0]["code"].dtype) == "category"
+        assert ("test_schema", "customers") in base_class_instance.dtype_plans
+
+    def test_call_records_errors_per_table(
+        self,
+        base_class_instance,
+    ):
+        "Test a failing table is recorded without stopping the other tables"
+
+        params = {
+            "customers": {
+                "entity_name": "Customer",
+                "business_key": "customer_id",
+                "modified_field": "last_update",
+                "load_method": "truncate",
+                "chunksize": None,
+            },
+            "orders": {
+                "entity_name": "Order",
+                "business_key": "order_id",
+                "modified_field": "modified_at",
+                "load_method": "truncate",
+                "chunksize": None,
+            },
+        }
+
+        def _read_data(entity_name, *args, **kwargs):
+            if entity_name == "Customer":
+                raise ValueError("source unavailable")
+            yield pd.DataFrame({
+                "order_id": [1, 2],
+                "modified_at": pd.to_datetime(["2025-01-01", "2025-01-02"]),
+            })
+
+        instance = base_class_instance
+        with (
+            patch.object(instance, "load_schema_cache"),
+            patch.object(instance, "read_watermarks"),
+            patch.object(instance, "read_params", return_value=params),
+            patch.object(instance, "read_durations", return_value={}),
+            patch.object(instance, "read_columns", return_value=None),
+            patch.object(instance, "read_history", return_value=None),
+            patch.object(instance, "read_data", side_effect=_read_data),
+            patch.object(
+                instance,
+                "transform_data",
+                return_value=pd.DataFrame({"order_id": [1, 2]}),
+            ) as mock_transform,
+            patch.object(instance, "create_staging") as mock_create,
+            patch.object(instance, "write_data") as mock_write,
+            patch.object(instance, "drop_staging") as mock_drop,
+            patch.object(instance, "write_to_history") as mock_history,
+        ):
+
+            instance(1)
+
+        assert instance.status == "failed"
+        assert "table: customers" in instance.error
+        assert "source unavailable" in instance.error
+        mock_transform.assert_called_once()
+        mock_create.assert_called_once_with("orders", "orders_stage_1")
+        mock_write.assert_called_once()
+        mock_drop.assert_called_once_with("orders_stage_1")
+        mock_history.assert_called_once()
+
+    def test_ingest_table_swap(
+        self,
+        base_class_instance,
+    ):
+        "Test swap loads write to a shadow table and swap it in"
+
+        parameters = {
+            "entity_name": "Order",
+            "business_key": "order_id",
+            "modified_field": "modified_at",
+            "load_method": "swap",
+            "chunksize": None,
+        }
+
+        def _read_data(*args, **kwargs):
+            yield pd.DataFrame({
+                "order_id": [1, 2],
+                "modified_at": pd.to_datetime(["2025-01-01", "2025-01-02"]),
+            })
+
+        instance = base_class_instance
+        with (
+            patch.object(instance, "read_columns", return_value=None),
+            patch.object(instance, "read_history", return_value=None),
+            patch.object(instance, "read_data", side_effect=_read_data),
+            patch.object(
+                instance,
+                "transform_data",
+                return_value=pd.DataFrame({"order_id": [1, 2]}),
+            ),
+            patch.object(instance, "create_staging") as mock_create,
+            patch.object(instance, "write_data") as mock_write,
+            patch.object(instance, "swap_table") as mock_swap,
+            patch.object(instance, "drop_staging") as mock_drop,
+            patch.object(instance, "write_to_history") as mock_history,
+        ):
+
+            instance.ingest_table(7, "orders", parameters)
+
+        assert instance.status == "succeeded"
+        mock_create.assert_any_call("orders", "orders_shadow_7")
+        assert mock_write.call_args[0][1] == "orders_shadow_7"
+        assert mock_swap.call_args[0][:3] == ("orders", "orders_shadow_7", 7)
+        mock_drop.assert_called_once_with("orders_stage_7")
+
+        # The watermark is tracked from the chunks written
+        assert mock_history.call_args[0][-1] == pd.Timestamp("2025-01-02")
+
+    def test_read_durations(
+        self,
+        base_class_instance,
+    ):
+        "Test read_durations returns average time and rows per table"
+
+        test_df = pd.DataFrame([
+            {"table_name": "customers", "time_taken": 12.5,
+             "rows_processed": 1000.0},
+        ])
+
+        with patch(
+            "ingest_classes.base_class.db.dbms_reader",
+            return_value=test_df,
+        ) as mock_reader:
+
+            result = base_class_instance.read_durations()
+
+            assert result == {"customers": (12.5, 1000.0)}
+            called_query = mock_reader.call_args[1]["query"]
+            assert "run_rank <= :schedule_runs" in called_query.text
+            assert called_query.compile().params["schedule_runs"] == 5
+
+    def test_schedule_tables(
+        self,
+        base_class_instance,
+    ):
+        "Test schedule_tables orders longest first and balances workers"
+
+        params = {
+            table: {"entity_name": f"dbo.{table}"}
+            for table in ["small", "large", "unseen", "unknown", "medium"]
+        }
+        durations = {
+            "small": (10.0, 1000.0),
+            "large": (100.0, 10000.0),
+            "medium": (50.0, 5000.0),
+        }
+        # 10,000 rows at the historic rate of 0.01 seconds per row
+        row_counts = {"dbo.unseen": 10000}
+
+        base_class_instance.source_workers = 2
+        plan = base_class_instance.schedule_tables(
+            params,
+            durations,
+            row_counts,
+        )
+
+        assert [entry["table_name"] for entry in plan] == [
+            "large",
+            "unseen",
+            "medium",
+            "small",
+            "unknown",
+        ]
+        assert [entry["basis"] for entry in plan] == [
+            "history",
+            "row_count",
+            "history",
+            "history",
+            "none",
+        ]
+        assert plan[1]["estimate"] == pytest.approx(100.0)
+        assert [entry["worker"] for entry in plan] == [0, 1, 0, 1, 1]
+
+    def test_plan_tables(
+        self,
+        base_class_instance,
+    ):
+        "Test plan_tables reorders params and only estimates unseen tables"
+
+        params = {
+            "small": {"entity_name": "dbo.small"},
+            "large": {"entity_name": "dbo.large"},
+        }
+
+        with (
+            patch.object(
+                base_class_instance,
+                "read_durations",
+                return_value={"small": (1.0, 10.0)},
+            ),
+            patch.object(
+                base_class_instance,
+                "estimate_rows",
+                return_value={"dbo.large": 1000},
+            ) as mock_estimate,
+        ):
+            result = base_class_instance.plan_tables(params)
+
+        assert list(result) == ["large", "small"]
+        assert result["large"] is params["large"]
+        assert len(base_class_instance.plan) == 2
+        mock_estimate.assert_called_once_with(["dbo.large"])
+
+    def test_load_schema_cache(
+        self,
+        base_class_instance,
+    ):
+        "Test the schema cache is loaded in one query and can be invalidated"
+
+        test_df = pd.DataFrame([
+            {"table_name": "customers", "column_name": "customer_id",
+             "data_type": "int", "max_length": None},
+            {"table_name": "customers", "column_name": "name",
+             "data_type": "nvarchar", "max_length": 50},
+            {"table_name": "orders", "column_name": "order_id",
+             "data_type": "int", "max_length": None},
+        ])
+
+        with patch(
+            "ingest_classes.base_class.db.dbms_reader",
+            return_value=test_df,
+        ) as mock_reader:
+            base_class_instance.load_schema_cache()
+
+            assert base_class_instance.target_columns("customers") == {
+                "customer_id": {"data_type": "int", "max_length": None},
+                "name": {"data_type": "nvarchar", "max_length": 50},
+            }
+            assert base_class_instance.target_types("orders") == {
+                "order_id": "int",
+            }
+            mock_reader.assert_called_once()
+
+        base_class_instance.invalidate_schema_cache("customers")
+        assert list(base_class_instance.schema_cache) == [
+            ("test_schema", "orders"),
+        ]
+
+        base_class_instance.invalidate_schema_cache()
+        assert base_class_instance.schema_cache == {}
+
+    def test_target_keys(
+        self,
+        base_class_instance,
+    ):
+        "Test target keys skip NULL keys, as source keys do"
+
+        with (
+            patch.object(
+                base_class_instance,
+                "target_types",
+                return_value={"order_id": "int", "code": "nvarchar"},
+            ),
+            patch(
+                "ingest_classes.base_class.db.dbms_read_chunks",
+                return_value=iter([]),
+            ) as mock_db,
+        ):
+            base_class_instance.target_keys("orders", ["order_id", "code"], 10)
+
+        query = mock_db.call_args[1]["query"].text
+        assert "[order_id] IS NOT NULL AND [code] IS NOT NULL" in query
+        assert (
+            "ORDER BY [order_id] asc, [code] COLLATE Latin1_General_BIN2 asc"
+            in query
+        )
@@ -0,0 +1,65 @@
+import sys
+from pathlib import Path
+
+# Ensure project root is on sys.path for imports
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+from helpers.chunk_helper import ChunkSizer  # noqa: E402
+
+
+class TestChunkSizer:
+    """Unit tests for ChunkSizer."""
+
+    def test_initial_chunksize_is_clamped(
+        self,
+    ):
+        "Test the starting chunksize is kept within min_size and max_size"
+
+        assert ChunkSizer(5, 100, 1000).chunksize == 100
+        assert ChunkSizer(5000, 100, 1000).chunksize == 1000
+        assert ChunkSizer(500, 100, 1000).chunksize == 500
+
+    def test_grows_gradually_up_to_max_size(
+        self,
+    ):
+        "Test chunksize doubles per chunk while nothing constrains it"
+
+        sizer = ChunkSizer(1000, 100, 5000)
+        sizes = []
+        for _ in range(4):
+            sizer.record_read(sizer.chunksize, sizer.chunksize * 10, 0.1)
+            sizer.record_write(sizer.chunksize, 0.1)
+            sizes.append(sizer.chunksize)
+
+        assert sizes == [2000, 4000, 5000, 5000]
+
+    def test_shrinks_to_memory_budget(
+        self,
+    ):
+        "Test chunksize shrinks towards the memory budget"
+
+        # 1,000 bytes per row against a budget of 100,000 bytes
+        sizer = ChunkSizer(1000, 10, 10000, memory_bytes=100000)
+        sizes = []
+        for _ in range(4):
+            sizer.record_read(sizer.chunksize, sizer.chunksize * 1000, 0.1)
+            sizer.record_write(sizer.chunksize, 0.1)
+            sizes.append(sizer.chunksize)
+
+        assert sizes == [500, 250, 125, 100]
+
+    def test_targets_seconds_per_chunk(
+        self,
+    ):
+        "Test chunksize settles on the target seconds per chunk"
+
+        # 0.001 seconds per row against a target of 2 seconds per chunk
+        sizer = ChunkSizer(1000, 10, 10000, target_seconds=2)
+        sizer.record_read(1000, 1000, 0.5)
+        sizer.record_write(1000, 0.5)
+
+        assert sizer.chunksize == 2000
+
+        sizer.record_read(2000, 2000, 1.0)
+        sizer.record_write(2000, 1.0)
+
+        assert sizer.chunksize == 2000
@@ -4,6 +4,7 @@ from pathlib import Path
 from unittest.mock import MagicMock
 from unittest.mock import patch
 
+import pandas as pd
 import pytest
 
 # Ensure project root is on sys.path for imports
@@ -38,7 +39,7 @@ class TestDBMSClass:
                 None,
                 [
                     "SELECT *",
-                    "FROM customers",
+                    "FROM [customers]",
                 ],  # no WHERE clause expected
             ),
             (
@@ -47,9 +48,9 @@ class TestDBMSClass:
                 datetime(2025, 8, 29, 15, 0, 0, 123456),
                 [
                     "SELECT *",
-                    "FROM orders",
-                    "WHERE last_update > '2025-08-29 15:00:00.123'",
-                    "ORDER BY last_update asc",
+                    "FROM [orders]",
+                    "WHERE [last_update] > CAST(:max_modified AS datetime)",
+                    "ORDER BY [last_update] asc",
                 ],
             ),
         ],
@@ -67,10 +68,17 @@ class TestDBMSClass:
         """
 
         test_chunk = MagicMock()
-        with patch(
-            "ingest_classes.dbms_class.db.dbms_read_chunks",
-            return_value=[test_chunk],
-        ) as mock_db:
+        with (
+            patch.object(
+                dbms_instance,
+                "read_column_types",
+                return_value={modified_field: "datetime"},
+            ),
+            patch(
+                "ingest_classes.dbms_class.db.dbms_read_chunks",
+                return_value=[test_chunk],
+            ) as mock_db,
+        ):
             chunks = list(
                 dbms_instance.read_data(
                     entity_name=entity_name,
@@ -88,3 +96,444 @@ class TestDBMSClass:
         called_query = mock_db.call_args[1]["query"].text
         for snippet in expected_snippets:
             assert snippet in called_query
+
+        # The watermark is bound at full precision
+        if max_modified is not None:
+            params = mock_db.call_args[1]["query"].compile().params
+            assert params["max_modified"] == max_modified
+
+    def test_read_data_ordered(
+        self,
+        dbms_instance,
+    ):
+        "Test read_data orders a full read when asked to"
+
+        with patch(
+            "ingest_classes.dbms_class.db.dbms_read_chunks",
+            return_value=[],
+        ) as mock_db:
+            list(
+                dbms_instance.read_data(
+                    entity_name="products",
+                    load_method="truncate",
+                    modified_field="modified_at",
+                    max_modified=None,
+                    chunksize=100,
+                    ordered=True,
+                ),
+            )
+
+        called_query = mock_db.call_args[1]["query"].text
+        assert "WHERE" not in called_query
+        assert "ORDER BY [modified_at] asc" in called_query
+
+    def test_read_data_adaptive(
+        self,
+        dbms_instance,
+    ):
+        "Test read_data fetches each chunk at the size given by the sizer"
+
+        result = MagicMock()
+        result.keys.return_value = ["id"]
+        result.fetchmany.side_effect = [[(1,), (2,)], [(3,)], []]
+
+        source = MagicMock()
+        cnxn = source.connect.return_value.__enter__.return_value
+        cnxn.execution_options.return_value.execute.return_value = result
+        dbms_instance.source = source
+
+        sizer = MagicMock(chunksize=2)
+
+        with patch(
+            "ingest_classes.dbms_class.db.dbms_read_chunks",
+        ) as mock_db:
+            chunks = list(
+                dbms_instance.read_data(
+                    entity_name="customers",
+                    load_method="truncate",
+                    modified_field="modified_at",
+                    max_modified=None,
+                    chunksize=100,
+                    sizer=sizer,
+                ),
+            )
+
+        mock_db.assert_not_called()
+        assert [chunk["id"].tolist() for chunk in chunks] == [[1, 2], [3]]
+        result.fetchmany.assert_called_with(2)
+        assert sizer.record_read.call_count == 2
+
+    def test_read_data_keyset(
+        self,
+        dbms_instance,
+    ):
+        "Test read_data reads keyset pages, each after the last record read"
+
+        pages = [
+            pd.DataFrame({
+                "modified_at": [datetime(2025, 8, 1), datetime(2025, 8, 2)],
+                "order_id": [7, 3],
+            }),
+            pd.DataFrame({
+                "modified_at": [datetime(2025, 8, 2)],
+                "order_id": [9],
+            }),
+        ]
+
+        with (
+            patch.object(
+                dbms_instance,
+                "read_column_types",
+                return_value={"modified_at": "datetime", "order_id": "int"},
+            ),
+            patch(
+                "ingest_classes.dbms_class.db.dbms_reader",
+                side_effect=pages,
+            ) as mock_db,
+        ):
+            chunks = list(
+                dbms_instance.read_data(
+                    entity_name="orders",
+                    load_method="incremental",
+                    modified_field="modified_at",
+                    max_modified=datetime(2025, 7, 31),
+                    chunksize=2,
+                    keyset=["order_id"],
+                ),
+            )
+
+        assert chunks == pages
+
+        # the short second page ends the read
+        assert mock_db.call_count == 2
+
+        first, second = [call[1]["query"] for call in mock_db.call_args_list]
+        assert "TOP(:page_size)" in first.text
+        assert "[modified_at] > CAST(:max_modified AS datetime)" in first.text
+        assert "ORDER BY [modified_at] asc, [order_id] asc" in first.text
+        assert first.compile().params["max_modified"] == datetime(2025, 7, 31)
+
+        assert "([modified_at] = CAST(:last_0 AS datetime)" in second.text
+        assert "AND [order_id] > :last_1)" in second.text
+        assert second.compile().params["last_0"] == datetime(2025, 8, 2)
+        assert second.compile().params["last_1"] == 3
+
+    def test_read_data_keyset_resumes_after_last_key(
+        self,
+        dbms_instance,
+    ):
+        "Test a keyset read with last_key starts after that record"
+
+        with (
+            patch.object(dbms_instance, "read_column_types", return_value={}),
+            patch(
+                "ingest_classes.dbms_class.db.dbms_reader",
+                return_value=pd.DataFrame(),
+            ) as mock_db,
+        ):
+            chunks = list(
+                dbms_instance.read_data(
+                    entity_name="orders",
+                    load_method="truncate",
+                    modified_field=None,
+                    max_modified=None,
+                    chunksize=2,
+                    keyset=["order_id"],
+                    last_key=[42],
+                ),
+            )
+
+        assert chunks == []
+        query = mock_db.call_args[1]["query"]
+        assert "WHERE (([order_id] > :last_0))" in query.text
+        assert query.compile().params["last_0"] == 42
+
+    def test_read_data_keyset_null_modified(
+        self,
+        dbms_instance,
+    ):
+        "Test a keyset read fails rather than stopping after a NULL"
+
+        page = pd.DataFrame({
+            "modified_at": [None, None],
+            "order_id": [1, 2],
+        })
+
+        with (
+            patch.object(dbms_instance, "read_column_types", return_value={}),
+            patch(
+                "ingest_classes.dbms_class.db.dbms_reader",
+                return_value=page,
+            ),
+        ):
+            with pytest.raises(ValueError, match="NULL modified_at"):
+                list(
+                    dbms_instance.read_data(
+                        entity_name="orders",
+                        load_method="truncate",
+                        modified_field="modified_at",
+                        max_modified=None,
+                        chunksize=2,
+                        keyset=["order_id"],
+                    ),
+                )
+
+    def test_read_page_retries(
+        self,
+        dbms_instance,
+    ):
+        "Test read_page retries a failed query before raising"
+
+        page = pd.DataFrame({"order_id": [1]})
+
+        with (
+            patch("ingest_classes.dbms_class.sleep") as mock_sleep,
+            patch(
+                "ingest_classes.dbms_class.db.dbms_reader",
+                side_effect=[OSError("timeout"), page],
+            ),
+        ):
+            assert dbms_instance.read_page(MagicMock()) is page
+            mock_sleep.assert_called_once_with(1)
+
+        with (
+            patch("ingest_classes.dbms_class.sleep"),
+            patch(
+                "ingest_classes.dbms_class.db.dbms_reader",
+                side_effect=OSError("timeout"),
+            ) as mock_db,
+        ):
+            with pytest.raises(OSError):
+                dbms_instance.read_page(MagicMock())
+
+            assert mock_db.call_count == 4
+
+    def test_read_data_partitioned(
+        self,
+        dbms_instance,
+    ):
+        "Test read_data reads each partition range with its own query"
+
+        def _read_chunks(source, query, chunksize):
+            yield pd.DataFrame({"order_id": [query.compile().params]})
+
+        with (
+            patch.object(
+                dbms_instance,
+                "read_column_types",
+                return_value={"modified_at": "datetime2"},
+            ),
+            patch.object(
+                dbms_instance,
+                "partition_bounds",
+                return_value=[10, 20],
+            ) as mock_bounds,
+            patch(
+                "ingest_classes.dbms_class.db.dbms_read_chunks",
+                side_effect=_read_chunks,
+            ) as mock_db,
+        ):
+            chunks = list(
+                dbms_instance.read_data(
+                    entity_name="orders",
+                    load_method="incremental",
+                    modified_field="modified_at",
+                    max_modified=datetime(2025, 8, 29),
+                    chunksize=100,
+                    partitions=3,
+                    partition_column="order_id",
+                ),
+            )
+
+        mock_bounds.assert_called_once_with(
+            "orders",
+            "order_id",
+            3,
+            ["[modified_at] > :max_modified"],
+            {"max_modified": datetime(2025, 8, 29)},
+        )
+
+        queries = sorted(
+            call[1]["query"].text for call in mock_db.call_args_list
+        )
+        assert len(queries) == 3
+        for query in queries:
+            assert "[modified_at] > :max_modified" in query
+            assert "ORDER BY" not in query
+
+        params = [chunk["order_id"][0] for chunk in chunks]
+        watermark = {"max_modified": datetime(2025, 8, 29)}
+        assert sorted(params, key=lambda p: p.get("lower", 0)) == [
+            {"upper": 10, **watermark},
+            {"lower": 10, "upper": 20, **watermark},
+            {"lower": 20, **watermark},
+        ]
+
+        # Every partition reader releases its source slot
+        assert dbms_instance._source_slots.acquire(blocking=False)
+
+    @pytest.mark.parametrize(
+        "data_type, bounds, expected",
+        [
+            ("int", {"lower": [1], "upper": [100]}, [34, 67]),
+            ("int", {"lower": [None], "upper": [None]}, []),
+            ("nvarchar", {"upper": ["c", "m", "z"]}, ["c", "m"]),
+        ],
+    )
+    def test_partition_bounds(
+        self,
+        dbms_instance,
+        data_type,
+        bounds,
+        expected,
+    ):
+        "Test partition_bounds uses MIN/MAX for integers, NTILE otherwise"
+
+        with (
+            patch.object(
+                dbms_instance,
+                "read_column_types",
+                return_value={"order_id": data_type},
+            ),
+            patch(
+                "ingest_classes.dbms_class.db.dbms_reader",
+                return_value=pd.DataFrame(bounds),
+            ) as mock_db,
+        ):
+            result = dbms_instance.partition_bounds(
+                "orders",
+                "order_id",
+                3,
+                [],
+            )
+
+        assert result == expected
+
+        query = mock_db.call_args[1]["query"]
+        assert ("NTILE(:partitions)" in query.text) == (data_type != "int")
+        assert "[order_id]" in query.text
+
+    def test_partition_ranges(
+        self,
+        dbms_instance,
+    ):
+        "Test partition_ranges covers every value exactly once"
+
+        assert dbms_instance.partition_ranges("id", []) == [("1 = 1", {})]
+
+        ranges = dbms_instance.partition_ranges("id", [10])
+        assert ranges == [
+            ("([id] <= :upper OR [id] IS NULL)", {"upper": 10}),
+            ("[id] > :lower", {"lower": 10}),
+        ]
+
+    def test_read_data_columns(
+        self,
+        dbms_instance,
+    ):
+        "Test read_data selects only the given columns"
+
+        with patch(
+            "ingest_classes.dbms_class.db.dbms_read_chunks",
+            return_value=[],
+        ) as mock_db:
+            list(
+                dbms_instance.read_data(
+                    entity_name="customers",
+                    load_method="truncate",
+                    modified_field="modified_at",
+                    max_modified=None,
+                    chunksize=100,
+                    columns=["customer_id", "name"],
+                ),
+            )
+
+        called_query = mock_db.call_args[1]["query"].text
+        assert "SELECT [customer_id], [name]" in called_query
+        assert "*" not in called_query
+
+    def test_probe_tables(
+        self,
+        dbms_instance,
+    ):
+        "Test every table is probed in a single query"
+
+        params = {
+            "orders": {
+                "entity_name": "Sales.Orders",
+                "modified_field": "modified_at",
+                "load_method": "incremental",
+            },
+            "currency": {
+                "entity_name": "Sales.Currency",
+                "modified_field": None,
+                "load_method": "truncate",
+            },
+        }
+
+        dbms_instance.source = MagicMock()
+        dbms_instance.source.dialect.name = "mssql"
+
+        with patch(
+            "ingest_classes.dbms_class.db.dbms_reader",
+            return_value=pd.DataFrame([
+                {"table_name": "orders", "last_modified": datetime(2025, 1, 1),
+                 "row_count": None, "checksum": None},
+                {"table_name": "currency", "last_modified": None,
+                 "row_count": 105, "checksum": 42},
+            ]),
+        ) as mock_db:
+            result = dbms_instance.probe_tables(params)
+
+        assert result == {
+            "orders": {
+                "last_modified": datetime(2025, 1, 1),
+                "fingerprint": None,
+            },
+            "currency": {"last_modified": None, "fingerprint": (105, 42)},
+        }
+
+        mock_db.assert_called_once()
+        query = mock_db.call_args[1]["query"]
+        assert "MAX([modified_at])" in query.text
+        assert "FROM [Sales].[Orders]" in query.text
+        assert "CHECKSUM_AGG(BINARY_CHECKSUM(*))" in query.text
+        assert query.text.count("UNION ALL") == 1
+        assert query.compile().params == {
+            "table_0": "orders",
+            "table_1": "currency",
+        }
+
+    def test_source_keys(
+        self,
+        dbms_instance,
+    ):
+        "Test source keys are read in binary collation order"
+
+        dbms_instance.source = MagicMock()
+        dbms_instance.source.dialect.name = "mssql"
+
+        with (
+            patch.object(
+                dbms_instance,
+                "read_column_types",
+                return_value={"order_id": "int", "code": "nvarchar"},
+            ),
+            patch(
+                "ingest_classes.dbms_class.db.dbms_read_chunks",
+                return_value=iter([]),
+            ) as mock_db,
+        ):
+            dbms_instance.source_keys("Sales.Orders", ["order_id", "code"], 10)
+
+        query = mock_db.call_args[1]["query"].text
+        assert "SELECT [order_id], [code]" in query
+        assert "[order_id] IS NOT NULL AND [code] IS NOT NULL" in query
+        assert (
+            "ORDER BY [order_id] asc, [code] COLLATE Latin1_General_BIN2 asc"
+            in query
+        )
+        assert mock_db.call_args[1]["chunksize"] == 10
+
+        dbms_instance.source.dialect.name = "postgresql"
+        assert dbms_instance.source_keys("orders", ["order_id"], 10) is None
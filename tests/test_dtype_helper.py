@@ -0,0 +1,78 @@
+import sys
+from pathlib import Path
+from unittest.mock import patch
+
+import pandas as pd
+
+# Ensure project root is on sys.path for imports
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+from helpers.dtype_helper import apply_dtypes  # noqa: E402
+from helpers.dtype_helper import null_dtype  # noqa: E402
+from helpers.dtype_helper import read_dtypes  # noqa: E402
+
+
+class TestDtypeHelper:
+    """Unit tests for the dtype helpers."""
+
+    def test_null_dtype(
+        self,
+    ):
+        "Test missing columns are typed from the target column type"
+
+        assert null_dtype("SMALLINT") == "Int16"
+        assert null_dtype("datetime") == "datetime64[ns]"
+        assert null_dtype("geography") == "object"
+        assert null_dtype(None) == "object"
+
+    def test_read_dtypes(
+        self,
+    ):
+        "Test the dtype plan maps compact types and short strings to category"
+
+        definition = {
+            "flag": {"data_type": "bit", "max_length": None},
+            "qty": {"data_type": "smallint", "max_length": None},
+            "code": {"data_type": "nchar", "max_length": 3},
+            "name": {"data_type": "nvarchar", "max_length": 50},
+            "notes": {"data_type": "nvarchar", "max_length": -1},
+            "total": {"data_type": "bigint", "max_length": None},
+        }
+
+        with patch("helpers.dtype_helper.find_spec", return_value=None):
+            result = read_dtypes(definition, category_max_length=3)
+
+        assert result == {
+            "flag": "boolean",
+            "qty": "Int16",
+            "code": "category",
+            "name": "string",
+            "notes": "string",
+        }
+
+        with patch("helpers.dtype_helper.find_spec", return_value=object()):
+            result = read_dtypes(definition)
+
+        assert result["code"] == "string[pyarrow]"
+
+    def test_apply_dtypes(
+        self,
+    ):
+        "Test chunks are converted, keeping NULLs and unconvertible columns"
+
+        chunk = pd.DataFrame({
+            "qty": [1.0, None],
+            "flag": [True, False],
+            "code": ["abc", "not a number"],
+            "other": [1, 2],
+        })
+
+        result = apply_dtypes(
+            chunk,
+            {"qty": "Int16", "flag": "boolean", "code": "Int32"},
+        )
+
+        assert str(result["qty"].dtype) == "Int16"
+        assert result["qty"].isna().tolist() == [False, True]
+        assert str(result["flag"].dtype) == "boolean"
+        assert result["code"].tolist() == ["abc", "not a number"]
+        assert result["other"].dtype == "int64"
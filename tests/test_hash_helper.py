@@ -0,0 +1,59 @@
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# Ensure project root is on sys.path for imports
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+from helpers.hash_helper import changed_rows  # noqa: E402
+from helpers.hash_helper import hash_columns  # noqa: E402
+from helpers.hash_helper import normalise  # noqa: E402
+
+
+class TestHashHelper:
+    """Unit tests for the hash helpers."""
+
+    def test_normalise(
+        self,
+    ):
+        "Test whole floats are normalised to the same strings as integers"
+
+        assert normalise(pd.Series([1.0, None])).tolist() == ["1", pd.NA]
+        assert normalise(pd.Series([1, 2])).tolist() == ["1", "2"]
+        assert normalise(pd.Series([1.5])).tolist() == ["1.5"]
+
+    def test_hash_columns(
+        self,
+    ):
+        "Test equal values hash equally whatever dtype they were read as"
+
+        ints = pd.DataFrame({"id": [1, 2], "name": ["a", "b"]})
+        floats = pd.DataFrame({"id": [1.0, 2.0], "name": ["a", "b"]})
+
+        result = hash_columns(ints, ["id", "name"])
+
+        assert result.dtype == np.int64
+        assert (result == hash_columns(floats, ["id", "name"])).all()
+        assert result[0] != result[1]
+        assert (
+            hash_columns(ints, ["id"]) != hash_columns(ints, ["id", "name"])
+        ).all()
+
+    def test_changed_rows(
+        self,
+    ):
+        "Test rows are changed if their key is new or their hash differs"
+
+        stored = pd.Series([10, 20], index=pd.Index([1, 2]))
+
+        result = changed_rows(
+            np.array([1, 2, 3]),
+            np.array([10, 21, 30]),
+            stored,
+        )
+
+        assert result.tolist() == [False, True, True]
+
+        empty = pd.Series([], dtype="int64")
+        assert changed_rows(np.array([1]), np.array([10]), empty).all()
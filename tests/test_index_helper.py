@@ -0,0 +1,84 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+# Ensure project root is on sys.path for imports
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+from helpers.index_helper import index_ddl  # noqa: E402
+from helpers.index_helper import index_definitions  # noqa: E402
+
+
+class TestIndexHelper:
+    """Unit tests for the index helpers."""
+
+    def test_index_definitions(
+        self,
+    ):
+        "Test incremental tables get a filtered key index and modified index"
+
+        result = index_definitions(
+            "SalesOrderDetail",
+            "SalesOrderID,SalesOrderDetailID",
+            "ModifiedDate",
+            "incremental",
+        )
+
+        assert result == [
+            {
+                "name": "IX_SalesOrderDetail_current",
+                "columns": ["SalesOrderID", "SalesOrderDetailID"],
+                "include": [],
+                "where": "current_record = 1",
+            },
+            {
+                "name": "IX_SalesOrderDetail_modified",
+                "columns": ["ModifiedDate"],
+                "include": ["current_record"],
+                "where": None,
+            },
+        ]
+
+        assert index_definitions("Shift", "ShiftID", None, "truncate") == []
+        assert len(index_definitions("Shift", "ShiftID", None, "diff")) == 1
+
+    def test_index_ddl(
+        self,
+    ):
+        "Test index DDL only creates the index if it doesn't exist"
+
+        current, modified = index_definitions(
+            "Shift",
+            "ShiftID",
+            "ModifiedDate",
+            "incremental",
+        )
+
+        ddl = index_ddl("ods", "Shift", current)
+        assert "WHERE name = N'IX_Shift_current'" in ddl
+        assert "OBJECT_ID(N'[ods].[Shift]')" in ddl
+        assert "INDEX [IX_Shift_current]" in ddl
+        assert "ON [ods].[Shift] ([ShiftID])" in ddl
+        assert ddl.rstrip(";").endswith("WHERE current_record = 1")
+
+        ddl = index_ddl("ods", "Shift", modified)
+        assert "INCLUDE ([current_record])" in ddl
+        assert "WHERE current_record" not in ddl
+
+    def test_index_ddl_invalid_name(
+        self,
+    ):
+        "Test index DDL rejects names that can't be safely quoted"
+
+        index = {
+            "name": "IX_Shift'; DROP TABLE ods.Shift; --",
+            "columns": ["ShiftID"],
+            "include": [],
+            "where": None,
+        }
+
+        with pytest.raises(ValueError, match="Invalid identifier"):
+            index_ddl("ods", "Shift", index)
+
+        with pytest.raises(ValueError, match="Invalid identifier"):
+            index_ddl("ods", "Shift]", {**index, "name": "IX_Shift"})
@@ -0,0 +1,61 @@
+import sys
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+# Ensure project root is on sys.path for imports
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+from helpers.merge_helper import key_rows  # noqa: E402
+from helpers.merge_helper import missing_keys  # noqa: E402
+
+
+class TestMergeHelper:
+    """Unit tests for the merge helpers."""
+
+    def test_key_rows(
+        self,
+    ):
+        "Test the rows of every chunk are yielded as tuples, in order"
+
+        chunks = [
+            pd.DataFrame({"a": [1, 2], "b": ["x", "y"]}),
+            pd.DataFrame({"a": [3], "b": ["z"]}),
+        ]
+
+        assert list(key_rows(chunks)) == [(1, "x"), (2, "y"), (3, "z")]
+
+    @pytest.mark.parametrize(
+        "source, target, expected",
+        [
+            ([(1,), (3,), (5,)], [(1,), (2,), (3,), (4,), (5,)], [(2,), (4,)]),
+            ([(2,), (3,)], [(1,), (2,), (6,)], [(1,), (6,)]),
+            ([], [(1,)], [(1,)]),
+            ([(1,)], [], []),
+            (
+                [(1, "a"), (1, "c"), (2, "a")],
+                [(1, "a"), (1, "b"), (2, "a"), (2, "b")],
+                [(1, "b"), (2, "b")],
+            ),
+        ],
+    )
+    def test_missing_keys(
+        self,
+        source,
+        target,
+        expected,
+    ):
+        "Test only target keys that aren't in the source are yielded"
+
+        assert list(missing_keys(iter(source), iter(target))) == expected
+
+    def test_missing_keys_out_of_order(
+        self,
+    ):
+        "Test keys out of order raise rather than being reported missing"
+
+        with pytest.raises(ValueError, match="source keys out of order"):
+            list(missing_keys([(1,), (3,), (2,)], [(2,), (4,)]))
+
+        with pytest.raises(ValueError, match="target keys out of order"):
+            list(missing_keys([(1,)], [(2,), (1,)]))
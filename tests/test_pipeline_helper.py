@@ -0,0 +1,133 @@
+import sys
+import time
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+# Ensure project root is on sys.path for imports
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+from helpers.pipeline_helper import prefetch  # noqa: E402
+from helpers.pipeline_helper import read_ahead  # noqa: E402
+
+
+class TestPrefetch:
+    """Unit tests for the prefetch pipeline."""
+
+    @pytest.mark.parametrize(
+        "depth, max_bytes",
+        [
+            (0, None),
+            (1, None),
+            (3, None),
+            (3, 1),
+        ],
+    )
+    def test_prefetch_yields_all_chunks_in_order(
+        self,
+        depth,
+        max_bytes,
+    ):
+        "Test prefetch yields every chunk, in order, for any buffer bound"
+
+        chunks = [pd.DataFrame({"a": [i]}) for i in range(5)]
+
+        result = list(prefetch(iter(chunks), depth, max_bytes))
+
+        assert [chunk["a"][0] for chunk in result] == list(range(5))
+
+    def test_prefetch_bounds_read_ahead(
+        self,
+    ):
+        "Test the reader never runs more than depth chunks ahead"
+
+        read = []
+
+        def _chunks():
+            for i in range(6):
+                read.append(i)
+                yield pd.DataFrame({"a": [i]})
+
+        for consumed, _ in enumerate(prefetch(_chunks(), 2)):
+            time.sleep(0.01)
+            # the consumed chunk, the buffered chunks and one in hand
+            assert len(read) <= consumed + 4
+
+    def test_prefetch_reraises_reader_errors(
+        self,
+    ):
+        "Test chunks read before an error are yielded, then it is raised"
+
+        def _chunks():
+            yield pd.DataFrame({"a": [1]})
+            raise ValueError("cursor lost")
+
+        result = []
+        with pytest.raises(ValueError, match="cursor lost"):
+            for chunk in prefetch(_chunks(), 2):
+                result.append(chunk)
+
+        assert len(result) == 1
+
+    def test_prefetch_stops_reader_on_early_exit(
+        self,
+    ):
+        "Test the reader is released and closed when the caller stops early"
+
+        closed = []
+
+        def _chunks():
+            try:
+                while True:
+                    yield pd.DataFrame({"a": [1]})
+            finally:
+                closed.append(True)
+
+        for _ in prefetch(_chunks(), 1):
+            break
+
+        assert closed == [True]
+
+
+class TestReadAhead:
+    """Unit tests for reading several sources concurrently."""
+
+    def test_read_ahead_yields_chunks_from_every_source(
+        self,
+    ):
+        "Test read_ahead yields every chunk from every source"
+
+        sources = [
+            iter([pd.DataFrame({"a": [i * 10 + j]}) for j in range(3)])
+            for i in range(3)
+        ]
+
+        result = list(read_ahead(sources, 2))
+
+        assert sorted(chunk["a"][0] for chunk in result) == [
+            0, 1, 2, 10, 11, 12, 20, 21, 22,
+        ]
+
+    def test_read_ahead_stops_every_source_on_error(
+        self,
+    ):
+        "Test an error in one source stops the others and is re-raised"
+
+        closed = []
+
+        def _endless():
+            try:
+                while True:
+                    yield pd.DataFrame({"a": [1]})
+            finally:
+                closed.append(True)
+
+        def _failing():
+            raise ValueError("partition failed")
+            yield
+
+        with pytest.raises(ValueError, match="partition failed"):
+            for _ in read_ahead([_endless(), _failing()], 1):
+                time.sleep(0.001)
+
+        assert closed == [True]
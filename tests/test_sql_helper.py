@@ -0,0 +1,124 @@
+import sys
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+# Ensure project root is on sys.path for imports
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+from helpers.sql_helper import key_columns  # noqa: E402
+from helpers.sql_helper import key_join  # noqa: E402
+from helpers.sql_helper import key_order  # noqa: E402
+from helpers.sql_helper import keyset_params  # noqa: E402
+from helpers.sql_helper import keyset_predicate  # noqa: E402
+from helpers.sql_helper import param  # noqa: E402
+from helpers.sql_helper import qualify  # noqa: E402
+from helpers.sql_helper import quote  # noqa: E402
+from helpers.sql_helper import statement  # noqa: E402
+
+
+class TestSQLHelper:
+    """Unit tests for the SQL helpers."""
+
+    def test_param_casts_datetime(
+        self,
+    ):
+        "Test parameters are only cast for datetime columns"
+
+        assert param("p", "datetime") == "CAST(:p AS datetime)"
+        assert param("p", "datetime2") == ":p"
+        assert param("p", "int") == ":p"
+        assert param("p") == ":p"
+
+    def test_keyset_predicate(
+        self,
+    ):
+        "Test keyset_predicate expands a row comparison column by column"
+
+        result = keyset_predicate(
+            ["modified", "a", "b"],
+            {"modified": "datetime"},
+        )
+
+        assert result == (
+            "(([modified] > CAST(:last_0 AS datetime))"
+            " OR ([modified] = CAST(:last_0 AS datetime) AND [a] > :last_1)"
+            " OR ([modified] = CAST(:last_0 AS datetime) AND [a] = :last_1"
+            " AND [b] > :last_2))"
+        )
+
+    def test_keyset_params(
+        self,
+    ):
+        "Test keyset_params converts values to Python types"
+
+        result = keyset_params([
+            pd.Timestamp("2025-08-29 15:00:00.123456"),
+            np.int64(3),
+            "a",
+        ])
+
+        assert result == {
+            "last_0": datetime(2025, 8, 29, 15, 0, 0, 123456),
+            "last_1": 3,
+            "last_2": "a",
+        }
+        assert type(result["last_1"]) is int
+
+    def test_key_columns(
+        self,
+    ):
+        "Test business keys are split into their columns"
+
+        assert key_columns("SalesOrderID") == ["SalesOrderID"]
+        assert key_columns("SalesOrderID, SalesOrderDetailID,") == [
+            "SalesOrderID",
+            "SalesOrderDetailID",
+        ]
+        assert key_columns(["a", "b"]) == ["a", "b"]
+
+    def test_key_join(
+        self,
+    ):
+        "Test key_join matches every key column"
+
+        assert key_join(["a", "b"], "tgt", "src") == (
+            "tgt.[a] = src.[a] AND tgt.[b] = src.[b]"
+        )
+
+    def test_quote(
+        self,
+    ):
+        "Test identifiers are quoted, and anything but a plain name rejected"
+
+        assert quote("ModifiedDate") == "[ModifiedDate]"
+        assert qualify("ods", "Sales.Customer") == "[ods].[Sales].[Customer]"
+
+        for identifier in ("a b", "a]; DROP TABLE t;--", "", None):
+            with pytest.raises(ValueError):
+                quote(identifier)
+
+    def test_statement_is_cached(
+        self,
+    ):
+        "Test the same statement text is only built once"
+
+        first = statement("SELECT * FROM [t] WHERE [id] = :id;")
+        second = statement("SELECT * FROM [t] WHERE [id] = :id;")
+
+        assert first is second
+        assert first.bindparams(id=1) is not first
+
+    def test_key_order(
+        self,
+    ):
+        "Test string keys are ordered with a binary collation"
+
+        types = {"id": "int", "code": "NVARCHAR"}
+
+        assert key_order(["id", "code"], types) == (
+            "[id] asc, [code] COLLATE Latin1_General_BIN2 asc"
+        )
+        assert key_order(["id"], types, "desc") == "[id] desc"